@@ -0,0 +1,213 @@
+import os
+import asyncio
+import logging
+import threading
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from linearregression_predictiveanalysis import (
+    get_predictions_with_meta,
+    load_data_with_version_async,
+    COLLECTION_NAME as PREDICTIVE_COLLECTION,
+)
+from peertopeer import get_peer_to_predictions, get_peer_to_predictions_range, COLLECTION_NAME as PEERTOPEER_COLLECTION
+from recommendations import get_solar_recommendations, RECOMMENDATION_COLLECTION
+from async_mongo import get_async_collection
+from .pagination import paginate_async
+from .views import peertopeer_records_query, recommendation_records_query
+
+# Logging is configured centrally in backend/settings.py
+logger = logging.getLogger(__name__)
+
+# Threads for CPU-bound model evaluation; the event loop never runs it directly
+ASYNC_EXECUTOR_WORKERS = int(os.getenv("ASYNC_EXECUTOR_WORKERS", "4"))
+# Jobs allowed to wait for a thread before requests are turned away with 503
+ASYNC_EXECUTOR_MAX_PENDING = int(os.getenv("ASYNC_EXECUTOR_MAX_PENDING", "256"))
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+_pending = 0
+
+
+class ExecutorBusy(Exception):
+    """
+    Raised when the CPU executor already has ASYNC_EXECUTOR_MAX_PENDING jobs.
+    """
+
+
+def get_executor():
+    """
+    Return the bounded executor for this process, creating it on first use.
+    """
+    global _executor, _executor_pid
+    pid = os.getpid()
+    if _executor is not None and _executor_pid == pid:
+        return _executor
+    with _executor_lock:
+        if _executor is None or _executor_pid != pid:
+            _executor = ThreadPoolExecutor(max_workers=ASYNC_EXECUTOR_WORKERS, thread_name_prefix='ecopulse-cpu')
+            _executor_pid = pid
+    return _executor
+
+
+async def run_cpu(fn, *args):
+    """
+    Run fn(*args) on the bounded executor and await the result.
+    """
+    global _pending
+    if _pending >= ASYNC_EXECUTOR_MAX_PENDING:
+        raise ExecutorBusy(f"Too many pending computations ({_pending}); try again shortly")
+    _pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_executor(), functools.partial(fn, *args))
+    finally:
+        _pending -= 1
+
+
+def _error(e, view, status=500):
+    if status == 500:
+        logger.error("Error in %s: %s", view, e)
+    return JsonResponse({
+        'status': 'error',
+        'message': str(e)
+    }, status=status)
+
+
+@require_GET
+async def predictions(request, target):
+    """
+    Async API endpoint to get renewable energy predictions for a specific target.
+    The data is probed and fetched with Motor on the event loop; only the
+    model evaluation runs on the CPU executor.
+    """
+    try:
+        start_year = int(request.GET.get('start_year') or 2024)
+        end_year = int(request.GET.get('end_year') or 2040)
+
+        logger.debug("Received async request for target: %s, start_year: %s, end_year: %s", target, start_year, end_year)
+
+        data = await load_data_with_version_async(get_async_collection(PREDICTIVE_COLLECTION), run_cpu)
+        records, meta = await run_cpu(get_predictions_with_meta, target, start_year, end_year, data)
+
+        return JsonResponse({
+            'status': 'success',
+            'target': target,
+            'model_version': meta['model_version'],
+            'predictions': records
+        })
+    except ExecutorBusy as e:
+        return _error(e, 'async predictions', status=503)
+    except Exception as e:
+        return _error(e, 'async predictions')
+
+
+@require_GET
+async def peertopeer_predictions(request):
+    """
+    Async API endpoint to get peer-to-peer predictions based on year.
+    """
+    try:
+        year = int(request.GET.get('year') or 2026)
+
+        logger.debug("Received async request with year: %s", year)
+
+        result = await run_cpu(get_peer_to_predictions, year)
+
+        return JsonResponse({
+            'status': 'success',
+            'year': result.get('year'),
+            'data': result.get('data'),
+            'message': result.get('message', '')
+        })
+    except ExecutorBusy as e:
+        return _error(e, 'async peertopeer_predictions', status=503)
+    except Exception as e:
+        return _error(e, 'async peertopeer_predictions')
+
+
+@require_GET
+async def peertopeer_predictions_range(request):
+    """
+    Async API endpoint to get every subgrid's metrics for a range of years.
+    """
+    try:
+        start_year = int(request.GET.get('start_year') or 2024)
+        end_year = int(request.GET.get('end_year') or 2040)
+
+        result = await run_cpu(get_peer_to_predictions_range, start_year, end_year)
+
+        return JsonResponse({
+            'status': 'success',
+            'start_year': result['start_year'],
+            'end_year': result['end_year'],
+            'years': result['years'],
+            'message': result['message']
+        })
+    except ExecutorBusy as e:
+        return _error(e, 'async peertopeer_predictions_range', status=503)
+    except ValueError as e:
+        return _error(e, 'async peertopeer_predictions_range', status=400)
+    except Exception as e:
+        return _error(e, 'async peertopeer_predictions_range')
+
+
+@require_GET
+async def solar_recommendations(request):
+    """
+    Async API endpoint to get solar recommendations based on year and budget.
+    """
+    try:
+        year = int(request.GET.get('year', 2026))
+        budget = float(request.GET.get('budget', 0))
+
+        recommendations = await run_cpu(get_solar_recommendations, year, budget)
+
+        return JsonResponse({
+            'status': 'success',
+            'recommendations': recommendations
+        })
+    except ExecutorBusy as e:
+        return _error(e, 'async solar_recommendations', status=503)
+    except Exception as e:
+        return _error(e, 'async solar_recommendations')
+
+
+@require_GET
+async def peertopeer_records(request):
+    """
+    Async API endpoint to list peer-to-peer records, one keyset page at a time.
+    """
+    try:
+        collection = get_async_collection(PEERTOPEER_COLLECTION)
+        records, next_cursor = await paginate_async(collection, peertopeer_records_query(request.GET), request.GET)
+        return JsonResponse({
+            'status': 'success',
+            'records': records,
+            'next_cursor': next_cursor
+        })
+    except ValueError as e:
+        return _error(e, 'async peertopeer_records', status=400)
+    except Exception as e:
+        return _error(e, 'async peertopeer_records')
+
+
+@require_GET
+async def recommendation_records(request):
+    """
+    Async API endpoint to list recommendation records, one keyset page at a time.
+    """
+    try:
+        collection = get_async_collection(RECOMMENDATION_COLLECTION)
+        records, next_cursor = await paginate_async(collection, recommendation_records_query(request.GET), request.GET)
+        return JsonResponse({
+            'status': 'success',
+            'records': records,
+            'next_cursor': next_cursor
+        })
+    except ValueError as e:
+        return _error(e, 'async recommendation_records', status=400)
+    except Exception as e:
+        return _error(e, 'async recommendation_records')
@@ -0,0 +1,50 @@
+import json
+
+
+def parse_rows(request):
+    """
+    Read bulk ingest rows from a request body.
+    Accepts a JSON array, a {"records": [...]} object, or NDJSON (one object
+    per line, sent as application/x-ndjson or detected from the body).
+
+    Returns:
+        list: Row dicts as sent by the client
+    """
+    body = request.body.decode('utf-8').strip()
+    if not body:
+        raise ValueError("Request body is empty")
+
+    content_type = request.headers.get('Content-Type', '')
+    if 'ndjson' not in content_type and body[0] in '[{':
+        try:
+            data = json.loads(body)
+        except json.JSONDecodeError:
+            # Several objects on separate lines are NDJSON
+            data = None
+        if isinstance(data, list):
+            return data
+        if isinstance(data, dict):
+            if 'records' not in data:
+                # A single NDJSON line sent without the ndjson Content-Type
+                return [data]
+            records = data['records']
+            if not isinstance(records, list):
+                raise ValueError("Expected a JSON array, {\"records\": [...]} or NDJSON")
+            return records
+
+    rows = []
+    for number, line in enumerate(body.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            rows.append(json.loads(line))
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON on line {number}: {e.msg}")
+    return rows
+
+
+def upsert_requested(request):
+    """
+    True when the client asked to update existing Years (?upsert=true).
+    """
+    return request.GET.get('upsert', '').lower() in ('1', 'true', 'yes')
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+import recommendations
+
+
+class Command(BaseCommand):
+    help = "Fit the recommendation curves and write them to the prebuilt model artifact."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--if-stale', action='store_true',
+            help="Only refit when the artifact does not match the current recommendation data."
+        )
+
+    def handle(self, *args, **options):
+        params = recommendations.build_artifact(force=not options['if_stale'], strict=True)
+        recommendations.reset_models()
+        self.stdout.write(f"artifact: {recommendations.ARTIFACT_PATH}")
+        self.stdout.write(f"solar cost curve: {params['popt'].tolist()} (x_min={params['x_min']})")
+        self.stdout.write(f"MERALCO rate coefficients: {params['meralco_coef'].tolist()}")
+        self.stdout.write(f"actual years: {len(params['actual_years'])}")
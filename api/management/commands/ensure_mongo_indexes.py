@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from mongo_indexes import INDEXES, ensure_indexes, verify_indexes
+
+
+class Command(BaseCommand):
+    help = "Create the MongoDB indexes the application relies on, optionally verifying query plans."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--collection', action='append', choices=sorted(INDEXES),
+            help="Only process this collection (repeatable)."
+        )
+        parser.add_argument('--dry-run', action='store_true', help="Report missing indexes without creating them.")
+        parser.add_argument('--verify', action='store_true', help="Explain representative queries and check index use.")
+
+    def handle(self, *args, **options):
+        report = ensure_indexes(collections=options['collection'], dry_run=options['dry_run'])
+        failed = False
+        verb = "would create" if options['dry_run'] else "created"
+        for name, result in report.items():
+            self.stdout.write(
+                f"{name}: {verb} {result['created'] or 'none'}, existing {result['existing'] or 'none'}"
+            )
+            for index_name, error in result['errors'].items():
+                failed = True
+                self.stderr.write(f"{name}.{index_name}: {error}")
+
+        if options['verify']:
+            for check in verify_indexes():
+                if options['collection'] and check['collection'] not in options['collection']:
+                    continue
+                status = "ok" if check['ok'] else "MISSING"
+                failed = failed or not check['ok']
+                self.stdout.write(
+                    f"{check['collection']} {check['query']} sort={check['sort']}: "
+                    f"expected {check['expected']}, used {check['used'] or 'COLLSCAN'} ({status})"
+                )
+
+        if failed:
+            raise CommandError("Index check failed")
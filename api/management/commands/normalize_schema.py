@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from schema import MIGRATION_TARGETS, DEFAULT_BATCH_SIZE, migration_status, normalize_collection
+
+
+class Command(BaseCommand):
+    help = ("Normalize stored documents in place: year -> Year, numeric strings to numbers, "
+            "flags to booleans. Resumable; progress is kept in the migrations collection.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--collection', action='append', choices=sorted(MIGRATION_TARGETS),
+            help="Only migrate this collection (repeatable)."
+        )
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--restart', action='store_true', help="Ignore saved progress and start over.")
+        parser.add_argument('--status', action='store_true', help="Show saved progress and exit.")
+
+    def handle(self, *args, **options):
+        if options['status']:
+            for name, progress in migration_status().items():
+                if progress is None:
+                    self.stdout.write(f"{name}: not started")
+                else:
+                    state = "done" if progress.get('done') else f"in progress (last _id {progress['last_id']})"
+                    self.stdout.write(f"{name}: {state}, {progress['processed']} processed, {progress['modified']} modified")
+            return
+
+        for name in options['collection'] or list(MIGRATION_TARGETS):
+            progress = normalize_collection(name, batch_size=options['batch_size'], restart=options['restart'])
+            self.stdout.write(f"{name}: {progress['processed']} processed, {progress['modified']} modified")
+
+        # Rebuild the peer-to-peer columnar cache from the normalized documents
+        if not options['collection'] or 'peertopeer' in options['collection']:
+            from peertopeer import fetch_and_save_data
+            fetch_and_save_data()
+            self.stdout.write("peertopeer: cache rebuilt")
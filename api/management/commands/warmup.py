@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from startup import warm_up
+
+
+class Command(BaseCommand):
+    help = "Load prediction data and models and report how long each stage takes."
+
+    def handle(self, *args, **options):
+        report = warm_up()
+        for stage, seconds in report['stages'].items():
+            status = f"failed: {report['errors'][stage]}" if stage in report['errors'] else "ok"
+            self.stdout.write(f"{stage}: {seconds:.3f}s ({status})")
+        self.stdout.write(f"total: {report['total_seconds']:.3f}s")
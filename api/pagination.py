@@ -0,0 +1,176 @@
+import json
+import base64
+from bson import ObjectId
+from bson.errors import InvalidId
+
+# Page size bounds for record listings
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 1000
+
+# Stable sort used by the keyset cursor
+SORT_ORDER = [('Year', 1), ('_id', 1)]
+
+
+def encode_cursor(record):
+    """
+    Encode the sort key of the last record on a page as an opaque token.
+    """
+    payload = json.dumps({'y': record.get('Year'), 'id': str(record['_id'])})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(token):
+    """
+    Decode a token produced by encode_cursor into (year, ObjectId).
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode()).decode())
+        return payload['y'], ObjectId(payload['id'])
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise ValueError("Invalid 'after' cursor")
+
+
+def keyset_filter(year, object_id):
+    """
+    Match documents that sort strictly after (year, object_id) under SORT_ORDER.
+    Documents without a Year sort first, so a null year continues into them.
+    """
+    if year is None:
+        return {'$or': [
+            {'Year': None, '_id': {'$gt': object_id}},
+            {'Year': {'$ne': None}},
+        ]}
+    return {'$or': [
+        {'Year': {'$gt': year}},
+        {'Year': year, '_id': {'$gt': object_id}},
+    ]}
+
+
+def paging_requested(params):
+    """
+    True when the client asked for a page (limit or after). Listings without
+    either keep returning the full collection.
+    """
+    return bool(params.get('limit') or params.get('after'))
+
+
+def parse_page_params(params, default_limit=DEFAULT_PAGE_SIZE, max_limit=MAX_PAGE_SIZE):
+    """
+    Read limit, after and fields from request query parameters.
+
+    Parameters:
+        params (QueryDict): Request parameters
+        default_limit (int): Limit used when none is given
+        max_limit (int): Upper bound on the limit, None for no bound
+
+    Returns:
+        tuple: (limit, after, fields) where after is a decoded cursor or None
+               and fields is a list of field names or None
+    """
+    limit = params.get('limit')
+    if limit:
+        limit = int(limit)
+        if limit < 1:
+            raise ValueError("limit must be positive")
+        if max_limit is not None:
+            limit = min(limit, max_limit)
+    else:
+        limit = default_limit
+
+    after = params.get('after')
+    after = decode_cursor(after) if after else None
+
+    fields = params.get('fields')
+    fields = [f.strip() for f in fields.split(',') if f.strip()] if fields else None
+    return limit, after, fields
+
+
+def build_projection(fields):
+    """
+    Build a Mongo projection for the requested fields.
+    Year and _id are always returned because the cursor is built from them.
+    """
+    if not fields:
+        return None
+    projection = {field: 1 for field in fields}
+    projection['Year'] = 1
+    return projection
+
+
+def paged_query(query, after):
+    """
+    Combine a filter with the keyset condition for the page after `after`.
+    """
+    if after is None:
+        return query
+    condition = keyset_filter(*after)
+    return {'$and': [query, condition]} if query else condition
+
+
+def open_cursor(collection, query, params):
+    """
+    Open a sorted server-side cursor for streaming exports.
+    Honours after and fields; limit is optional and unbounded when omitted.
+    """
+    # A limit of 0 means no limit to pymongo
+    limit, after, fields = parse_page_params(params, default_limit=0, max_limit=None)
+    return collection.find(
+        paged_query(query, after),
+        projection=build_projection(fields),
+        sort=SORT_ORDER,
+        limit=limit,
+        batch_size=DEFAULT_PAGE_SIZE
+    )
+
+
+def paginate(collection, query, params):
+    """
+    Fetch one page of records with keyset pagination.
+
+    Parameters:
+        collection (pymongo.collection.Collection): Collection to read
+        query (dict): Base filter
+        params (QueryDict): Request parameters (limit, after, fields)
+
+    Returns:
+        tuple: (records, next_cursor) where next_cursor is None on the last page
+    """
+    limit, after, fields = parse_page_params(params)
+    cursor = collection.find(
+        paged_query(query, after),
+        projection=build_projection(fields),
+        sort=SORT_ORDER,
+        limit=limit + 1,
+        batch_size=limit + 1
+    )
+
+    return _page(list(cursor), limit)
+
+
+async def paginate_async(collection, query, params):
+    """
+    Fetch one page of records with keyset pagination from a Motor collection.
+    Same parameters and return value as paginate.
+    """
+    limit, after, fields = parse_page_params(params)
+    cursor = collection.find(
+        paged_query(query, after),
+        projection=build_projection(fields),
+        sort=SORT_ORDER,
+        limit=limit + 1,
+        batch_size=limit + 1
+    )
+    return _page(await cursor.to_list(length=limit + 1), limit)
+
+
+def _page(records, limit):
+    # One extra record is fetched to tell whether another page follows
+    next_cursor = None
+    if len(records) > limit:
+        records = records[:limit]
+        next_cursor = encode_cursor(records[-1])
+
+    for record in records:
+        # Convert ObjectId to string for JSON serialization
+        record['_id'] = str(record['_id'])
+    return records, next_cursor
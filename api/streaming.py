@@ -0,0 +1,93 @@
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+# Serialized bytes buffered before each chunk is yielded
+STREAM_CHUNK_SIZE = 64 * 1024
+
+STREAM_MODES = ('json', 'ndjson')
+
+
+def stream_mode(request):
+    """
+    Return 'json' or 'ndjson' when the client opted into streaming, else None.
+    Opt in with ?stream=json, ?stream=ndjson or an Accept: application/x-ndjson header.
+    """
+    mode = request.GET.get('stream')
+    if mode:
+        mode = mode.lower()
+        if mode in ('1', 'true'):
+            mode = 'json'
+        if mode not in STREAM_MODES:
+            raise ValueError(f"Unsupported stream mode: {mode}. Expected one of {STREAM_MODES}")
+        return mode
+    if 'application/x-ndjson' in request.headers.get('Accept', ''):
+        return 'ndjson'
+    return None
+
+
+def _dumps(item):
+    return json.dumps(item, cls=DjangoJSONEncoder)
+
+
+def _chunked(pieces):
+    """
+    Join small string pieces into chunks of roughly STREAM_CHUNK_SIZE.
+    """
+    buffer = []
+    size = 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= STREAM_CHUNK_SIZE:
+            yield ''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def _json_pieces(items, key, envelope):
+    # Emit the envelope fields first, then the array one item at a time
+    head = _dumps(envelope or {})[:-1]
+    yield head + (', ' if envelope else '') + _dumps(key) + ': ['
+    first = True
+    for item in items:
+        yield _dumps(item) if first else ', ' + _dumps(item)
+        first = False
+    yield ']}'
+
+
+def _ndjson_pieces(items):
+    for item in items:
+        yield _dumps(item) + '\n'
+
+
+def streaming_response(items, mode, key='records', envelope=None):
+    """
+    Stream an iterable of JSON-serializable items.
+
+    Parameters:
+        items (iterable): Records to send, consumed lazily
+        mode (str): 'json' for a single {envelope..., key: [...]} document, 'ndjson' for one record per line
+        key (str): Name of the array in json mode
+        envelope (dict): Extra top-level fields in json mode
+
+    Returns:
+        StreamingHttpResponse
+    """
+    if mode == 'ndjson':
+        return StreamingHttpResponse(_chunked(_ndjson_pieces(items)), content_type='application/x-ndjson')
+    return StreamingHttpResponse(_chunked(_json_pieces(items, key, envelope)), content_type='application/json')
+
+
+def iter_records(cursor):
+    """
+    Yield Mongo documents with _id converted for JSON, closing the cursor when done.
+    """
+    try:
+        for record in cursor:
+            record['_id'] = str(record['_id'])
+            yield record
+    finally:
+        cursor.close()
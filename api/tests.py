@@ -1,3 +1,631 @@
-from django.test import TestCase
+import os
+import json
+import asyncio
+import time
+import shutil
+import tempfile
+import threading
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+from sklearn.model_selection import train_test_split
+from bson import ObjectId
+from django.http import JsonResponse, StreamingHttpResponse
+from django.test import SimpleTestCase, RequestFactory
+
+import schema
+from schema import normalize_document, validate_rows, write_rows, RowValidationError
+from api import views
+from api.bulk import parse_rows
+from columnar_store import ColumnarStore
+from peertopeer import CoefficientTable, typed_frame
+import model_registry
+from model_registry import ModelRegistry
+from retrain_scheduler import RetrainScheduler
+import linearregression_predictiveanalysis
+from linearregression_predictiveanalysis import (
+    train_models,
+    record_update_pipeline,
+    update_records,
+    TOTAL_RENEWABLE,
+    TOTAL_GENERATION,
+)
+
+
+class NormalizeDocumentTests(SimpleTestCase):
+    def test_converts_numeric_fields_and_flags(self):
+        doc = normalize_document({
+            'year': '2024',
+            'Solar (GWh)': '1,234.5',
+            'Population (in millions)': '112',
+            'isPredicted': 'false',
+        })
+        self.assertEqual(doc, {
+            'Year': 2024,
+            'Solar (GWh)': 1234.5,
+            'Population (in millions)': 112,
+            'isPredicted': False,
+        })
+        self.assertIsInstance(doc['Year'], int)
+
+    def test_canonical_year_wins_over_alias(self):
+        doc = normalize_document({'year': 1999, 'Year': 2000})
+        self.assertEqual(doc, {'Year': 2000})
+
+    def test_blank_numeric_field_becomes_none(self):
+        self.assertEqual(normalize_document({'Hydro (GWh)': '  '}), {'Hydro (GWh)': None})
+
+    def test_unparseable_numeric_string_is_kept(self):
+        self.assertEqual(normalize_document({'Hydro (GWh)': 'n/a'}), {'Hydro (GWh)': 'n/a'})
+
+    def test_other_fields_are_left_alone(self):
+        doc = {'Code': '007', 'Note': '', 'Region': 'Cebu'}
+        self.assertEqual(normalize_document(doc), doc)
+
+    def test_integral_float_year_becomes_int(self):
+        doc = normalize_document({'Year': 2024.0})
+        self.assertEqual(doc['Year'], 2024)
+        self.assertIsInstance(doc['Year'], int)
+
+    def test_id_is_not_converted(self):
+        self.assertEqual(normalize_document({'_id': '123'}), {'_id': '123'})
+
+
+class ValidateRowsTests(SimpleTestCase):
+    def test_valid_rows(self):
+        docs, errors = validate_rows([
+            {'_id': 'x', 'Year': '2024', 'Solar (GWh)': '10.5'},
+            {'Year': 2025, 'Solar (GWh)': None},
+        ])
+        self.assertEqual(errors, [])
+        self.assertEqual(docs, [{'Year': 2024, 'Solar (GWh)': 10.5}, {'Year': 2025, 'Solar (GWh)': None}])
+
+    def test_rows_must_be_objects(self):
+        docs, errors = validate_rows([{'Year': 2024}, ['Year', 2025]])
+        self.assertEqual(docs, [])
+        self.assertEqual([e['row'] for e in errors], [1])
+
+    def test_year_checks(self):
+        _, errors = validate_rows([
+            {'Solar (GWh)': 1},
+            {'Year': 2024.5},
+            {'Year': 2030},
+            {'Year': 2030},
+        ])
+        self.assertEqual(
+            [(e['row'], e['message']) for e in errors],
+            [
+                (0, 'Year is required'),
+                (1, 'Year must be an integer'),
+                (2, 'Year appears more than once in the batch'),
+                (3, 'Year appears more than once in the batch'),
+            ]
+        )
+
+    def test_boolean_year_is_not_an_integer(self):
+        _, errors = validate_rows([{'Year': True}, {'Year': 2024}, {'Year': False}])
+        self.assertEqual(
+            [(e['row'], e['message']) for e in errors],
+            [(0, 'Year must be an integer'), (2, 'Year must be an integer')]
+        )
+
+    def test_missing_year_column(self):
+        _, errors = validate_rows([{'Solar (GWh)': 1}])
+        self.assertEqual(errors, [{'row': None, 'field': 'Year', 'message': 'Year is required'}])
+
+    def test_non_numeric_value(self):
+        _, errors = validate_rows([{'Year': 2024, 'Solar (GWh)': 'lots'}])
+        self.assertEqual(errors, [{'row': 0, 'field': 'Solar (GWh)', 'message': 'Value must be a number'}])
+
+    def test_non_numeric_values_among_numbers(self):
+        _, errors = validate_rows([
+            {'Year': 2024, 'Solar (GWh)': 1.5},
+            {'Year': 2025, 'Solar (GWh)': 'lots'},
+            {'Year': 2026, 'Solar (GWh)': None},
+        ])
+        self.assertEqual([(e['row'], e['field']) for e in errors], [(1, 'Solar (GWh)')])
+
+    def test_booleans_are_not_numbers(self):
+        _, errors = validate_rows([
+            {'Year': 2024, 'Solar (GWh)': True, 'Wind (GWh)': 1.5},
+            {'Year': 2025, 'Solar (GWh)': False, 'Wind (GWh)': True},
+        ])
+        self.assertEqual(
+            [(e['row'], e['field']) for e in errors],
+            [(0, 'Solar (GWh)'), (1, 'Solar (GWh)'), (1, 'Wind (GWh)')]
+        )
+
+    def test_flags_and_other_fields_are_not_checked(self):
+        _, errors = validate_rows([{'Year': 2024, 'isPredicted': 'yes', 'Code': '007'}])
+        self.assertEqual(errors, [])
+
+    def test_batch_size_limit(self):
+        with mock.patch.object(schema, 'MAX_BULK_ROWS', 2):
+            with self.assertRaises(ValueError):
+                validate_rows([{'Year': 2020}, {'Year': 2021}, {'Year': 2022}])
+
+
+class WriteRowsTests(SimpleTestCase):
+    def test_insert_rejects_stored_years(self):
+        collection = mock.Mock()
+        collection.find.return_value = [{'_id': 1, 'Year': 2024}]
+        with self.assertRaises(RowValidationError) as raised:
+            write_rows(collection, [{'Year': 2023}, {'Year': 2024}])
+        self.assertEqual([e['row'] for e in raised.exception.errors], [1])
+        collection.find.assert_called_once_with({'Year': {'$in': [2023, 2024]}}, {'Year': 1})
+        collection.insert_many.assert_not_called()
+
+    def test_upsert_skips_the_check(self):
+        collection = mock.Mock()
+        collection.bulk_write.return_value = mock.Mock(upserted_count=1, modified_count=1)
+        summary = write_rows(collection, [{'Year': 2023}, {'Year': 2024}], upsert=True)
+        collection.find.assert_not_called()
+        self.assertEqual(summary, {'inserted': 0, 'upserted': 1, 'modified': 1, 'errors': []})
+
+
+class ParseRowsTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def parse(self, body, content_type='application/json'):
+        return parse_rows(self.factory.post('/', data=body, content_type=content_type))
+
+    def test_array_and_records_object(self):
+        self.assertEqual(self.parse('[{"Year": 2024}]'), [{'Year': 2024}])
+        self.assertEqual(self.parse('{"records": [{"Year": 2024}]}'), [{'Year': 2024}])
+
+    def test_ndjson(self):
+        self.assertEqual(self.parse('{"Year": 2024}\n{"Year": 2025}\n'), [{'Year': 2024}, {'Year': 2025}])
+
+    def test_single_ndjson_line_without_ndjson_content_type(self):
+        self.assertEqual(self.parse('{"Year": 2024}'), [{'Year': 2024}])
+
+    def test_records_must_be_a_list(self):
+        with self.assertRaises(ValueError):
+            self.parse('{"records": {"Year": 2024}}')
+
+
+class TrainModelsTests(SimpleTestCase):
+    features = ['Year', 'Population (in millions)', 'Non-Renewable Energy (GWh)']
+    targets = ['Solar (GWh)', 'Wind (GWh)', 'Hydro (GWh)']
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        years = np.arange(2000, 2030)
+        self.df = pd.DataFrame({
+            'Year': years,
+            'Population (in millions)': 80 + 0.9 * (years - 2000) + rng.normal(0, 0.2, len(years)),
+            'Non-Renewable Energy (GWh)': 40000 + 900 * (years - 2000) + rng.normal(0, 300, len(years)),
+        })
+        for i, target in enumerate(self.targets):
+            self.df[target] = 100 * (i + 1) + 12.5 * (years - 2000) + rng.normal(0, 5, len(years))
+
+    def reference(self, df, target):
+        # The per-target fit the shared solve replaces
+        X_train, _, y_train, _ = train_test_split(df[self.features], df[target], test_size=0.2, random_state=42)
+        return LinearRegression().fit(X_train, y_train)
+
+    def test_split_models_predict_like_single_target_fits(self):
+        models, metrics = train_models(self.df, self.features, self.targets)
+        self.assertEqual(set(models), set(self.targets))
+        future = self.df[self.features].iloc[-5:] + [10, 10, 10000]
+        for target in self.targets:
+            expected = self.reference(self.df, target)
+            np.testing.assert_allclose(models[target].coef_, expected.coef_, rtol=1e-9)
+            np.testing.assert_allclose(models[target].intercept_, expected.intercept_, rtol=1e-9)
+            np.testing.assert_allclose(models[target].predict(future), expected.predict(future), rtol=1e-9)
+            self.assertEqual(set(metrics[target]), {'mae', 'mse'})
+
+    def test_target_with_gaps_is_fitted_on_its_own_rows(self):
+        self.df.loc[[3, 7], 'Wind (GWh)'] = np.nan
+        models, _ = train_models(self.df, self.features, self.targets)
+        expected = self.reference(self.df.dropna(subset=['Wind (GWh)']), 'Wind (GWh)')
+        np.testing.assert_allclose(models['Wind (GWh)'].coef_, expected.coef_, rtol=1e-9)
+        np.testing.assert_allclose(models['Solar (GWh)'].coef_, self.reference(self.df, 'Solar (GWh)').coef_, rtol=1e-9)
+
+    def test_bad_column_only_loses_its_own_model(self):
+        self.df['Hydro (GWh)'] = 'n/a'
+        models, _ = train_models(self.df, self.features, self.targets)
+        self.assertEqual(set(models), {'Solar (GWh)', 'Wind (GWh)'})
+
+
+class FakeCursor(list):
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class RecordListingTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.docs = [{'_id': ObjectId(), 'Year': year} for year in (2020, 2021, 2022)]
+        self.collection = mock.Mock()
+        self.collection.find.side_effect = lambda *args, **kwargs: FakeCursor(dict(d) for d in self.docs)
+        patcher = mock.patch.object(views, 'connect_to_mongodb_peertopeer', return_value=self.collection)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, query=''):
+        return views.peertopeer_records(self.factory.get('/api/peertopeer/records/' + query))
+
+    def test_plain_get_returns_every_record_as_json(self):
+        response = self.get()
+        self.assertIsInstance(response, JsonResponse)
+        body = json.loads(response.content)
+        self.assertEqual([r['Year'] for r in body['records']], [2020, 2021, 2022])
+        self.assertNotIn('next_cursor', body)
+        self.assertEqual(self.collection.find.call_args.kwargs['limit'], 0)
+
+    def test_limit_returns_a_page(self):
+        response = self.get('?limit=2')
+        body = json.loads(response.content)
+        self.assertEqual([r['Year'] for r in body['records']], [2020, 2021])
+        self.assertIsNotNone(body['next_cursor'])
+
+    def test_streaming_is_opt_in(self):
+        response = self.get('?stream=ndjson')
+        self.assertIsInstance(response, StreamingHttpResponse)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)['Year'] for line in lines], [2020, 2021, 2022])
+
+    def test_cursor_error_is_a_json_500(self):
+        self.collection.find.side_effect = RuntimeError('connection reset')
+        response = self.get()
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(json.loads(response.content)['status'], 'error')
+
+
+class RecordUpdatePipelineTests(SimpleTestCase):
+    def test_applies_fields_then_recomputes_totals(self):
+        pipeline = record_update_pipeline({
+            '_id': 'x',
+            'Year': 2024,
+            'Solar (GWh)': 12.5,
+            TOTAL_RENEWABLE: 1,
+            TOTAL_GENERATION: 2,
+        })
+        self.assertEqual(len(pipeline), 3)
+
+        fields = pipeline[0]['$set']
+        self.assertEqual(fields['Solar (GWh)'], {'$literal': 12.5})
+        self.assertIn('updatedAt', fields)
+        for key in ('_id', 'Year', TOTAL_RENEWABLE, TOTAL_GENERATION):
+            self.assertNotIn(key, fields)
+
+        self.assertEqual(
+            pipeline[1]['$set'][TOTAL_RENEWABLE],
+            {'$add': [
+                {'$ifNull': [f'${col}', 0]}
+                for col in ('Geothermal (GWh)', 'Hydro (GWh)', 'Biomass (GWh)', 'Solar (GWh)', 'Wind (GWh)')
+            ]}
+        )
+        self.assertEqual(
+            pipeline[2]['$set'][TOTAL_GENERATION],
+            {'$add': [f'${TOTAL_RENEWABLE}', {'$ifNull': ['$Non-Renewable Energy (GWh)', 0]}]}
+        )
+
+    def test_literal_protects_operator_like_values(self):
+        pipeline = record_update_pipeline({'Note': '$Solar (GWh)'})
+        self.assertEqual(pipeline[0]['$set']['Note'], {'$literal': '$Solar (GWh)'})
+
+
+class UpdateRecordsTests(SimpleTestCase):
+    def setUp(self):
+        self.collection = mock.Mock()
+        for name, value in (('connect_to_mongodb', mock.Mock(return_value=self.collection)),
+                            ('bump_data_version', mock.Mock()),
+                            ('schedule_retrain', mock.Mock())):
+            patcher = mock.patch.object(linearregression_predictiveanalysis, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_reports_unmatched_years(self):
+        self.collection.find.return_value = [{'_id': 1, 'Year': 2024}]
+        self.collection.bulk_write.return_value = mock.Mock(matched_count=1, modified_count=1)
+        summary = update_records([{'Year': 2023, 'Solar (GWh)': 1}, {'Year': 2024, 'Solar (GWh)': 2}])
+        self.assertEqual(summary, {'matched': 1, 'modified': 1, 'unmatched': [2023], 'errors': []})
+        requests = self.collection.bulk_write.call_args[0][0]
+        self.assertEqual(len(requests), 1)
+        linearregression_predictiveanalysis.schedule_retrain.assert_called_once()
+
+    def test_invalid_rows_are_rejected_before_reading(self):
+        with self.assertRaises(RowValidationError):
+            update_records([{'Year': 2024, 'Solar (GWh)': 'lots'}])
+        self.collection.find.assert_not_called()
+        self.collection.bulk_write.assert_not_called()
+
+
+class DataCacheTests(SimpleTestCase):
+    def setUp(self):
+        module = linearregression_predictiveanalysis
+        cache = dict(module._data_cache, df=None, version=None, probe=None)
+        for patcher in (mock.patch.dict(module._data_cache, cache),
+                        mock.patch.object(module, 'preprocess_data', pd.DataFrame)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.fetches = 0
+
+    def test_sync_reload_runs_once_without_holding_the_cache_lock(self):
+        module = linearregression_predictiveanalysis
+        started, release = threading.Event(), threading.Event()
+
+        def find(query):
+            self.fetches += 1
+            self.assertFalse(module._data_lock.locked())
+            started.set()
+            release.wait(5)
+            return [{'Year': 2024}]
+
+        collection = mock.Mock()
+        collection.find_one.return_value = None
+        collection.find.side_effect = find
+        results = []
+        with mock.patch.object(module, 'connect_to_mongodb', return_value=collection):
+            threads = [threading.Thread(target=lambda: results.append(module.load_data_with_version())) for _ in range(2)]
+            threads[0].start()
+            self.assertTrue(started.wait(5))
+            # Writers bumping the data version are not blocked by the reload
+            self.assertTrue(module._data_lock.acquire(timeout=1))
+            module._data_lock.release()
+            threads[1].start()
+            release.set()
+            for thread in threads:
+                thread.join(5)
+        self.assertEqual(self.fetches, 1)
+        self.assertEqual(len(results), 2)
+        self.assertIs(results[0][0], results[1][0])
+
+    def test_async_reload_runs_once_per_miss(self):
+        module = linearregression_predictiveanalysis
+        test = self
+
+        class Cursor:
+            async def to_list(self, length=None):
+                test.fetches += 1
+                await asyncio.sleep(0.01)
+                return [{'Year': 2024}]
+
+        class Collection:
+            async def find_one(self, *args, **kwargs):
+                return None
+
+            def find(self, query):
+                return Cursor()
+
+        async def run_cpu(fn, *args):
+            return fn(*args)
+
+        async def load_concurrently():
+            collection = Collection()
+            return await asyncio.gather(*(module.load_data_with_version_async(collection, run_cpu) for _ in range(3)))
+
+        results = asyncio.run(load_concurrently())
+        self.assertEqual(self.fetches, 1)
+        self.assertEqual(len({generation for _, generation in results}), 1)
+
+
+class ColumnarStoreTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.store = ColumnarStore(self.directory)
+
+    def test_write_and_load(self):
+        self.assertFalse(self.store.exists())
+        self.store.write(pd.DataFrame({
+            'Year': [2020, 2021],
+            'Cebu Solar (GWh)': [1.5, 2.5],
+            'isPredicted': [False, True],
+        }))
+        frame, signature = self.store.load()
+        self.assertIsNotNone(signature)
+        self.assertEqual(signature, self.store.signature())
+        self.assertEqual(list(frame['Year']), [2020, 2021])
+        self.assertEqual(list(frame['Cebu Solar (GWh)']), [1.5, 2.5])
+        self.assertEqual(list(frame['isPredicted']), [False, True])
+
+    def test_append_adds_rows_and_columns(self):
+        self.store.write(pd.DataFrame({'Year': [2020], 'Cebu Solar (GWh)': [1.0], 'isPredicted': [False]}))
+        self.store.append(pd.DataFrame({'Year': [2021], 'Cebu Wind (GWh)': [3.0], 'isPredicted': [False]}))
+        frame, _ = self.store.load()
+        self.assertEqual(list(frame['Year']), [2020, 2021])
+        self.assertEqual(frame['Cebu Solar (GWh)'].iloc[0], 1.0)
+        self.assertTrue(np.isnan(frame['Cebu Solar (GWh)'].iloc[1]))
+        self.assertTrue(np.isnan(frame['Cebu Wind (GWh)'].iloc[0]))
+        self.assertEqual(frame['Cebu Wind (GWh)'].iloc[1], 3.0)
+
+    def test_append_to_empty_store(self):
+        self.store.append(pd.DataFrame({'Year': [2020], 'Cebu Solar (GWh)': [1.0]}))
+        frame, _ = self.store.load()
+        self.assertEqual(list(frame['Year']), [2020])
+        self.assertNotIn('isPredicted', frame.columns)
+
+    def test_keeps_previous_version_only(self):
+        for year in (2020, 2021, 2022):
+            self.store.append(pd.DataFrame({'Year': [year]}))
+        files = sorted(f for f in os.listdir(self.directory) if f.endswith('.npy'))
+        self.assertEqual(files, ['flags-2.npy', 'flags-3.npy', 'values-2.npy', 'values-3.npy'])
+        frame, _ = self.store.load()
+        self.assertEqual(list(frame['Year']), [2020, 2021, 2022])
+
+
+class TypedFrameTests(SimpleTestCase):
+    def test_coerces_text_columns_of_any_dtype(self):
+        raw = pd.DataFrame({
+            '_id': ['a', 'b'],
+            'Year': pd.array(['2020', '2021'], dtype='string'),
+            'Cebu Solar (GWh)': pd.array(['1,234.5', 'n/a'], dtype='string'),
+            'Cebu Wind (GWh)': pd.Series(['7', None], dtype=object),
+            'isPredicted': ['false', 'true'],
+        })
+        frame = typed_frame(raw)
+        self.assertNotIn('_id', frame.columns)
+        self.assertEqual(list(frame['Year']), [2020, 2021])
+        self.assertEqual(frame['Cebu Solar (GWh)'].iloc[0], 1234.5)
+        self.assertTrue(np.isnan(frame['Cebu Solar (GWh)'].iloc[1]))
+        self.assertEqual(frame['Cebu Wind (GWh)'].iloc[0], 7)
+        self.assertTrue(np.isnan(frame['Cebu Wind (GWh)'].iloc[1]))
+        self.assertEqual(list(frame['isPredicted']), [False, True])
+        for col in ('Year', 'Cebu Solar (GWh)', 'Cebu Wind (GWh)'):
+            self.assertTrue(pd.api.types.is_numeric_dtype(frame[col]), col)
+
+    def test_leaves_numeric_columns_alone(self):
+        raw = pd.DataFrame({'Year': [2020], 'Cebu Solar (GWh)': [1.5], 'isPredicted': [False]})
+        pd.testing.assert_frame_equal(typed_frame(raw), raw)
+
+
+class CoefficientTableTests(SimpleTestCase):
+    def setUp(self):
+        self.frame = pd.DataFrame({
+            'Year': [2018, 2019, 2021, 2022],
+            'Cebu Solar (GWh)': [1.0, 3.0, 6.0, 8.5],
+            'Cebu Wind (GWh)': [np.nan, np.nan, 5.0, np.nan],
+            'isPredicted': [False] * 4,
+        })
+        self.columns = ['Cebu Solar (GWh)', 'Cebu Wind (GWh)']
+
+    def reference(self, frame, column, year):
+        # The per-request regression the table replaces
+        clean = frame.dropna(subset=[column])
+        if clean.empty or year < clean['Year'].min():
+            return 0.0
+        recorded = clean[clean['Year'] == year]
+        if not recorded.empty:
+            return recorded[column].iloc[0]
+        model = LinearRegression().fit(clean[['Year']].to_numpy(dtype=float), clean[column].to_numpy())
+        return model.predict([[year]])[0]
+
+    def assert_matches_reference(self, frame, columns, years):
+        result = CoefficientTable(frame, columns).evaluate(years)
+        self.assertEqual(result.shape, (len(years), len(columns)))
+        for j, column in enumerate(columns):
+            expected = [self.reference(frame, column, year) for year in years]
+            np.testing.assert_allclose(result[:, j], expected, rtol=1e-9, atol=1e-9)
+
+    def test_matches_regression_before_inside_and_after_range(self):
+        self.assert_matches_reference(self.frame, self.columns, [2010, 2017, 2018, 2019, 2020, 2021, 2022, 2030, 2040])
+
+    def test_single_point_series(self):
+        frame = pd.DataFrame({'Year': [2020], 'Cebu Solar (GWh)': [4.0]})
+        self.assert_matches_reference(frame, ['Cebu Solar (GWh)'], [2019, 2020, 2025])
+        np.testing.assert_allclose(CoefficientTable(frame, ['Cebu Solar (GWh)']).evaluate([2019, 2025])[:, 0], [0.0, 4.0])
+
+    def test_missing_value_for_recorded_year_reads_the_line(self):
+        table = CoefficientTable(self.frame, self.columns)
+        self.assertEqual(table.evaluate([2019])[0, 1], 0.0)
+        self.assertEqual(table.evaluate([2022])[0, 1], 5.0)
+
+    def test_empty_series(self):
+        frame = self.frame.assign(**{'Cebu Wind (GWh)': np.nan})
+        np.testing.assert_array_equal(CoefficientTable(frame, ['Cebu Wind (GWh)']).evaluate([2018, 2040]), [[0.0], [0.0]])
+
+
+class ModelRegistryTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        for name, value in (('MODEL_DIR', self.directory),
+                            ('MANIFEST_PATH', os.path.join(self.directory, 'models_manifest.json'))):
+            patcher = mock.patch.object(model_registry, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.registry = ModelRegistry()
+
+    def artifacts(self):
+        return sorted(f for f in os.listdir(self.directory) if f.endswith('.pkl'))
+
+    def test_save_models_publishes_one_set(self):
+        manifest = self.registry.save_models({'solar': {'w': 1}, 'hydro': {'w': 2}})
+        self.assertEqual(set(manifest['artifacts']), {'Solar (GWh)', 'Hydro (GWh)'})
+        models = self.registry.get_models(['solar', 'hydro', 'wind'])
+        self.assertEqual(models['Solar (GWh)'][0], {'w': 1})
+        self.assertEqual(models['Hydro (GWh)'][0], {'w': 2})
+        # No artifact for wind, so it is left out
+        self.assertNotIn('Wind (GWh)', models)
+
+    def test_new_set_replaces_old_and_keeps_unsaved_targets(self):
+        self.registry.save_models({'solar': {'w': 1}, 'hydro': {'w': 2}})
+        self.registry.save_models({'solar': {'w': 3}})
+        models = self.registry.get_models(['solar', 'hydro'])
+        self.assertEqual(models['Solar (GWh)'][0], {'w': 3})
+        self.assertEqual(models['Hydro (GWh)'][0], {'w': 2})
+        self.assertEqual(self.registry.get_model('solar')[0], {'w': 3})
+
+    def test_prunes_all_but_current_and_previous_set(self):
+        first = self.registry.save_models({'solar': {'w': 1}})
+        second = self.registry.save_models({'solar': {'w': 2}})
+        third = self.registry.save_models({'solar': {'w': 3}})
+        self.assertNotIn(first['artifacts']['Solar (GWh)'], self.artifacts())
+        self.assertEqual(
+            self.artifacts(),
+            sorted([second['artifacts']['Solar (GWh)'], third['artifacts']['Solar (GWh)']])
+        )
+
+    def test_failed_publish_keeps_previous_set(self):
+        self.registry.save_models({'solar': {'w': 1}})
+        before = self.artifacts()
+        with mock.patch.object(model_registry.joblib, 'dump', side_effect=OSError('disk full')):
+            with self.assertRaises(OSError):
+                self.registry.save_models({'solar': {'w': 2}})
+        self.assertEqual(self.artifacts(), before)
+        self.assertEqual(self.registry.get_model('solar')[0], {'w': 1})
+
+    def test_legacy_artifacts_without_manifest(self):
+        model_registry.joblib.dump({'w': 'legacy'}, model_registry.artifact_path('solar'))
+        self.assertEqual(self.registry.get_model('solar')[0], {'w': 'legacy'})
+        self.assertEqual(list(self.registry.get_models(['solar', 'wind'])), ['Solar (GWh)'])
+        with self.assertRaises(FileNotFoundError):
+            self.registry.get_model('wind')
+
+
+class RetrainSchedulerTests(SimpleTestCase):
+    def wait_for_runs(self, scheduler, runs, timeout=5):
+        deadline = time.monotonic() + timeout
+        while scheduler.status()['runs'] < runs:
+            if time.monotonic() > deadline:
+                self.fail(f"Scheduler did not complete {runs} run(s)")
+            time.sleep(0.01)
+
+    def test_burst_of_requests_runs_once(self):
+        calls = []
+        scheduler = RetrainScheduler(lambda: calls.append(1) or {'status': 'success'}, debounce=0.1, max_delay=5)
+        for i in range(5):
+            scheduler.request(f'write {i}')
+        self.wait_for_runs(scheduler, 1)
+        time.sleep(0.2)
+        status = scheduler.status()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(status['requests'], 5)
+        self.assertEqual(status['last_reasons'], [f'write {i}' for i in range(5)])
+        self.assertFalse(status['pending'])
+
+    def test_request_during_run_schedules_one_follow_up(self):
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def train():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return {'status': 'success'}
+
+        scheduler = RetrainScheduler(train, debounce=0.01, max_delay=5)
+        scheduler.request('first')
+        self.assertTrue(started.wait(5))
+        scheduler.request('second')
+        scheduler.request('third')
+        release.set()
+        self.wait_for_runs(scheduler, 2)
+        time.sleep(0.1)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(scheduler.status()['last_reasons'], ['second', 'third'])
+
+    def test_failures_are_counted(self):
+        scheduler = RetrainScheduler(lambda: {'status': 'error', 'message': 'no data'}, debounce=0.01, max_delay=5)
+        scheduler.request('write')
+        self.wait_for_runs(scheduler, 1)
+        self.assertEqual(scheduler.status()['failures'], 1)
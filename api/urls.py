@@ -1,13 +1,25 @@
+from django.conf import settings
 from django.urls import path
+from . import async_views
 from .views import (
     get_renewable_energy_predictions, 
+    batch_renewable_energy_predictions,
+    prediction_cache_stats_view,
+    diagnostics,
+    metrics_view,
+    scenario_predictions,
     peertopeer_predictions, 
+    peertopeer_predictions_range,
     solar_recommendations, 
+    batch_solar_recommendations,
     CreateView, 
     update_record, 
+    bulk_update_records,
     delete_record, 
     recover_record, 
     CreateViewPeertoPeer,
+    BulkCreateView,
+    BulkCreateViewPeertoPeer,
     peertopeer_records,
     peertopeer_record_detail,
     add_recommendation,
@@ -16,11 +28,19 @@ from .views import (
 )
 
 urlpatterns = [
+    path('predictions/batch/', batch_renewable_energy_predictions, name='batch_predictions'),
+    path('predictions/cache/stats/', prediction_cache_stats_view, name='prediction_cache_stats'),
+    path('predictions/scenarios/', scenario_predictions, name='scenario_predictions'),
     path('predictions/<str:target>/', get_renewable_energy_predictions, name='get_predictions'),
     path('peertopeer/', peertopeer_predictions, name='peertopeer_predictions'),
+    path('peertopeer/range/', peertopeer_predictions_range, name='peertopeer_predictions_range'),
     path('solar_recommendations/', solar_recommendations, name='solar_recommendations'),
+    path('solar_recommendations/batch/', batch_solar_recommendations, name='batch_solar_recommendations'),
     path('create/', CreateView.as_view(), name='insert_actual_data'),
     path('create/peertopeer/', CreateViewPeertoPeer.as_view(), name='insert_actual_data'),
+    path('create/bulk/', BulkCreateView.as_view(), name='bulk_insert_actual_data'),
+    path('create/peertopeer/bulk/', BulkCreateViewPeertoPeer.as_view(), name='bulk_insert_peertopeer_data'),
+    path('update/bulk/', bulk_update_records, name='bulk_update_records'),
     path('update/<int:year>/', update_record, name='update_record'),
     path('delete/<int:year>/', delete_record, name='delete_record'),
     path('recover/<int:year>/', recover_record, name='recover_record'),
@@ -28,6 +48,18 @@ urlpatterns = [
     path('peertopeer/records/<str:record_id>', peertopeer_record_detail, name='peertopeer_record_detail'),
     path('add/recommendations', add_recommendation, name='recommendation_records'),
     path('add/recommendations/<str:record_id>', recommendation_record_detail, name='recommendation_record_detail'),
-    path('train_models/', train_models, name='train_models')
+    path('train_models/', train_models, name='train_models'),
+    path('diagnostics/', diagnostics, name='diagnostics'),
+    path('metrics/', metrics_view, name='metrics'),
+]
 
-]
\ No newline at end of file
+# Async read endpoints, mounted only for ASGI deployments (see ASYNC_ROUTES)
+if settings.ASYNC_ROUTES:
+    urlpatterns += [
+        path('async/predictions/<str:target>/', async_views.predictions, name='async_get_predictions'),
+        path('async/peertopeer/', async_views.peertopeer_predictions, name='async_peertopeer_predictions'),
+        path('async/peertopeer/range/', async_views.peertopeer_predictions_range, name='async_peertopeer_predictions_range'),
+        path('async/peertopeer/records/', async_views.peertopeer_records, name='async_peertopeer_records'),
+        path('async/solar_recommendations/', async_views.solar_recommendations, name='async_solar_recommendations'),
+        path('async/recommendations/', async_views.recommendation_records, name='async_recommendation_records'),
+    ]
\ No newline at end of file
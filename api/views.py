@@ -1,20 +1,27 @@
 # filepath: /d:/TUP/ECOPULSE/backend/api/views.py
-from django.http import JsonResponse
+from django.http import JsonResponse, HttpResponse
 from django.views.decorators.http import require_GET
-from linearregression_predictiveanalysis import get_predictions, create, connect_to_mongodb  # Import the function here
-from peertopeer import get_peer_to_predictions, createPeertoPeer, connect_to_mongodb_peertopeer
-from recommendations import get_solar_recommendations, recommendation_records, connect_to_mongodb_recommendation
+from linearregression_predictiveanalysis import get_predictions_with_meta, get_batch_predictions, prediction_cache_stats, sweep_scenarios, create, connect_to_mongodb, bump_data_version, retrain_scheduler, create_many, update_record_by_year, update_records  # Import the function here
+from peertopeer import get_peer_to_predictions, get_peer_to_predictions_range, createPeertoPeer, createPeertoPeerBulk, connect_to_mongodb_peertopeer
+from recommendations import get_solar_recommendations, get_batch_solar_recommendations, recommendation_records, connect_to_mongodb_recommendation
 import logging
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from django.views import View
 import json
+import datetime
 from django.views.decorators.http import require_http_methods
 from bson import ObjectId
-from pymongo import MongoClient
+from .pagination import paginate, paging_requested, open_cursor
+from .streaming import stream_mode, streaming_response, iter_records
+from .bulk import parse_rows, upsert_requested
+from mongo_pool import pool_stats
+from startup import startup_report
+import metrics
+from log_utils import log_payload
+from schema import normalize_document, RowValidationError
 
-# Configure the logger
-logging.basicConfig(level=logging.DEBUG)
+# Logging is configured centrally in backend/settings.py
 logger = logging.getLogger(__name__)
 
 @require_GET
@@ -35,10 +42,10 @@ def get_renewable_energy_predictions(request, target):
             end_year = 2040
         
         # Log the request parameters
-        logger.debug(f"Received request for target: {target}, start_year: {start_year}, end_year: {end_year}")
+        logger.debug("Received request for target: %s, start_year: %s, end_year: %s", target, start_year, end_year)
         
         # Get predictions for the specified target
-        predictions = get_predictions(target, start_year, end_year)
+        predictions, meta = get_predictions_with_meta(target, start_year, end_year)
         
         # Convert the DataFrame to a dictionary for JSON response
         if hasattr(predictions, 'to_dict'):
@@ -48,18 +55,148 @@ def get_renewable_energy_predictions(request, target):
              # It's already a list of dictionaries
              predictions_dict = predictions
         
+        mode = stream_mode(request)
+        if mode:
+            return streaming_response(predictions_dict, mode, key='predictions', envelope={
+                'status': 'success',
+                'target': target,
+                'model_version': meta['model_version']
+            })
+        
         return JsonResponse({
             'status': 'success',
             'target': target,
+            'model_version': meta['model_version'],
             'predictions': predictions_dict
         })
+    except ValueError as e:
+        # Bad year or stream parameters
+        return JsonResponse({
+            'status': 'error',
+            'message': str(e)
+        }, status=400)
+    except Exception as e:
+        logger.error("Error in get_renewable_energy_predictions: %s", e)
+        return JsonResponse({
+            'status': 'error',
+            'message': str(e)
+        }, status=500)
+
+@require_GET
+def batch_renewable_energy_predictions(request):
+    """
+    API endpoint to get predictions for several energy sources in one call.
+    Accepts targets=all (default) or a comma-separated list such as targets=Solar,Wind,
+    and an optional growth_model (mean_growth, last_n, cagr, linear) for the projected features.
+    """
+    try:
+        targets = request.GET.get('targets', 'all')
+        targets = 'all' if targets == 'all' else [t for t in targets.split(',') if t.strip()]
+        start_year = int(request.GET.get('start_year') or 2024)
+        end_year = int(request.GET.get('end_year') or 2040)
+        growth_model = request.GET.get('growth_model')
+        
+        logger.debug("Received batch request for targets: %s, start_year: %s, end_year: %s", targets, start_year, end_year)
+        
+        result = get_batch_predictions(targets, start_year, end_year, growth_model)
+        
+        return JsonResponse({
+            'status': 'success',
+            'start_year': start_year,
+            'end_year': end_year,
+            **result
+        })
+    except ValueError as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': str(e)
+        }, status=400)
+    except Exception as e:
+        logger.error("Error in batch_renewable_energy_predictions: %s", e)
+        return JsonResponse({
+            'status': 'error',
+            'message': str(e)
+        }, status=500)
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def scenario_predictions(request):
+    """
+    API endpoint to forecast every target under many growth scenarios in one call.
+    Body: {"start_year", "end_year", "targets", "growth_model",
+           "grid": {column: [rates]} or "scenarios": [{column: rate}]}
+    """
+    try:
+        data = json.loads(request.body or b'{}')
+        if not isinstance(data, dict):
+            raise ValueError("Request body must be a JSON object")
+        start_year = int(data.get('start_year') or 2024)
+        end_year = int(data.get('end_year') or 2040)
+        
+        logger.debug("Received scenario sweep for %s-%s", start_year, end_year)
+        
+        result = sweep_scenarios(
+            start_year,
+            end_year,
+            targets=data.get('targets', 'all'),
+            grid=data.get('grid'),
+            scenarios=data.get('scenarios'),
+            growth_model=data.get('growth_model')
+        )
+        
+        return JsonResponse({
+            'status': 'success',
+            **result
+        })
+    except FileNotFoundError as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': f"Model not trained: {e}"
+        }, status=503)
+    except ValueError as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': str(e)
+        }, status=400)
     except Exception as e:
-        logger.error(f"Error in get_renewable_energy_predictions: {e}")
+        logger.error("Error in scenario_predictions: %s", e)
         return JsonResponse({
             'status': 'error',
             'message': str(e)
         }, status=500)
 
+@require_GET
+def prediction_cache_stats_view(request):
+    """
+    API endpoint to report hit/miss counters of the forecast memo cache.
+    """
+    return JsonResponse({
+        'status': 'success',
+        'cache': prediction_cache_stats()
+    })
+
+@require_GET
+def diagnostics(request):
+    """
+    API endpoint to report metrics, sampled traces, cache, pool, retrain and
+    warm-up state for the worker that serves the request.
+    """
+    return JsonResponse({
+        'status': 'success',
+        'metrics': metrics.snapshot(),
+        'prediction_cache': prediction_cache_stats(),
+        'mongo_pool': pool_stats(),
+        'retrain_scheduler': retrain_scheduler.status(),
+        'startup': startup_report()
+    })
+
+@require_GET
+def metrics_view(request):
+    """
+    API endpoint to export this worker's metrics in Prometheus text format.
+    """
+    return HttpResponse(metrics.prometheus_text(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 @require_GET
 def peertopeer_predictions(request):
     """
@@ -74,7 +211,7 @@ def peertopeer_predictions(request):
         else:
             year = 2026  # Default year if not provided
 
-        logger.debug(f"Received request with year: {year}")
+        logger.debug("Received request with year: %s", year)
 
         # Get predictions for the specified year
         result = get_peer_to_predictions(year)
@@ -101,7 +238,39 @@ def peertopeer_predictions(request):
             })
             
     except Exception as e:
-        logger.error(f"Error in peertopeer_predictions: {e}")
+        logger.error("Error in peertopeer_predictions: %s", e)
+        return JsonResponse({
+            'status': 'error',
+            'message': str(e)
+        }, status=500)
+
+@require_GET
+def peertopeer_predictions_range(request):
+    """
+    API endpoint to get every subgrid's metrics for a range of years in one call.
+    """
+    try:
+        start_year = int(request.GET.get('start_year') or 2024)
+        end_year = int(request.GET.get('end_year') or 2040)
+
+        logger.debug("Received range request: %s-%s", start_year, end_year)
+
+        result = get_peer_to_predictions_range(start_year, end_year)
+
+        return JsonResponse({
+            'status': 'success',
+            'start_year': result['start_year'],
+            'end_year': result['end_year'],
+            'years': result['years'],
+            'message': result['message']
+        })
+    except ValueError as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': str(e)
+        }, status=400)
+    except Exception as e:
+        logger.error("Error in peertopeer_predictions_range: %s", e)
         return JsonResponse({
             'status': 'error',
             'message': str(e)
@@ -116,7 +285,7 @@ def solar_recommendations(request):
         year = int(request.GET.get('year', 2026))
         budget = float(request.GET.get('budget', 0))
 
-        logger.debug(f"Received request with year: {year}, budget: {budget}")
+        logger.debug("Received request with year: %s, budget: %s", year, budget)
 
         # Get solar recommendations
         recommendations = get_solar_recommendations(year, budget)
@@ -126,7 +295,39 @@ def solar_recommendations(request):
             'recommendations': recommendations
         })
     except Exception as e:
-        logger.error(f"Error in solar_recommendations: {e}")
+        logger.error("Error in solar_recommendations: %s", e)
+        return JsonResponse({
+            'status': 'error',
+            'message': str(e)}, status=500)
+
+@require_GET
+def batch_solar_recommendations(request):
+    """
+    API endpoint to get solar ROI for many years and budgets in one call.
+    Accepts comma-separated lists, e.g. years=2025,2026,2027&budgets=100000,250000,
+    and returns year x budget matrices.
+    """
+    try:
+        years = [int(y) for y in request.GET.get('years', '2026').split(',') if y.strip()]
+        budgets = [float(b) for b in request.GET.get('budgets', '0').split(',') if b.strip()]
+        if not years or not budgets:
+            raise ValueError("years and budgets must not be empty")
+
+        logger.debug("Received batch solar request for %s years and %s budgets", len(years), len(budgets))
+
+        result = get_batch_solar_recommendations(years, budgets)
+        
+        return JsonResponse({
+            'status': 'success',
+            **result
+        })
+    except ValueError as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': str(e)
+        }, status=400)
+    except Exception as e:
+        logger.error("Error in batch_solar_recommendations: %s", e)
         return JsonResponse({
             'status': 'error',
             'message': str(e)}, status=500)
@@ -157,6 +358,46 @@ class CreateViewPeertoPeer(View):
         except Exception as e:
             return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
 
+def _bulk_create(request, create_fn):
+    """
+    Shared body of the bulk ingest endpoints.
+    """
+    try:
+        rows = parse_rows(request)
+        summary = create_fn(rows, upsert=upsert_requested(request))
+        return JsonResponse({
+            'status': 'partial' if summary['errors'] else 'success',
+            'message': f"{len(rows)} row(s) processed",
+            **summary
+        })
+    except RowValidationError as e:
+        return JsonResponse({'status': 'error', 'message': str(e), 'errors': e.errors}, status=400)
+    except ValueError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+    except Exception as e:
+        logger.error("Error in bulk create: %s", e)
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
+
+@method_decorator(csrf_exempt, name='dispatch')
+class BulkCreateView(View):
+    def post(self, request):
+        """
+        API endpoint to insert many rows of actual data (JSON array or NDJSON).
+        Pass ?upsert=true to update rows with an existing Year. Models are
+        retrained once for the whole batch.
+        """
+        return _bulk_create(request, create_many)
+
+@method_decorator(csrf_exempt, name='dispatch')
+class BulkCreateViewPeertoPeer(View):
+    def post(self, request):
+        """
+        API endpoint to insert many rows of peer-to-peer actual data (JSON array or NDJSON).
+        Pass ?upsert=true to update rows with an existing Year. The local cache
+        is updated once for the whole batch.
+        """
+        return _bulk_create(request, createPeertoPeerBulk)
+
 @require_http_methods(["PUT"])
 @csrf_exempt
 def update_record(request, year):
@@ -165,48 +406,45 @@ def update_record(request, year):
     """
     try:
         data = json.loads(request.body)
-        collection = connect_to_mongodb()
         
         # Log the incoming data and year
-        logger.debug(f"Updating record for Year: {year} with data: {data}")
-        
-        # Fetch the existing record
-        existing_record = collection.find_one({"Year": int(year)})
-        if not existing_record:
-            logger.error(f"Record not found for Year: {year}")
-            return JsonResponse({'status': 'error', 'message': 'Record not found'}, status=404)
-        
-        # Calculate the new values for Total Power Generation and Total Renewable Energy
-        total_renewable_energy = (
-            data.get('Geothermal (GWh)', existing_record.get('Geothermal (GWh)', 0)) +
-            existing_record.get('Hydro (GWh)', 0) +
-            existing_record.get('Biomass (GWh)', 0) +
-            existing_record.get('Solar (GWh)', 0) +
-            existing_record.get('Wind (GWh)', 0)
-        )
-        
-        total_power_generation = (
-            total_renewable_energy +
-            data.get('Non-Renewable Energy (GWh)', existing_record.get('Non-Renewable Energy (GWh)', 0))
-        )
+        logger.debug("Updating record for Year: %s with data: %s", year, log_payload(data))
         
-        # Update the data with the new calculated values
-        data['Total Renewable Energy (GWh)'] = total_renewable_energy
-        data['Total Power Generation (GWh)'] = total_power_generation
-        
-        result = collection.update_one(
-            {"Year": int(year)},
-            {"$set": data}
-        )
-        
-        if result.matched_count == 0:
-            logger.error(f"Record not found for Year: {year}")
+        # Apply the changes and recompute the totals in one atomic round trip
+        record = update_record_by_year(year, data)
+        if record is None:
+            logger.error("Record not found for Year: %s", year)
             return JsonResponse({'status': 'error', 'message': 'Record not found'}, status=404)
         
-        logger.info(f"Record updated successfully for Year: {year}")
-        return JsonResponse({'status': 'success', 'message': 'Record updated successfully'})
+        record['_id'] = str(record['_id'])
+        logger.info("Record updated successfully for Year: %s", year)
+        return JsonResponse({'status': 'success', 'message': 'Record updated successfully', 'record': record})
+    except Exception as e:
+        logger.error("Error updating record: %s", e)
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
+
+@require_http_methods(["PUT", "POST"])
+@csrf_exempt
+def bulk_update_records(request):
+    """
+    API endpoint to update many years in one request (JSON array or NDJSON).
+    Every row must include the Year it updates; totals are recomputed server-side.
+    Years without a stored record are listed in 'unmatched'.
+    """
+    try:
+        rows = parse_rows(request)
+        summary = update_records(rows)
+        return JsonResponse({
+            'status': 'partial' if summary['errors'] or summary['unmatched'] else 'success',
+            'message': f"{len(rows)} row(s) processed",
+            **summary
+        })
+    except RowValidationError as e:
+        return JsonResponse({'status': 'error', 'message': str(e), 'errors': e.errors}, status=400)
+    except ValueError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
     except Exception as e:
-        logger.error(f"Error updating record: {e}")
+        logger.error("Error in bulk_update_records: %s", e)
         return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
 
 @require_http_methods(["DELETE"])
@@ -219,21 +457,22 @@ def delete_record(request, year):
         collection = connect_to_mongodb()
         
         # Log the year of the record to be soft deleted
-        logger.debug(f"Soft deleting record for Year: {year}")
+        logger.debug("Soft deleting record for Year: %s", year)
         
         result = collection.update_one(
             {"Year": int(year)},
-            {"$set": {"isDeleted": True}}
+            {"$set": {"isDeleted": True, "updatedAt": datetime.datetime.now(datetime.timezone.utc)}}
         )
         
         if result.matched_count == 0:
-            logger.error(f"Record not found for Year: {year}")
+            logger.error("Record not found for Year: %s", year)
             return JsonResponse({'status': 'error', 'message': 'Record not found'}, status=404)
         
-        logger.info(f"Record soft deleted successfully for Year: {year}")
+        bump_data_version()
+        logger.info("Record soft deleted successfully for Year: %s", year)
         return JsonResponse({'status': 'success', 'message': 'Record soft deleted successfully'})
     except Exception as e:
-        logger.error(f"Error soft deleting record: {e}")
+        logger.error("Error soft deleting record: %s", e)
         return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
 
 @require_http_methods(["PUT"])
@@ -246,23 +485,37 @@ def recover_record(request, year):
         collection = connect_to_mongodb()
         
         # Log the year of the record to be recovered
-        logger.debug(f"Recovering record for Year: {year}")
+        logger.debug("Recovering record for Year: %s", year)
         
         result = collection.update_one(
             {"Year": int(year)},
-            {"$set": {"isDeleted": False}}
+            {"$set": {"isDeleted": False, "updatedAt": datetime.datetime.now(datetime.timezone.utc)}}
         )
         
         if result.matched_count == 0:
-            logger.error(f"Record not found for Year: {year}")
+            logger.error("Record not found for Year: %s", year)
             return JsonResponse({'status': 'error', 'message': 'Record not found'}, status=404)
         
-        logger.info(f"Record recovered successfully for Year: {year}")
+        bump_data_version()
+        logger.info("Record recovered successfully for Year: %s", year)
         return JsonResponse({'status': 'success', 'message': 'Record recovered successfully'})
     except Exception as e:
-        logger.error(f"Error recovering record: {e}")
+        logger.error("Error recovering record: %s", e)
         return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
 
+def peertopeer_records_query(params):
+    """
+    Build the peer-to-peer records filter from startYear and endYear.
+    """
+    start_year = params.get('startYear')
+    end_year = params.get('endYear')
+    
+    query = {}
+    if start_year and end_year:
+        # Documents store the year as Year (see schema.normalize_document)
+        query = {"Year": {"$gte": int(start_year), "$lte": int(end_year)}}
+    return query
+
 # MongoDB API endpoints for peer-to-peer data
 def peertopeer_records(request):
     """
@@ -273,42 +526,34 @@ def peertopeer_records(request):
         collection = connect_to_mongodb_peertopeer()
         
         if request.method == 'GET':
-            # Extract parameters
-            start_year = request.GET.get('startYear')
-            end_year = request.GET.get('endYear')
-            
-            # Build query
-            query = {}
-            if start_year and end_year:
-                # Check both year and Year fields to be compatible with different formats
-                start_year = int(start_year)
-                end_year = int(end_year)
-                query = {
-                    "$or": [
-                        {"year": {"$gte": start_year, "$lte": end_year}},
-                        {"Year": {"$gte": start_year, "$lte": end_year}}
-                    ]
-                }
-            
-            # Fetch records
-            records_cursor = collection.find(query)
-            records = []
-            
-            # Process each record
-            for record in records_cursor:
-                # Convert ObjectId to string for JSON serialization
-                record['_id'] = str(record['_id'])
-                records.append(record)
+            query = peertopeer_records_query(request.GET)
+            
+            # Stream the whole (optionally filtered) listing when requested
+            mode = stream_mode(request)
+            if mode:
+                return streaming_response(iter_records(open_cursor(collection, query, request.GET)), mode,
+                                          envelope={'status': 'success'})
+            
+            # Without limit or after, return the whole listing as before pagination existed
+            if not paging_requested(request.GET):
+                return JsonResponse({
+                    'status': 'success',
+                    'records': list(iter_records(open_cursor(collection, query, request.GET)))
+                })
+            
+            # Fetch one page of records (limit, after, fields)
+            records, next_cursor = paginate(collection, query, request.GET)
             
             # Return records as JSON response
             return JsonResponse({
                 'status': 'success',
-                'records': records
+                'records': records,
+                'next_cursor': next_cursor
             })
             
         elif request.method == 'POST':
             # Parse request body
-            data = json.loads(request.body)
+            data = normalize_document(json.loads(request.body))
             
             # Insert new record
             result = collection.insert_one(data)
@@ -326,10 +571,15 @@ def peertopeer_records(request):
                 'message': 'Method not allowed'
             }, status=405)
             
+    except ValueError as e:
+        # Bad query parameters such as a malformed cursor or limit
+        return JsonResponse({
+            'status': 'error',
+            'message': str(e)
+        }, status=400)
     except Exception as e:
         # Log the error
-        import logging
-        logging.error(f"Error in peertopeer_records: {str(e)}")
+        logger.error("Error in peertopeer_records: %s", e)
         
         # Return error response
         return JsonResponse({
@@ -370,17 +620,17 @@ def peertopeer_record_detail(request, record_id):
             
         elif request.method == 'PUT' or request.method == 'PATCH':
             # Parse request body
-            print(f"Processing PUT request for record {record_id}")
-            print(f"Request body: {request.body}")
+            logger.debug("Processing PUT request for record %s", record_id)
+            logger.debug("Request body: %s", log_payload(request.body))
             
-            data = json.loads(request.body)
+            data = normalize_document(json.loads(request.body))
             
             # Remove _id field if it exists
             if '_id' in data:
                 del data['_id']
             
             # Log the update operation
-            logger.debug(f"Updating record {record_id} with data: {data}")
+            logger.debug("Updating record %s with data: %s", record_id, log_payload(data))
                 
             # Update record
             result = collection.update_one({'_id': object_id}, {'$set': data})
@@ -421,9 +671,9 @@ def peertopeer_record_detail(request, record_id):
             
     except Exception as e:
         # Log the error
-        logger.error(f"Error in peertopeer_record_detail: {str(e)}")
-        logger.error(f"Request method: {request.method}")
-        logger.error(f"Request headers: {request.headers}")
+        logger.error("Error in peertopeer_record_detail: %s", e)
+        logger.error("Request method: %s", request.method)
+        logger.error("Request headers: %s", log_payload(dict(request.headers)))
         
         # Return error response
         return JsonResponse({
@@ -431,6 +681,17 @@ def peertopeer_record_detail(request, record_id):
             'message': str(e)
         }, status=500)
         
+def recommendation_records_query(params):
+    """
+    Build the recommendation records filter from an optional year.
+    """
+    year = params.get('year')
+    
+    query = {}
+    if year:
+        query["Year"] = int(year)
+    return query
+
 @csrf_exempt
 def add_recommendation(request):
     """
@@ -440,36 +701,34 @@ def add_recommendation(request):
         collection = connect_to_mongodb_recommendation()
         
         if request.method == 'GET':
-            # Extract parameters for potential filtering
-            year = request.GET.get('year')
+            query = recommendation_records_query(request.GET)
             
-            # Build query
-            query = {}
-            if year:
-                query["Year"] = int(year)
+            # Stream the whole (optionally filtered) listing when requested
+            mode = stream_mode(request)
+            if mode:
+                return streaming_response(iter_records(open_cursor(collection, query, request.GET)), mode,
+                                          envelope={'status': 'success'})
             
-            # Fetch records
-            records_cursor = collection.find(query)
-            records = []
+            # Without limit or after, return the whole listing as before pagination existed
+            if not paging_requested(request.GET):
+                return JsonResponse({
+                    'status': 'success',
+                    'records': list(iter_records(open_cursor(collection, query, request.GET)))
+                })
             
-            # Process each record
-            for record in records_cursor:
-                # Convert ObjectId to string for JSON serialization
-                record['_id'] = str(record['_id'])
-                records.append(record)
+            # Fetch one page of records (limit, after, fields)
+            records, next_cursor = paginate(collection, query, request.GET)
             
             return JsonResponse({
                 'status': 'success',
-                'records': records
+                'records': records,
+                'next_cursor': next_cursor
             })
             
         elif request.method == 'POST':
             # Parse request body
-            data = json.loads(request.body)
-            
-            # Ensure Year is stored as integer
-            if 'Year' in data:
-                data['Year'] = int(data['Year'])
+            # Store canonical field names and real numbers
+            data = normalize_document(json.loads(request.body))
                 
             # Insert new record
             result = collection.insert_one(data)
@@ -487,9 +746,15 @@ def add_recommendation(request):
                 'message': 'Method not allowed'
             }, status=405)
             
+    except ValueError as e:
+        # Bad query parameters such as a malformed cursor or limit
+        return JsonResponse({
+            'status': 'error',
+            'message': str(e)
+        }, status=400)
     except Exception as e:
         # Log the error
-        logger.error(f"Error in recommendation_records: {str(e)}")
+        logger.error("Error in recommendation_records: %s", e)
         
         # Return error response
         return JsonResponse({
@@ -530,19 +795,15 @@ def recommendation_record_detail(request, record_id):
             
         elif request.method == 'PUT' or request.method == 'PATCH':
             # Parse request body
-            logger.debug(f"Processing PUT request for recommendation record {record_id}")
-            data = json.loads(request.body)
+            logger.debug("Processing PUT request for recommendation record %s", record_id)
+            data = normalize_document(json.loads(request.body))
             
             # Remove _id field if it exists
             if '_id' in data:
                 del data['_id']
             
-            # Ensure Year is stored as integer
-            if 'Year' in data:
-                data['Year'] = int(data['Year'])
-            
             # Log the update operation
-            logger.debug(f"Updating recommendation record {record_id} with data: {data}")
+            logger.debug("Updating recommendation record %s with data: %s", record_id, log_payload(data))
                 
             # Update record
             result = collection.update_one({'_id': object_id}, {'$set': data})
@@ -583,7 +844,7 @@ def recommendation_record_detail(request, record_id):
             
     except Exception as e:
         # Log the error
-        logger.error(f"Error in recommendation_record_detail: {str(e)}")
+        logger.error("Error in recommendation_record_detail: %s", e)
         
         # Return error response
         return JsonResponse({
@@ -608,7 +869,7 @@ def train_models(request):
             'models': result
         })
     except Exception as e:
-        logger.error(f"Error in train_models: {e}")
+        logger.error("Error in train_models: %s", e)
         return JsonResponse({
             'status': 'error',
             'message': f"Error training models: {str(e)}"
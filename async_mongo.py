@@ -0,0 +1,83 @@
+import os
+import asyncio
+import logging
+import weakref
+from dotenv import load_dotenv
+from mongo_pool import (
+    DATABASE_NAME,
+    MAX_POOL_SIZE,
+    MIN_POOL_SIZE,
+    MAX_IDLE_TIME_MS,
+    SOCKET_TIMEOUT_MS,
+)
+
+# Load environment variables from .env file
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Motor clients are bound to the event loop they were first used on. Keyed
+# weakly on the loop itself, so a client goes away with its loop instead of
+# being returned for an unrelated loop that reuses the same id().
+_clients = weakref.WeakKeyDictionary()
+_clients_pid = None
+
+
+def _close_client(client):
+    try:
+        client.close()
+    except Exception as e:
+        logger.debug("Error closing async MongoDB client: %s", e)
+
+
+def get_async_client():
+    """
+    Return the Motor client for this process and event loop, creating it on first use.
+    Uses the same pool settings as the synchronous client in mongo_pool.
+
+    Only one long-lived loop per process is expected, i.e. an ASGI server;
+    the async routes are not mounted under WSGI (see ASYNC_ROUTES in
+    backend/settings.py), where Django would run each request on a new loop.
+    A client is closed when its loop is garbage collected.
+    """
+    global _clients, _clients_pid
+    if _clients_pid != os.getpid():
+        # Clients do not survive fork
+        _clients = weakref.WeakKeyDictionary()
+        _clients_pid = os.getpid()
+
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is not None:
+        return client
+
+    # Imported here so the synchronous code paths do not require motor
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    mongo_url = os.getenv("MONGO_URL")
+    if not mongo_url:
+        logger.error("MONGO_URL environment variable is not set")
+        raise ValueError("MONGO_URL environment variable is not set")
+
+    client = AsyncIOMotorClient(
+        mongo_url,
+        maxPoolSize=MAX_POOL_SIZE,
+        minPoolSize=MIN_POOL_SIZE,
+        maxIdleTimeMS=MAX_IDLE_TIME_MS,
+        serverSelectionTimeoutMS=5000,
+        connectTimeoutMS=5000,
+        socketTimeoutMS=SOCKET_TIMEOUT_MS,
+    )
+    _clients[loop] = client
+    weakref.finalize(loop, _close_client, client)
+    logger.info("Created async MongoDB client for process %s (maxPoolSize=%s)", _clients_pid, MAX_POOL_SIZE)
+    return client
+
+
+def get_async_collection(collection_name):
+    """
+    Return a Motor collection from the ecopulse database.
+    Server selection waits are bounded by the client timeouts instead of
+    sleeping between retries, so a slow cluster never blocks the event loop.
+    """
+    return get_async_client()[DATABASE_NAME][collection_name]
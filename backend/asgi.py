@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+# Mount the async/ endpoints, which need one long-lived event loop per process
+os.environ.setdefault('ASYNC_ROUTES', 'True')
 
 application = get_asgi_application()
@@ -179,27 +179,63 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
-# LOGGING = {
-#     'version': 1,
-#     'disable_existing_loggers': False,
-#     'handlers': {
-#         'console': {
-#             'class': 'logging.StreamHandler',
-#         },
-#         'file': {
-#             'class': 'logging.FileHandler',
-#             'filename': 'debug.log',
-#         },
-#     },
-#     'root': {
-#         'handlers': ['console', 'file'],
-#         'level': 'DEBUG',
-#     },
-#     'loggers': {
-#         'django': {
-#             'handlers': ['console', 'file'],
-#             'level': 'DEBUG',
-#             'propagate': True,
-#         },
-#     },
-# }
+# The async/ endpoints are only mounted when served over ASGI; backend/asgi.py
+# turns this on. Under WSGI, Django runs every async view on a fresh event
+# loop, so the Motor client and its pool could not be reused between requests.
+ASYNC_ROUTES = os.getenv('ASYNC_ROUTES', 'False') == 'True'
+
+# Logging
+# Application modules log through logging.getLogger(__name__) and never call
+# basicConfig; levels are set here. LOG_LEVEL sets the default and
+# LOG_LEVEL_<MODULE> (e.g. LOG_LEVEL_PEERTOPEER=DEBUG) overrides one module.
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+
+LOGGED_MODULES = [
+    'api',
+    'linearregression_predictiveanalysis',
+    'peertopeer',
+    'recommendations',
+    'model_registry',
+    'mongo_pool',
+    'retrain_scheduler',
+    'columnar_store',
+    'startup',
+    'async_mongo',
+    'mongo_indexes',
+    'schema',
+    'metrics',
+    'forecast_cache',
+    'projection',
+]
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'standard': {
+            'format': '%(asctime)s %(levelname)s [%(process)d] %(name)s: %(message)s',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'standard',
+        },
+    },
+    'root': {
+        'handlers': ['console'],
+        'level': LOG_LEVEL,
+    },
+    'loggers': {
+        'django': {
+            'handlers': ['console'],
+            'level': os.getenv('DJANGO_LOG_LEVEL', 'INFO').upper(),
+            'propagate': False,
+        },
+        **{
+            module: {'level': os.getenv(f'LOG_LEVEL_{module.upper()}', LOG_LEVEL).upper()}
+            for module in LOGGED_MODULES
+        },
+    },
+}
@@ -0,0 +1,167 @@
+import os
+import re
+import json
+import glob
+import logging
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows development machines
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Array files of one stored version, e.g. values-12.npy
+VERSION_FILE = re.compile(r'^(?:values|flags)-(\d+)\.npy$')
+
+# Attempts made by load() when a newer commit removes the arrays it is opening
+LOAD_ATTEMPTS = 3
+
+
+class ColumnarStore:
+    """
+    Numeric table persisted as NumPy arrays in a directory.
+
+    Layout:
+        values-<version>.npy        float64 (rows x columns), memory-mapped on load
+        flags-<version>.npy         bool isPredicted per row
+        meta.json                   {version, columns, rows, has_flags}
+
+    Each write produces a new version and then replaces meta.json, so readers
+    always see a complete set of arrays. Writers serialize on a lock file;
+    readers take no lock. The previous version is kept on disk so a reader
+    that read meta.json just before a commit can still open its arrays, and
+    load() retries if even that version is gone.
+
+    append() rewrites the whole table as a new version, so it costs O(rows);
+    the table is small (one row per year) and this keeps loads zero-copy.
+    """
+    def __init__(self, directory, flag_column='isPredicted'):
+        self.directory = directory
+        self.flag_column = flag_column
+        self.meta_path = os.path.join(directory, 'meta.json')
+        self.lock_path = os.path.join(directory, '.lock')
+
+    def exists(self):
+        return os.path.exists(self.meta_path)
+
+    def signature(self):
+        """
+        Cheap change marker for hot reloads; None when the store is empty.
+        """
+        try:
+            stat = os.stat(self.meta_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _read_meta(self):
+        with open(self.meta_path) as f:
+            return json.load(f)
+
+    @contextmanager
+    def _write_lock(self):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.lock_path, 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _arrays(self, meta, mmap_mode='r'):
+        version = meta['version']
+        values = np.load(os.path.join(self.directory, f'values-{version}.npy'), mmap_mode=mmap_mode)
+        flags = np.load(os.path.join(self.directory, f'flags-{version}.npy'), mmap_mode=mmap_mode)
+        return values, flags
+
+    def load(self):
+        """
+        Return (frame, signature). Numeric columns are backed by read-only memory maps.
+        """
+        for attempt in range(LOAD_ATTEMPTS):
+            signature = self.signature()
+            meta = self._read_meta()
+            try:
+                values, flags = self._arrays(meta)
+                break
+            except FileNotFoundError:
+                # Two commits landed between reading meta.json and opening the arrays
+                if attempt == LOAD_ATTEMPTS - 1:
+                    raise
+                logger.debug("Columnar store %s moved past version %s; retrying", self.directory, meta['version'])
+        frame = pd.DataFrame(values, columns=meta['columns'], copy=False)
+        if meta.get('has_flags'):
+            frame[self.flag_column] = np.asarray(flags, dtype=bool)
+        return frame, signature
+
+    def _commit(self, version, columns, values, flags, has_flags):
+        np.save(os.path.join(self.directory, f'values-{version}.npy'), values)
+        np.save(os.path.join(self.directory, f'flags-{version}.npy'), flags)
+        meta = {'version': version, 'columns': columns, 'rows': int(values.shape[0]), 'has_flags': has_flags}
+        tmp_path = self.meta_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self.meta_path)
+
+        # Drop versions older than the previous one; open memory maps keep their data until closed
+        for path in glob.glob(os.path.join(self.directory, '*-*.npy')):
+            match = VERSION_FILE.match(os.path.basename(path))
+            if match and int(match.group(1)) < version - 1:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def _split(self, frame):
+        has_flags = self.flag_column in frame.columns
+        numeric = frame.drop(columns=[self.flag_column], errors='ignore').select_dtypes(include=['number', 'bool'])
+        if has_flags:
+            flags = frame[self.flag_column].to_numpy(dtype=bool)
+        else:
+            flags = np.zeros(len(frame), dtype=bool)
+        return list(numeric.columns), numeric.to_numpy(dtype=float), flags, has_flags
+
+    def write(self, frame):
+        """
+        Replace the stored table with a typed frame.
+        """
+        columns, values, flags, has_flags = self._split(frame)
+        with self._write_lock():
+            version = self._read_meta()['version'] + 1 if self.exists() else 1
+            self._commit(version, columns, values, flags, has_flags)
+        logger.info("Wrote %s rows to columnar store %s", len(values), self.directory)
+
+    def append(self, frame):
+        """
+        Append typed rows to the stored table without re-reading the source.
+        Columns not seen before are added and back-filled with NaN.
+        """
+        new_columns, new_values, new_flags, new_has_flags = self._split(frame)
+        with self._write_lock():
+            if not self.exists():
+                self._commit(1, new_columns, new_values, new_flags, new_has_flags)
+                return
+            meta = self._read_meta()
+            values, flags = self._arrays(meta)
+
+            columns = list(meta['columns'])
+            columns += [c for c in new_columns if c not in columns]
+            combined = np.full((values.shape[0] + new_values.shape[0], len(columns)), np.nan)
+            combined[:values.shape[0], :len(meta['columns'])] = values
+            positions = [columns.index(c) for c in new_columns]
+            combined[values.shape[0]:, positions] = new_values
+
+            self._commit(
+                meta['version'] + 1,
+                columns,
+                combined,
+                np.concatenate([np.asarray(flags, dtype=bool), new_flags]),
+                meta.get('has_flags', False) or new_has_flags
+            )
+        logger.info("Appended %s rows to columnar store %s", len(new_values), self.directory)
@@ -0,0 +1,8 @@
+import os
+
+
+def post_worker_init(worker):
+    # Load data and models before the worker accepts requests; set ECOPULSE_WARMUP=0 to skip
+    if os.getenv("ECOPULSE_WARMUP", "1") != "0":
+        from startup import warm_up
+        warm_up()
@@ -1,49 +1,106 @@
 import os
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_absolute_error, mean_squared_error
-import joblib
 import logging
-from pymongo import MongoClient
-from dotenv import load_dotenv
-from pymongo.errors import ConnectionFailure
+import asyncio
+import threading
 import time
+import datetime
+import copy
+import weakref
+from dotenv import load_dotenv
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+from mongo_pool import get_collection
+from model_registry import TARGETS, get_model, get_models, resolve_target, registry
+from retrain_scheduler import RetrainScheduler
+from forecast_cache import ForecastCache
+from projection import DEFAULT_GROWTH_MODEL, fit_growth, project
+from metrics import gauge, timer
+from log_utils import log_payload
+from schema import normalize_document, validate_rows, write_rows, stored_years, RowValidationError
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Configure the logger
-logging.basicConfig(level=logging.INFO)
+# Logging is configured centrally in backend/settings.py
 logger = logging.getLogger(__name__)
 
 # MongoDB connection
-MONGO_URI = os.getenv("MONGO_URL")  # Load MongoDB URI from environment variables
-DATABASE_NAME = "ecopulse"  # Replace with your database name
 COLLECTION_NAME = "predictiveAnalysis"  # Replace with your collection name
 
+# Model inputs and outputs
+FEATURES = ['Year', 'Population (in millions)', 'Non-Renewable Energy (GWh)']
+TARGET_COLUMNS = list(TARGETS.values())
+
 def connect_to_mongodb(retries=3, delay=5):
     """
-    Connect to MongoDB Atlas and return the collection.
+    Return the predictiveAnalysis collection from the shared MongoDB client.
     Retries the connection in case of failure.
     """
-    for attempt in range(retries):
-        try:
-            client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
-            db = client[DATABASE_NAME]
-            collection = db[COLLECTION_NAME]
-            # Attempt to ping the server to check the connection
-            client.admin.command('ping')
-            logger.debug("Connected to MongoDB Atlas successfully.")
-            return collection
-        except ConnectionFailure as e:
-            logger.error(f"Error connecting to MongoDB (attempt {attempt + 1}): {e}")
-            if attempt < retries - 1:
-                time.sleep(delay)
-            else:
-                raise
+    return get_collection(COLLECTION_NAME, retries=retries, delay=delay)
+
+# Process-local cache of the preprocessed predictiveAnalysis frame
+DATA_CACHE_PROBE_INTERVAL = float(os.getenv("DATA_CACHE_PROBE_INTERVAL", "2"))  # Seconds to trust the cache without probing
+DATA_CACHE_MAX_AGE = float(os.getenv("DATA_CACHE_MAX_AGE", "300"))  # Seconds before a forced full reload
+_data_lock = threading.Lock()  # Guards _data_cache and _data_version; never held across I/O
+_fetch_lock = threading.Lock()  # One synchronous reload at a time
+_async_fetch_locks = weakref.WeakKeyDictionary()  # One async reload at a time, per event loop
+_data_version = 0  # Bumped by every write made through this process
+_data_cache = {
+    'df': None,
+    'generation': 0,
+    'version': None,
+    'probe': None,
+    'loaded_at': 0.0,
+    'probed_at': 0.0,
+}
+
+# Memoized forecasts, keyed by target, year range, data generation and model version
+forecast_cache = ForecastCache()
+
+def bump_data_version():
+    """
+    Mark the cached predictiveAnalysis frame as stale after a write.
+    """
+    global _data_version
+    with _data_lock:
+        _data_version += 1
+    forecast_cache.clear()
+
+def _current_model_version(target_column):
+    """
+    Return the version of the model currently serving a target, or None.
+    """
+    try:
+        _, version = get_model(target_column)
+        return version
+    except (FileNotFoundError, ValueError):
+        return None
+
+def prediction_cache_stats():
+    """
+    Return hit/miss counters for the forecast memo cache.
+    """
+    return forecast_cache.stats()
+
+def _probe_collection(collection):
+    """
+    Cheap change probe: the newest _id catches inserts, the newest updatedAt catches updates.
+    """
+    newest = collection.find_one({}, projection={'_id': 1}, sort=[('_id', -1)])
+    updated = collection.find_one(
+        {'updatedAt': {'$exists': True}},
+        projection={'updatedAt': 1},
+        sort=[('updatedAt', -1)]
+    )
+    return (
+        newest['_id'] if newest else None,
+        updated['updatedAt'] if updated else None
+    )
 
 def create(data):
     """
@@ -51,89 +108,384 @@ def create(data):
     """
     try:
         collection = connect_to_mongodb()
+        # Store canonical field names and real numbers
+        data = normalize_document(data)
         # Add the isPredicted flag for actual data
         data['isPredicted'] = False
+        data['updatedAt'] = datetime.datetime.now(datetime.timezone.utc)
         collection.insert_one(data)
+        bump_data_version()
         logger.info("Actual data inserted successfully.")
-        train_and_save_models()  # Call to train models after inserting data
+        schedule_retrain("insert")  # Retrain in the background once the burst of writes settles
     except Exception as e:
-        logger.error(f"Error inserting actual data: {e}")
+        logger.error("Error inserting actual data: %s", e)
         raise
 
-def load_and_preprocess_data():
+def create_many(rows, upsert=False):
     """
-    Load the dataset from MongoDB and preprocess it by handling missing values.
+    Insert (or upsert on Year) many actual-data rows, then refresh once.
+    All rows are validated before anything is written; invalid batches raise
+    RowValidationError. A single retrain is scheduled for the whole batch.
+
+    Parameters:
+        rows (list): Raw row dicts
+        upsert (bool): Update existing Years instead of inserting duplicates
+
+    Returns:
+        dict: inserted, upserted and modified counts and per-row write errors
+    """
+    docs, errors = validate_rows(rows)
+    if errors:
+        raise RowValidationError(errors)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    for doc in docs:
+        doc['isPredicted'] = False
+        doc['updatedAt'] = now
+
+    collection = connect_to_mongodb()
+    summary = write_rows(collection, docs, upsert=upsert)
+    logger.info("Bulk %s: %s inserted, %s upserted, %s modified, %s failed",
+                "upsert" if upsert else "insert", summary['inserted'], summary['upserted'],
+                summary['modified'], len(summary['errors']))
+    if summary['inserted'] or summary['upserted'] or summary['modified']:
+        bump_data_version()
+        schedule_retrain("bulk insert")
+    return summary
+
+# Derived totals kept on each predictiveAnalysis record; the renewable
+# total sums the model targets (TARGET_COLUMNS)
+TOTAL_RENEWABLE = 'Total Renewable Energy (GWh)'
+TOTAL_GENERATION = 'Total Power Generation (GWh)'
+
+def record_update_pipeline(data):
+    """
+    Build an update pipeline that applies data and then recomputes the totals
+    server-side from the merged document, so the read and write happen in one
+    atomic operation. Incoming values are wrapped in $literal; totals sent by
+    the client are ignored because they are always derived.
+    """
+    fields = {
+        key: {'$literal': value} for key, value in data.items()
+        if key not in ('_id', 'Year', TOTAL_RENEWABLE, TOTAL_GENERATION)
+    }
+    fields['updatedAt'] = {'$literal': datetime.datetime.now(datetime.timezone.utc)}
+    return [
+        {'$set': fields},
+        {'$set': {TOTAL_RENEWABLE: {'$add': [{'$ifNull': [f'${col}', 0]} for col in TARGET_COLUMNS]}}},
+        {'$set': {TOTAL_GENERATION: {'$add': [f'${TOTAL_RENEWABLE}', {'$ifNull': ['$Non-Renewable Energy (GWh)', 0]}]}}},
+    ]
+
+def update_record_by_year(year, data):
+    """
+    Update the record for a year and recompute its totals in one round trip.
+    Returns the updated document, or None when no record has that Year.
+    """
+    collection = connect_to_mongodb()
+    record = collection.find_one_and_update(
+        {'Year': int(year)},
+        record_update_pipeline(normalize_document(data)),
+        return_document=ReturnDocument.AFTER
+    )
+    if record is not None:
+        bump_data_version()
+        schedule_retrain("update")
+    return record
+
+def update_records(rows):
+    """
+    Apply many per-year updates with one bulk_write, then refresh once.
+    Rows are validated like bulk inserts (see validate_rows) and each carries
+    the Year it updates. Years without a stored record are reported in
+    'unmatched' and not sent.
+
+    Returns:
+        dict: matched and modified counts, unmatched Years and per-row write errors
+    """
+    docs, errors = validate_rows(rows)
+    if errors:
+        raise RowValidationError(errors)
+
+    collection = connect_to_mongodb()
+    stored = stored_years(collection, [doc['Year'] for doc in docs])
+    sent = [i for i, doc in enumerate(docs) if doc['Year'] in stored]
+    summary = {
+        'matched': 0,
+        'modified': 0,
+        'unmatched': [doc['Year'] for doc in docs if doc['Year'] not in stored],
+        'errors': [],
+    }
+    if sent:
+        requests = [UpdateOne({'Year': docs[i]['Year']}, record_update_pipeline(docs[i])) for i in sent]
+        try:
+            result = collection.bulk_write(requests, ordered=False)
+            summary['matched'] = result.matched_count
+            summary['modified'] = result.modified_count
+        except BulkWriteError as e:
+            summary['matched'] = e.details.get('nMatched', 0)
+            summary['modified'] = e.details.get('nModified', 0)
+            summary['errors'] = [
+                {'row': sent[error['index']], 'field': None, 'message': error.get('errmsg')}
+                for error in e.details.get('writeErrors', [])
+            ]
+    if summary['unmatched']:
+        logger.info("Bulk update: no record for Years %s", summary['unmatched'])
+    if summary['modified']:
+        bump_data_version()
+        schedule_retrain("bulk update")
+    return summary
+
+def preprocess_data(data):
+    """
+    Build the preprocessed DataFrame from raw predictiveAnalysis documents.
+    """
+    # Convert the data to a pandas DataFrame
+    df = pd.DataFrame(data)
+    # Bookkeeping field for the cache probe, not part of the dataset
+    df = df.drop(columns=['updatedAt'], errors='ignore')
+    # Numeric fields are stored as numbers (see schema.normalize_document)
+    numeric_columns = [
+        "Total Renewable Energy (GWh)",
+        "Geothermal (GWh)",
+        "Hydro (GWh)",
+        "Biomass (GWh)",
+        "Solar (GWh)",
+        "Wind (GWh)",
+        "Non-Renewable Energy (GWh)",
+        "Total Power Generation (GWh)",
+        "Population (in millions)",
+        "Gross Domestic Product"
+    ]
+    legacy_columns = [col for col in numeric_columns if df[col].dtype == 'object']
+    if legacy_columns:
+        # Documents written before ingest normalization still hold numeric strings
+        logger.warning("Unnormalized numeric columns %s; run manage.py normalize_schema", legacy_columns)
+        for col in legacy_columns:
+            df[col] = pd.to_numeric(df[col].astype(str).str.replace(",", ""), errors="coerce")
+    # Forward fill missing values
+    df = df.ffill()  # Use ffill() instead of fillna(method="ffill")
+    # Ensure coordinates are included
+    if 'Latitude' in df.columns and 'Longitude' in df.columns:
+        df['coordinates'] = df.apply(lambda row: {'lat': row['Latitude'], 'lng': row['Longitude']}, axis=1)
+    else:
+        df['coordinates'] = None
+    return df
+
+def _cached_frame(version, now, probe=None, use_cache=True):
+    """
+    Return (df, generation) from the cache when it can be served without a
+    reload, else None. Without a probe the cache is trusted for
+    DATA_CACHE_PROBE_INTERVAL; with one, for as long as the probe matches.
+    """
+    cached = _data_cache
+    if not use_cache or cached['df'] is None or cached['version'] != version:
+        return None
+    if probe is None:
+        if now - cached['probed_at'] < DATA_CACHE_PROBE_INTERVAL:
+            return cached['df'], cached['generation']
+        return None
+    if cached['probe'] == probe and now - cached['loaded_at'] < DATA_CACHE_MAX_AGE:
+        cached['probed_at'] = now
+        return cached['df'], cached['generation']
+    return None
+
+def _store_frame(df, probe, version, now):
+    with _data_lock:
+        _data_cache.update({
+            'df': df,
+            'generation': _data_cache['generation'] + 1,
+            'version': version,
+            'probe': probe,
+            'loaded_at': now,
+            'probed_at': now,
+        })
+        generation = _data_cache['generation']
+    logger.debug("Reloaded predictiveAnalysis cache with %s rows", len(df))
+    return df, generation
+
+def _async_fetch_lock():
+    loop = asyncio.get_running_loop()
+    with _data_lock:
+        lock = _async_fetch_locks.get(loop)
+        if lock is None:
+            lock = _async_fetch_locks[loop] = asyncio.Lock()
+    return lock
+
+def load_data_with_version(use_cache=True):
+    """
+    Return the preprocessed DataFrame and its cache generation.
+    The generation changes whenever the frame is rebuilt, so it can key derived results.
+    The returned frame is shared between requests and must not be modified in place.
     """
     try:
+        now = time.monotonic()
+        version = _data_version
+        cached = _cached_frame(version, now, use_cache=use_cache)
+        if cached is not None:
+            return cached
+
         collection = connect_to_mongodb()
-        # Fetch all documents from the collection
-        data = list(collection.find({}))
-        logger.debug(f"Fetched data: {data}")  # Add detailed logging
-        # Convert the data to a pandas DataFrame
-        df = pd.DataFrame(data)
-        # Convert numeric fields from strings to numbers
-        numeric_columns = [
-            "Total Renewable Energy (GWh)",
-            "Geothermal (GWh)",
-            "Hydro (GWh)",
-            "Biomass (GWh)",
-            "Solar (GWh)",
-            "Wind (GWh)",
-            "Non-Renewable Energy (GWh)",
-            "Total Power Generation (GWh)",
-            "Population (in millions)",
-            "Gross Domestic Product"
-        ]
-        for col in numeric_columns:
-            if df[col].dtype == 'object':
-                df[col] = pd.to_numeric(df[col].str.replace(",", ""), errors="coerce")
-        # Forward fill missing values
-        df = df.ffill()  # Use ffill() instead of fillna(method="ffill")
-        # Ensure coordinates are included
-        if 'Latitude' in df.columns and 'Longitude' in df.columns:
-            df['coordinates'] = df.apply(lambda row: {'lat': row['Latitude'], 'lng': row['Longitude']}, axis=1)
-        else:
-            df['coordinates'] = None
-        return df
+        probe = _probe_collection(collection)
+        with _fetch_lock:
+            # Another thread may have reloaded while this one waited
+            cached = _cached_frame(version, now, probe, use_cache)
+            if cached is not None:
+                return cached
+
+            # Fetch all documents from the collection
+            data = list(collection.find({}))
+            logger.debug("Fetched data: %s", log_payload(data))
+            return _store_frame(preprocess_data(data), probe, version, now)
     except Exception as e:
-        logger.error(f"Error loading and preprocessing data: {e}")
+        logger.error("Error loading and preprocessing data: %s", e)
         raise
 
-def train_model(df, features, target):
+async def load_data_with_version_async(collection, run_cpu, use_cache=True):
+    """
+    Async variant of load_data_with_version for the Motor-backed views.
+    The change probe and the fetch are awaited on collection, a Motor
+    collection, and preprocessing runs through run_cpu, so neither blocks
+    the event loop. Shares the cache with the synchronous path; concurrent
+    misses on one loop wait for a single reload instead of each fetching.
+    """
+    now = time.monotonic()
+    version = _data_version
+    cached = _cached_frame(version, now, use_cache=use_cache)
+    if cached is not None:
+        return cached
+
+    newest = await collection.find_one({}, projection={'_id': 1}, sort=[('_id', -1)])
+    updated = await collection.find_one(
+        {'updatedAt': {'$exists': True}},
+        projection={'updatedAt': 1},
+        sort=[('updatedAt', -1)]
+    )
+    probe = (newest['_id'] if newest else None, updated['updatedAt'] if updated else None)
+    async with _async_fetch_lock():
+        # Another request on this loop may have reloaded while this one waited
+        cached = _cached_frame(version, now, probe, use_cache)
+        if cached is not None:
+            return cached
+
+        data = await collection.find({}).to_list(length=None)
+        df = await run_cpu(preprocess_data, data)
+        return _store_frame(df, probe, version, now)
+
+def load_and_preprocess_data(use_cache=True):
+    """
+    Load the dataset from MongoDB and preprocess it by handling missing values.
+    Served from the process-local cache unless the collection changed.
+    """
+    df, _ = load_data_with_version(use_cache=use_cache)
+    return df
+
+def _fit_targets(X, Y, targets):
+    """
+    Fit every target in one multi-output least-squares solve on a shared
+    design matrix and split the result back into per-target models that
+    predict exactly like a LinearRegression fitted on that target alone with
+    the same split. Returns (models, metrics).
+    """
+    X_train, X_test, Y_train, Y_test = train_test_split(X, Y, test_size=0.2, random_state=42)
+    combined = LinearRegression()
+    with timer('model_fit'):
+        combined.fit(X_train, Y_train)
+    Y_pred = combined.predict(X_test)
+    maes = mean_absolute_error(Y_test, Y_pred, multioutput='raw_values')
+    mses = mean_squared_error(Y_test, Y_pred, multioutput='raw_values')
+
+    models = {}
+    metrics = {}
+    for i, target in enumerate(targets):
+        model = LinearRegression()
+        model.coef_ = combined.coef_[i].copy()
+        model.intercept_ = float(combined.intercept_[i])
+        model.rank_ = combined.rank_
+        model.singular_ = combined.singular_
+        model.n_features_in_ = combined.n_features_in_
+        if hasattr(combined, 'feature_names_in_'):
+            model.feature_names_in_ = combined.feature_names_in_
+        models[target] = model
+        metrics[target] = {'mae': float(maes[i]), 'mse': float(mses[i])}
+        gauge('model_mae', metrics[target]['mae'], target=target)
+        gauge('model_mse', metrics[target]['mse'], target=target)
+        logger.info("Model Evaluation for %s: MAE=%s, MSE=%s", target, maes[i], mses[i])
+    return models, metrics
+
+def train_models(df, features, targets):
     """
-    Train a linear regression model for a given target variable.
+    Train a linear regression model for every target in as few passes as possible.
+    Targets that have a value on every row with complete features share the
+    design matrix and train/test split, so one multi-output fit serves them all.
+    A target with missing values is fitted alone on its own valid rows, and if
+    the shared fit fails each target is retried alone, so one bad column only
+    loses its own model. Targets that cannot be fitted are logged and left out.
+    Returns (models, metrics), both keyed by target.
     """
-    X = df[features]
-    y = df[target]
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-    model = LinearRegression()
-    model.fit(X_train, y_train)
-    y_pred = model.predict(X_test)
-    mae = mean_absolute_error(y_test, y_pred)
-    mse = mean_squared_error(y_test, y_pred)
-    print(f'\nModel Evaluation for {target}:\nMean Absolute Error (MAE): {mae}\nMean Squared Error (MSE): {mse}')
-    return model
+    rows = df[features].notna().all(axis=1)
+    shared = [target for target in targets if df.loc[rows, target].notna().all()]
+    groups = ([shared] if shared else []) + [[target] for target in targets if target not in shared]
+
+    models = {}
+    metrics = {}
+
+    def fit(group):
+        valid = rows & df[group].notna().all(axis=1)
+        group_models, group_metrics = _fit_targets(df.loc[valid, features], df.loc[valid, group], group)
+        models.update(group_models)
+        metrics.update(group_metrics)
+
+    for group in groups:
+        try:
+            fit(group)
+            continue
+        except Exception as e:
+            if len(group) == 1:
+                logger.error("Could not train model for %s: %s", group[0], e)
+                continue
+            logger.warning("Shared fit failed (%s); training %s one at a time", e, group)
+        for target in group:
+            try:
+                fit([target])
+            except Exception as e:
+                logger.error("Could not train model for %s: %s", target, e)
+    return models, metrics
 
 def get_predictions(target, start_year, end_year):
     """
     Load the trained model and return predictions for the given target.
     Returns a list of dictionaries containing both actual data and predictions.
     """
+    result, _ = get_predictions_with_meta(target, start_year, end_year)
+    return result
+
+def get_predictions_with_meta(target, start_year, end_year, data=None):
+    """
+    Same as get_predictions, but also returns metadata about the response:
+    the canonical target column and the version of the model that served it
+    (None when no model was used).
+    data is an optional (df, generation) pair from load_data_with_version;
+    when given, no database call is made.
+    """
+    meta = {'target': None, 'model_version': None}
     try:
-        # Ensure target has the right format for model file lookup
-        target_column = target + " (GWh)"  # This is for column name lookup
-        model_path = f'{target_column.replace(" ", "_").lower()}_model.pkl'  # Fixed model path format
-        
-        logger.debug(f"Loading model from {model_path}")
-        
-        # Try alternative path format if the first one doesn't work
-        alternative_model_path = f'{target.replace(" ", "_").lower()}_model.pkl'
+        # Resolve the target through the registry's canonical name map
+        try:
+            target_column = resolve_target(target)
+        except ValueError:
+            target_column = target + " (GWh)"  # Unknown target, only existing data can be returned
+        meta['target'] = target_column
         
         # Load data from MongoDB
-        df = load_and_preprocess_data()
+        df, generation = data if data is not None else load_data_with_version()
         
-        features = ['Year', 'Population (in millions)', 'Non-Renewable Energy (GWh)']
-        logger.debug(f"Using features: {features}")
+        # Identical reads against the same data and model are served from the memo cache
+        cache_key = ('target', target_column, start_year, end_year, generation, _current_model_version(target_column))
+        cached = forecast_cache.get(cache_key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+        
+        features = FEATURES
+        logger.debug("Using features: %s", features)
         
         # Case-insensitive column lookup - find the actual column name that matches
         column_mapping = {}
@@ -162,9 +514,9 @@ def get_predictions(target, start_year, end_year):
         # Set 'Predicted Production' to the actual value from the target column
         if actual_target_column and actual_target_column in existing_data.columns:
             existing_data['Predicted Production'] = existing_data[actual_target_column]
-            logger.debug(f"Using column {actual_target_column} for target data")
+            logger.debug("Using column %s for target data", actual_target_column)
         else:
-            logger.warning(f"Target column {target_column} not found in data. Using default value.")
+            logger.warning("Target column %s not found in data. Using default value.", target_column)
             existing_data['Predicted Production'] = 0
         
         # Convert existing data to list of dicts and remove MongoDB _id
@@ -175,93 +527,321 @@ def get_predictions(target, start_year, end_year):
         
         if predict_start_year > end_year:
             logger.info("No future years to predict in the requested range")
-            return existing_records
+            forecast_cache.set(cache_key, (existing_records, meta))
+            return copy.deepcopy((existing_records, meta))
         
         # Try to load the model
+        cacheable = True
         try:
-            # First try the new path format
-            try:
-                model = joblib.load(model_path)
-                logger.info(f"Successfully loaded model from {model_path}")
-            except FileNotFoundError:
-                # Try the alternative path format
-                logger.info(f"Model not found at {model_path}, trying alternative path {alternative_model_path}")
-                model = joblib.load(alternative_model_path)
-                logger.info(f"Successfully loaded model from {alternative_model_path}")
+            model, model_version = get_model(target_column)
+            logger.debug("Using model %s for %s", model_version, target_column)
             
             # Get predictions only for future years
             future_predictions = forecast_production(model, df, features, predict_start_year, end_year)
             
             # Combine results
             result = existing_records + future_predictions
+            meta['model_version'] = model_version
             
         except FileNotFoundError:
-            logger.warning(f"Model files not found. Returning only existing data.")
+            logger.warning("Model files not found. Returning only existing data.")
             result = existing_records
         except Exception as e:
-            logger.error(f"Error loading or using model: {e}")
+            logger.error("Error loading or using model: %s", e)
             result = existing_records
+            cacheable = False
         
         # Sort by year
         result = sorted(result, key=lambda x: x.get('Year', 0))
         
-        logger.debug(f"Returning {len(result)} records")
-        return result
+        if cacheable:
+            forecast_cache.set(cache_key, (result, meta))
+            result, meta = copy.deepcopy((result, meta))
+        
+        logger.debug("Returning %s records", len(result))
+        return result, meta
     
     except Exception as e:
-        logger.error(f"Error in get_predictions: {e}")
+        logger.error("Error in get_predictions: %s", e)
         # Return empty list on error to avoid crashes
-        return []
+        return [], meta
 
-def forecast_production(model, df, features, start_year, end_year):
+def _column_values(values):
     """
-    Forecast future production using the trained model.
-    Returns a list of dictionaries with predictions for future years.
+    Convert an array to a JSON-friendly list, mapping NaN and infinities to None.
     """
-    try:
-        future_years = pd.DataFrame({'Year': range(start_year, end_year + 1)})
-        
-        # Calculate growth rates for features we need to project
-        avg_population_growth = df['Population (in millions)'].pct_change().mean()
-        avg_non_renewable_growth = df['Non-Renewable Energy (GWh)'].pct_change().mean()
-        
-        # Get the most recent values
-        last_population = df['Population (in millions)'].iloc[-1]
-        last_non_renewable = df['Non-Renewable Energy (GWh)'].iloc[-1]
-        latest_year = df['Year'].iloc[-1]
-        
-        # Calculate projected values
-        future_years['Population (in millions)'] = [
-            last_population * (1 + avg_population_growth) ** (year - latest_year)
-            for year in future_years['Year']
-        ]
-        
-        future_years['Non-Renewable Energy (GWh)'] = [
-            last_non_renewable * (1 + avg_non_renewable_growth) ** (year - latest_year)
-            for year in future_years['Year']
-        ]
+    values = np.asarray(values, dtype=float)
+    return [float(v) if np.isfinite(v) else None for v in values]
+
+def get_batch_predictions(targets, start_year, end_year, growth_model=None):
+    """
+    Return actual data and predictions for several targets over a year range.
+    The data is loaded once and the features are projected once; every target
+    model is then evaluated against the same projected frame.
+    
+    Parameters:
+        targets (list or str): Target names, or "all" / None for every target
+        start_year (int): First year of the range
+        end_year (int): Last year of the range
+        growth_model (str): Feature growth model, see projection.GROWTH_MODELS
         
-        # Project GDP if needed
-        if 'Gross Domestic Product' in features:
-            if 'Gross Domestic Product' in df.columns and not df['Gross Domestic Product'].empty:
-                avg_gdp_growth = df['Gross Domestic Product'].pct_change().mean()
-                last_gdp = df['Gross Domestic Product'].iloc[-1]
-                future_years['Gross Domestic Product'] = [
-                    last_gdp * (1 + avg_gdp_growth) ** (year - latest_year)
-                    for year in future_years['Year']
-                ]
+    Returns:
+        dict: Columnar result {
+            'Year': list of years,
+            'isPredicted': list of bools,
+            'values': {target: list of values aligned with 'Year'},
+            'model_versions': {target: model version or None}
+        }
+    """
+    if targets is None or targets == 'all' or targets == ['all']:
+        columns = list(TARGET_COLUMNS)
+    else:
+        columns = [resolve_target(t) for t in targets]  # ValueError on unknown targets
+    names = {column: column.replace(' (GWh)', '') for column in columns}
+
+    df, generation = load_data_with_version()
+    # Resolve every target from one published model set
+    models = get_models(columns)
+    cache_key = (
+        'batch', tuple(columns), start_year, end_year, growth_model or DEFAULT_GROWTH_MODEL, generation,
+        tuple(models[column][1] if column in models else None for column in columns)
+    )
+    cached = forecast_cache.get(cache_key)
+    if cached is not None:
+        return copy.deepcopy(cached)
+
+    if 'Year' in df.columns and not df.empty:
+        latest_year = df['Year'].max()
+        existing = df[(df['Year'] >= start_year) & (df['Year'] <= end_year)].sort_values('Year')
+    else:
+        logger.warning("No Year column found or dataframe is empty")
+        latest_year = start_year
+        existing = pd.DataFrame()
+
+    predict_start_year = int(max(start_year, latest_year + 1)) if not existing.empty else start_year
+    years = [int(y) for y in existing['Year']] if not existing.empty else []
+    is_predicted = [False] * len(years)
+    values = {}
+    for column in columns:
+        if column in existing.columns:
+            values[names[column]] = _column_values(existing[column])
+        else:
+            values[names[column]] = [None] * len(years)
+
+    model_versions = {names[column]: None for column in columns}
+    if predict_start_year <= end_year:
+        # One shared projection for every target
+        future_years = project_features(df, FEATURES, predict_start_year, end_year, growth_model)
+        future_X = future_years[FEATURES]
+        years += [int(y) for y in future_years['Year']]
+        is_predicted += [True] * len(future_years)
+        for column in columns:
+            if column in models:
+                model, model_versions[names[column]] = models[column]
+                values[names[column]] += _column_values(model.predict(future_X))
             else:
-                logger.warning("GDP data not available, using default growth rate")
-                future_years['Gross Domestic Product'] = [
-                    1000 * (1.03) ** (year - latest_year)
-                    for year in future_years['Year']
-                ]
+                logger.warning("Model file not found for %s", column)
+                values[names[column]] += [None] * len(future_years)
+
+    result = {
+        'Year': years,
+        'isPredicted': is_predicted,
+        'values': values,
+        'model_versions': model_versions,
+    }
+    forecast_cache.set(cache_key, result)
+    return copy.deepcopy(result)
+
+# Columns projected forward by growth; GDP is added when a model uses it
+PROJECTED_COLUMNS = ['Population (in millions)', 'Non-Renewable Energy (GWh)']
+GDP_COLUMN = 'Gross Domestic Product'
+
+# Growth parameters fitted for the most recent frame, so repeated forecasts skip the fit
+_growth_cache = {'df': None, 'params': {}}
+
+def fitted_growth(df, columns, growth_model=None):
+    """
+    Return growth parameters for columns of df, fitting them once per frame and model.
+    """
+    key = (tuple(columns), growth_model or DEFAULT_GROWTH_MODEL)
+    cached = _growth_cache
+    frame = cached['df']() if cached['df'] is not None else None
+    if frame is df and key in cached['params']:
+        return cached['params'][key]
+    params = fit_growth(df, columns, growth_model)
+    if frame is not df:
+        _growth_cache.update({'df': weakref.ref(df), 'params': {}})
+    _growth_cache['params'][key] = params
+    return params
+
+def project_features(df, features, start_year, end_year, growth_model=None):
+    """
+    Project the model features for future years from their historical growth.
+    All horizon years are evaluated at once with NumPy broadcasting.
+    Returns a DataFrame with one row per year and a column per feature.
+    """
+    years = np.arange(start_year, end_year + 1)
+    future_years = pd.DataFrame({'Year': years})
+    
+    columns = list(PROJECTED_COLUMNS)
+    gdp_available = GDP_COLUMN in df.columns and not df[GDP_COLUMN].empty
+    if GDP_COLUMN in features and gdp_available:
+        columns.append(GDP_COLUMN)
+    
+    params = fitted_growth(df, columns, growth_model)
+    projected = project(params, years)
+    for i, column in enumerate(columns):
+        future_years[column] = projected[:, i]
+    
+    if GDP_COLUMN in features and not gdp_available:
+        logger.warning("GDP data not available, using default growth rate")
+        future_years[GDP_COLUMN] = 1000 * 1.03 ** (years - params.latest_year)
+    
+    # Ensure all required features exist
+    for feature in features:
+        if feature not in future_years.columns:
+            future_years[feature] = 1.0  # Default value
+            logger.warning("Using default value for missing feature: %s", feature)
+    
+    return future_years
+
+# Bounds for scenario sweeps
+MAX_SCENARIOS = int(os.getenv("MAX_SCENARIOS", "1000"))
+MAX_SCENARIO_YEARS = int(os.getenv("MAX_SCENARIO_YEARS", "200"))
+
+def build_scenario_rates(baseline, grid=None, scenarios=None):
+    """
+    Build the (scenario x feature) growth-rate matrix for a sweep.
+    
+    Parameters:
+        baseline (dict): Fitted rate per projected column, used for anything not overridden
+        grid (dict): Column -> list of rates; every combination becomes a scenario
+        scenarios (list): Explicit list of {column: rate} dicts
+        
+    Returns:
+        tuple: (rates ndarray of shape (S, F), list of scenario dicts)
+    """
+    columns = list(baseline)
+    if grid is not None and not isinstance(grid, dict):
+        raise ValueError("grid must be an object mapping columns to lists of growth rates")
+    if scenarios is not None and (
+            not isinstance(scenarios, list) or not all(isinstance(spec, dict) for spec in scenarios)):
+        raise ValueError("scenarios must be a list of {column: growth rate} objects")
+    for spec in [grid or {}] + list(scenarios or []):
+        unknown = [c for c in spec if c not in baseline]
+        if unknown:
+            raise ValueError(f"Unknown scenario columns: {unknown}. Expected any of {columns}")
+    
+    if grid:
+        try:
+            axes = [np.atleast_1d(np.asarray(grid.get(c, [baseline[c]]), dtype=float)) for c in columns]
+        except (TypeError, ValueError):
+            raise ValueError("grid values must be numbers or lists of numbers")
+        if any(axis.ndim != 1 for axis in axes):
+            raise ValueError("grid values must be numbers or lists of numbers")
+        count = int(np.prod([len(a) for a in axes]))
+        if count > MAX_SCENARIOS:
+            raise ValueError(f"Scenario grid has {count} combinations; the limit is {MAX_SCENARIOS}")
+        mesh = np.meshgrid(*axes, indexing='ij')
+        rates = np.stack([m.ravel() for m in mesh], axis=-1)
+    else:
+        scenarios = scenarios or [{}]
+        if len(scenarios) > MAX_SCENARIOS:
+            raise ValueError(f"{len(scenarios)} scenarios requested; the limit is {MAX_SCENARIOS}")
+        try:
+            rates = np.array([[float(spec.get(c, baseline[c])) for c in columns] for spec in scenarios])
+        except (TypeError, ValueError):
+            raise ValueError("Scenario growth rates must be numbers")
+    
+    described = [dict(zip(columns, _column_values(row))) for row in rates]
+    return rates, described
+
+def sweep_scenarios(start_year, end_year, targets='all', grid=None, scenarios=None, growth_model=None):
+    """
+    Forecast every target under many feature-growth scenarios at once.
+    Features are projected into one (scenario x year x feature) array and all
+    target models are evaluated against it in a single matrix product.
+    
+    Parameters:
+        start_year (int): First projected year
+        end_year (int): Last projected year
+        targets (list or str): Target names, or "all"
+        grid (dict): Column -> list of growth rates, crossed into scenarios
+        scenarios (list): Explicit {column: growth rate} scenarios
+        growth_model (str): Model used for the baseline rates and the projection form
         
-        # Ensure all required features exist
-        for feature in features:
-            if feature not in future_years.columns:
-                future_years[feature] = 1.0  # Default value
-                logger.warning(f"Using default value for missing feature: {feature}")
+    Returns:
+        dict: {
+            'years': list, 'targets': list, 'scenarios': list of rate dicts,
+            'baseline': baseline rate dict, 'model_versions': dict,
+            'predictions': {target: S x Y nested list}
+        }
+    """
+    if end_year < start_year:
+        raise ValueError("end_year must not be before start_year")
+    if end_year - start_year + 1 > MAX_SCENARIO_YEARS:
+        raise ValueError(f"Scenario horizon is limited to {MAX_SCENARIO_YEARS} years")
+    if targets is None or targets == 'all' or targets == ['all']:
+        columns = list(TARGET_COLUMNS)
+    else:
+        columns = [resolve_target(t) for t in targets]
+    
+    df = load_and_preprocess_data()
+    if df.empty:
+        raise ValueError("No data available for scenario forecasting")
+    
+    params = fitted_growth(df, PROJECTED_COLUMNS, growth_model)
+    baseline = dict(zip(PROJECTED_COLUMNS, (float(r) for r in params.rate)))
+    rates, described = build_scenario_rates(baseline, grid, scenarios)
+    
+    years = np.arange(start_year, end_year + 1)
+    projected = project(params, years, rates)  # (S, Y, len(PROJECTED_COLUMNS))
+    n_scenarios, n_years = projected.shape[0], projected.shape[1]
+    
+    # Assemble the design matrix in FEATURES order
+    X = np.empty((n_scenarios, n_years, len(FEATURES)))
+    for i, feature in enumerate(FEATURES):
+        if feature == 'Year':
+            X[:, :, i] = years
+        else:
+            X[:, :, i] = projected[:, :, PROJECTED_COLUMNS.index(feature)]
+    
+    # Stack the linear models into one coefficient matrix: (F, T) weights and (T,) intercepts
+    names = [column.replace(' (GWh)', '') for column in columns]
+    weights = np.empty((len(FEATURES), len(columns)))
+    intercepts = np.empty(len(columns))
+    model_versions = {}
+    models = get_models(columns)
+    for j, column in enumerate(columns):
+        if column not in models:
+            raise FileNotFoundError(f"Model file not found for {column}")
+        model, model_versions[names[j]] = models[column]
+        weights[:, j] = model.coef_
+        intercepts[j] = model.intercept_
+    
+    predictions = X.reshape(-1, len(FEATURES)) @ weights + intercepts
+    predictions = predictions.reshape(n_scenarios, n_years, len(columns))
+    
+    return {
+        'years': years.tolist(),
+        'targets': names,
+        'scenarios': described,
+        # A zero start value gives cagr an infinite rate; JSON has no NaN or Infinity
+        'baseline': dict(zip(baseline, _column_values(list(baseline.values())))),
+        'growth_model': params.model,
+        'model_versions': model_versions,
+        'predictions': {
+            name: [_column_values(row) for row in predictions[:, :, j]] for j, name in enumerate(names)
+        },
+    }
+
+def forecast_production(model, df, features, start_year, end_year, growth_model=None):
+    """
+    Forecast future production using the trained model.
+    Returns a list of dictionaries with predictions for future years.
+    """
+    try:
+        future_years = project_features(df, features, start_year, end_year, growth_model)
         
         # Make predictions
         future_years['Predicted Production'] = model.predict(future_years[features])
@@ -270,11 +850,11 @@ def forecast_production(model, df, features, start_year, end_year):
         # Convert to list of dictionaries
         predictions = future_years.to_dict('records')
         
-        logger.debug(f"Generated {len(predictions)} predictions")
+        logger.debug("Generated %s predictions", len(predictions))
         return predictions
     
     except Exception as e:
-        logger.error(f"Error in forecast_production: {e}")
+        logger.error("Error in forecast_production: %s", e)
         raise    
     
 def train_and_save_models():
@@ -292,56 +872,75 @@ def train_and_save_models():
             logger.error("No data available for training models")
             return {"status": "error", "message": "No data available for training models"}
         
-        features = ['Year', 'Population (in millions)', 'Non-Renewable Energy (GWh)']
-        targets = ['Geothermal (GWh)', 'Hydro (GWh)', 'Biomass (GWh)', 'Solar (GWh)', 'Wind (GWh)']
+        features = FEATURES
+        targets = TARGET_COLUMNS
         
         # Check if we have the required columns
         missing_columns = [col for col in features + targets if col not in df.columns]
         if missing_columns:
-            logger.error(f"Missing required columns for training: {missing_columns}")
+            logger.error("Missing required columns for training: %s", missing_columns)
             return {
                 "status": "error", 
                 "message": f"Missing required columns: {missing_columns}",
                 "available_columns": list(df.columns)
             }
         
-        # Train models
-        trained_models = {}
-        for target in targets:
-            try:
-                logger.info(f"Training model for {target}...")
-                model = train_model(df, features, target)
-                model_path = f'{target.replace(" ", "_").lower()}_model.pkl'
-                joblib.dump(model, model_path)
-                logger.info(f"Saved model to {model_path}")
-                trained_models[target] = "success"
-            except Exception as e:
-                logger.error(f"Error training model for {target}: {e}")
-                trained_models[target] = f"error: {str(e)}"
+        # Train all models, sharing one multi-output fit where the data allows
+        logger.info("Training models for %s...", targets)
+        models, metrics = train_models(df, features, targets)
+        
+        if not models:
+            return {"status": "error", "message": "No model could be trained", "metrics": metrics}
+        
+        # Publish the whole set at once so readers never mix old and new models;
+        # targets that failed to train keep their current artifact
+        trained_models = {target: "error: training failed" for target in targets if target not in models}
+        try:
+            manifest = registry.save_models(models)
+            logger.info("Published model set %s", manifest['set'])
+            trained_models.update((target, "success") for target in models)
+        except Exception as e:
+            logger.error("Error saving models: %s", e)
+            trained_models.update((target, f"error: {str(e)}") for target in models)
+        
+        # New artifacts change the model versions; drop results computed with the old ones
+        forecast_cache.clear()
         
         return {
             "status": "success",
             "message": "Models trained and saved successfully",
             "models": trained_models,
+            "metrics": metrics,
             "data_rows": len(df)
         }
         
     except Exception as e:
-        logger.error(f"Error in train_and_save_models: {e}")
+        logger.error("Error in train_and_save_models: %s", e)
         return {"status": "error", "message": str(e)}
 
+def warm_up():
+    """
+    Load every trained model into the registry ahead of the first request.
+    """
+    return registry.load_all()
+
+# Background retraining, coalesced across bursts of writes
+retrain_scheduler = RetrainScheduler(train_and_save_models)
+
+def schedule_retrain(reason=''):
+    """
+    Queue a debounced background retrain and return immediately.
+    """
+    retrain_scheduler.request(reason)
+
 def main():
     # Load data from MongoDB
     df = load_and_preprocess_data()
-    features = ['Year', 'Population (in millions)', 'Non-Renewable Energy (GWh)']
-    targets = ['Geothermal (GWh)', 'Hydro (GWh)', 'Biomass (GWh)', 'Solar (GWh)', 'Wind (GWh)']
-    models = {}
-    for target in targets:
-        model = train_model(df, features, target)
-        models[target] = model
-        joblib.dump(model, f'{target.replace(" ", "_").lower()}_model.pkl')
-    for target in targets:
-        model = models[target]
+    features = FEATURES
+    targets = TARGET_COLUMNS
+    models, _ = train_models(df, features, targets)
+    registry.save_models(models)
+    for target, model in models.items():
         future_predictions = forecast_production(model, df, features, 2024, 2040)
         print(f"\nFuture Predictions for {target} (2024-2040):")
         print(future_predictions[['Year', 'Predicted Production']])
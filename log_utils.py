@@ -0,0 +1,55 @@
+import os
+import random
+import reprlib
+
+# Size caps for request bodies and datasets written to the log
+LOG_PAYLOAD_MAX_CHARS = int(os.getenv("LOG_PAYLOAD_MAX_CHARS", "500"))
+LOG_PAYLOAD_MAX_ITEMS = int(os.getenv("LOG_PAYLOAD_MAX_ITEMS", "5"))
+# Fraction of payloads rendered in full (up to the caps); the rest only report their size
+LOG_PAYLOAD_SAMPLE_RATE = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "1.0"))
+
+_repr = reprlib.Repr()
+_repr.maxlevel = 3
+_repr.maxlist = _repr.maxtuple = _repr.maxset = _repr.maxdict = LOG_PAYLOAD_MAX_ITEMS
+_repr.maxstring = _repr.maxother = LOG_PAYLOAD_MAX_CHARS
+
+
+def _size(value):
+    try:
+        return len(value)
+    except TypeError:
+        return None
+
+
+class _Payload:
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        value = self.value
+        size = _size(value)
+        if LOG_PAYLOAD_SAMPLE_RATE < 1 and random.random() >= LOG_PAYLOAD_SAMPLE_RATE:
+            return f"<{type(value).__name__} omitted, size={size}>"
+        if isinstance(value, bytes):
+            value = value[:LOG_PAYLOAD_MAX_CHARS + 1].decode('utf-8', errors='replace')
+        text = value if isinstance(value, str) else _repr.repr(value)
+        if len(text) > LOG_PAYLOAD_MAX_CHARS or (size is not None and isinstance(self.value, bytes) and size > LOG_PAYLOAD_MAX_CHARS):
+            text = text[:LOG_PAYLOAD_MAX_CHARS] + '...'
+        if size is not None:
+            text += f" (size={size})"
+        return text
+
+    __repr__ = __str__
+
+
+def log_payload(value):
+    """
+    Wrap a request body or dataset for logging. The value is only rendered if
+    the record is actually emitted, and then capped at LOG_PAYLOAD_MAX_ITEMS
+    items and LOG_PAYLOAD_MAX_CHARS characters:
+
+        logger.debug("Fetched data: %s", log_payload(data))
+    """
+    return _Payload(value)
@@ -0,0 +1,182 @@
+import os
+import time
+import random
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+# Fraction of trace() calls that are kept
+TRACE_SAMPLE_RATE = float(os.getenv("METRICS_TRACE_SAMPLE_RATE", "0.01"))
+# Most recent sampled traces kept in memory
+TRACE_BUFFER_SIZE = int(os.getenv("METRICS_TRACE_BUFFER_SIZE", "100"))
+# Prefix for exported Prometheus metric names
+PROMETHEUS_PREFIX = "ecopulse_"
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _label_text(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels) + '}'
+
+
+class MetricsRegistry:
+    """
+    In-process counters, gauges, timings and sampled traces.
+
+    Recording is a dict update under a lock, so it is safe on request threads;
+    nothing is written out until the registry is read through snapshot() or
+    prometheus_text(). Values are per process, like the other diagnostics.
+    """
+    def __init__(self, sample_rate=TRACE_SAMPLE_RATE, buffer_size=TRACE_BUFFER_SIZE):
+        self.sample_rate = sample_rate
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._timings = {}
+        self._traces = deque(maxlen=buffer_size)
+
+    def incr(self, name, value=1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def gauge(self, name, value, **labels):
+        with self._lock:
+            self._gauges[_key(name, labels)] = value
+
+    def observe(self, name, seconds, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            timing = self._timings.get(key)
+            if timing is None:
+                self._timings[key] = [1, seconds, seconds]
+            else:
+                timing[0] += 1
+                timing[1] += seconds
+                timing[2] = max(timing[2], seconds)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """
+        Record the duration of the with-block under name, including when it raises.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def trace(self, name, **fields):
+        """
+        Keep a sample of structured events, e.g. model inputs and outputs.
+        """
+        if self.sample_rate <= 0 or (self.sample_rate < 1 and random.random() >= self.sample_rate):
+            return
+        event = {'name': name, 'time': time.time(), 'pid': os.getpid(), **fields}
+        with self._lock:
+            self._traces.append(event)
+
+    def snapshot(self):
+        """
+        Return all metrics as JSON-serializable data.
+        """
+        with self._lock:
+            counters = [{'name': n, 'labels': dict(l), 'value': v} for (n, l), v in self._counters.items()]
+            gauges = [{'name': n, 'labels': dict(l), 'value': v} for (n, l), v in self._gauges.items()]
+            timings = [
+                {'name': n, 'labels': dict(l), 'count': c, 'sum_seconds': s, 'max_seconds': m,
+                 'mean_seconds': s / c}
+                for (n, l), (c, s, m) in self._timings.items()
+            ]
+            traces = list(self._traces)
+        return {
+            'pid': os.getpid(),
+            'trace_sample_rate': self.sample_rate,
+            'counters': counters,
+            'gauges': gauges,
+            'timings': timings,
+            'traces': traces,
+        }
+
+    def prometheus_text(self, prefix=PROMETHEUS_PREFIX):
+        """
+        Render counters, gauges and timings in the Prometheus text exposition format.
+        Timings are exported as summaries (_count and _sum) plus a _max gauge.
+        """
+        with self._lock:
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+            timings = sorted(self._timings.items())
+
+        lines = []
+        seen = set()
+
+        def header(metric, kind):
+            if metric not in seen:
+                seen.add(metric)
+                lines.append(f'# TYPE {metric} {kind}')
+
+        for (name, labels), value in counters:
+            metric = f'{prefix}{name}_total'
+            header(metric, 'counter')
+            lines.append(f'{metric}{_label_text(labels)} {value}')
+        for (name, labels), value in gauges:
+            metric = f'{prefix}{name}'
+            header(metric, 'gauge')
+            lines.append(f'{metric}{_label_text(labels)} {value}')
+        for (name, labels), (count, total, maximum) in timings:
+            metric = f'{prefix}{name}_seconds'
+            header(metric, 'summary')
+            lines.append(f'{metric}_count{_label_text(labels)} {count}')
+            lines.append(f'{metric}_sum{_label_text(labels)} {total}')
+        for (name, labels), (count, total, maximum) in timings:
+            metric = f'{prefix}{name}_seconds_max'
+            header(metric, 'gauge')
+            lines.append(f'{metric}{_label_text(labels)} {maximum}')
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._timings.clear()
+            self._traces.clear()
+
+
+metrics = MetricsRegistry()
+
+
+def incr(name, value=1, **labels):
+    metrics.incr(name, value, **labels)
+
+
+def gauge(name, value, **labels):
+    metrics.gauge(name, value, **labels)
+
+
+def observe(name, seconds, **labels):
+    metrics.observe(name, seconds, **labels)
+
+
+def timer(name, **labels):
+    return metrics.timer(name, **labels)
+
+
+def trace(name, **fields):
+    metrics.trace(name, **fields)
+
+
+def snapshot():
+    return metrics.snapshot()
+
+
+def prometheus_text():
+    return metrics.prometheus_text()
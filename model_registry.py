@@ -0,0 +1,278 @@
+import os
+import io
+import re
+import json
+import uuid
+import hashlib
+import datetime
+import tempfile
+import threading
+import logging
+import joblib
+
+logger = logging.getLogger(__name__)
+
+# Model artifacts live next to this file unless MODEL_DIR overrides it
+script_dir = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.getenv("MODEL_DIR", script_dir)
+
+# Names the artifact of each target in the currently published model set
+MANIFEST_PATH = os.path.join(MODEL_DIR, 'models_manifest.json')
+# Versioned artifacts written by save_models, e.g. solar_(gwh)_model.3f9c0a1b2c4d.pkl
+VERSIONED_ARTIFACT = re.compile(r'_model\.[0-9a-f]+\.pkl$')
+
+# Canonical target columns, keyed by the lower-case short name used in URLs
+TARGETS = {
+    'geothermal': 'Geothermal (GWh)',
+    'hydro': 'Hydro (GWh)',
+    'biomass': 'Biomass (GWh)',
+    'solar': 'Solar (GWh)',
+    'wind': 'Wind (GWh)',
+}
+
+
+def resolve_target(target):
+    """
+    Map a target name to its canonical column.
+    Accepts 'Solar', 'solar', 'Solar (GWh)' and 'solar_(gwh)' style names.
+    """
+    key = str(target).strip().lower().replace('_', ' ')
+    if key.endswith('(gwh)'):
+        key = key[:-len('(gwh)')].strip()
+    if key not in TARGETS:
+        raise ValueError(f"Unknown target: {target}")
+    return TARGETS[key]
+
+
+def _artifact_stem(column):
+    return f'{column.replace(" ", "_").lower()}_model'
+
+
+def artifact_path(target):
+    """
+    Return the legacy artifact path for a target, e.g. solar_(gwh)_model.pkl.
+    Used when no model set has been published through the manifest.
+    """
+    column = resolve_target(target)
+    return os.path.join(MODEL_DIR, f'{_artifact_stem(column)}.pkl')
+
+
+def _write_atomic(path, write):
+    """
+    Write a file through a temporary file and os.replace so readers never see a partial file.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class ModelRegistry:
+    """
+    Keep the trained target models in memory for the life of the worker.
+    An artifact is re-read only when its mtime or size changes, and the model
+    is only unpickled again when the content hash differs.
+
+    Models are published as a set: save_models writes new versioned artifacts
+    and then swaps the manifest, so a reader resolving several targets through
+    one manifest read never mixes models from two training runs.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._publish_lock = threading.Lock()
+        self._entries = {}
+        self._manifest = None
+
+    def read_manifest(self):
+        """
+        Return the published manifest, or None when artifacts predate it.
+        The file is only parsed again when its mtime or size changes.
+        """
+        try:
+            stat = os.stat(MANIFEST_PATH)
+        except FileNotFoundError:
+            return None
+        # os.replace gives every published manifest a new inode, even within one mtime tick
+        signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        cached = self._manifest
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        with open(MANIFEST_PATH, 'r') as f:
+            manifest = json.load(f)
+        self._manifest = (signature, manifest)
+        return manifest
+
+    def _resolve_path(self, column, manifest):
+        filename = (manifest or {}).get('artifacts', {}).get(column)
+        return os.path.join(MODEL_DIR, filename) if filename else artifact_path(column)
+
+    def get_model(self, target):
+        """
+        Return (model, version) for a target, loading or reloading it if needed.
+        Raises FileNotFoundError when the artifact does not exist.
+        """
+        column = resolve_target(target)
+        try:
+            return self._load(column, self._resolve_path(column, self.read_manifest()))
+        except FileNotFoundError:
+            # The set was replaced between reading the manifest and the artifact
+            return self._load(column, self._resolve_path(column, self.read_manifest()))
+
+    def get_models(self, targets):
+        """
+        Return {column: (model, version)} for several targets from one
+        published set. Targets without an artifact are left out.
+        """
+        columns = [resolve_target(target) for target in targets]
+        for attempt in range(2):
+            manifest = self.read_manifest()
+            published = (manifest or {}).get('artifacts', {})
+            models = {}
+            try:
+                for column in columns:
+                    if column not in published and not os.path.exists(artifact_path(column)):
+                        continue
+                    models[column] = self._load(column, self._resolve_path(column, manifest))
+                return models
+            except FileNotFoundError:
+                if attempt:
+                    raise
+                # A newer set was published mid-read; resolve everything again
+
+    def _load(self, column, path):
+        stat = os.stat(path)
+        signature = (path, stat.st_mtime_ns, stat.st_size)
+
+        entry = self._entries.get(column)
+        if entry is not None and entry['signature'] == signature:
+            return entry['model'], entry['version']
+
+        with self._lock:
+            entry = self._entries.get(column)
+            if entry is not None and entry['signature'] == signature:
+                return entry['model'], entry['version']
+
+            with open(path, 'rb') as f:
+                payload = f.read()
+            version = hashlib.sha256(payload).hexdigest()[:12]
+
+            if entry is not None and entry['version'] == version:
+                # Touched but unchanged; keep the loaded estimator
+                model = entry['model']
+            else:
+                model = joblib.load(io.BytesIO(payload))
+                logger.info("Loaded model for %s from %s (version %s)", column, path, version)
+
+            self._entries[column] = {
+                'model': model,
+                'version': version,
+                'signature': signature,
+                'path': path,
+            }
+            return model, version
+
+    def load_all(self):
+        """
+        Load every known target model, skipping missing artifacts.
+        Returns a dict of column -> version (None when missing).
+        """
+        versions = {}
+        for column in TARGETS.values():
+            try:
+                _, versions[column] = self.get_model(column)
+            except FileNotFoundError:
+                logger.warning("Model artifact missing for %s", column)
+                versions[column] = None
+        return versions
+
+    def versions(self):
+        """
+        Return the versions of the models currently held in memory.
+        """
+        return {column: entry['version'] for column, entry in self._entries.items()}
+
+    def save_models(self, models):
+        """
+        Publish a set of models atomically.
+        Each model is written to a new versioned artifact, then the manifest
+        is replaced in one os.replace. Targets not in models keep their current
+        artifact. Artifacts of the previous set are kept so that readers still
+        holding the old manifest can finish loading.
+
+        Parameters:
+            models (dict): target -> fitted model
+
+        Returns:
+            dict: The new manifest
+        """
+        with self._publish_lock:
+            previous = self.read_manifest() or {'artifacts': {}}
+            set_id = uuid.uuid4().hex[:12]
+            artifacts = dict(previous.get('artifacts', {}))
+            written = []
+            try:
+                for target, model in models.items():
+                    column = resolve_target(target)
+                    filename = f'{_artifact_stem(column)}.{set_id}.pkl'
+                    _write_atomic(os.path.join(MODEL_DIR, filename), lambda f, m=model: joblib.dump(m, f))
+                    written.append(filename)
+                    artifacts[column] = filename
+                manifest = {
+                    'set': set_id,
+                    'published': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                    'artifacts': artifacts,
+                }
+                payload = json.dumps(manifest, indent=2).encode('utf-8')
+                _write_atomic(MANIFEST_PATH, lambda f: f.write(payload))
+            except Exception:
+                for filename in written:
+                    try:
+                        os.remove(os.path.join(MODEL_DIR, filename))
+                    except OSError:
+                        pass
+                raise
+            logger.info("Published model set %s for %s", set_id, sorted(resolve_target(t) for t in models))
+            self._prune(set(artifacts.values()) | set(previous.get('artifacts', {}).values()))
+            return manifest
+
+    def _prune(self, keep):
+        """
+        Remove versioned artifacts that belong to neither the current nor the previous set.
+        """
+        for filename in os.listdir(MODEL_DIR):
+            if VERSIONED_ARTIFACT.search(filename) and filename not in keep:
+                try:
+                    os.remove(os.path.join(MODEL_DIR, filename))
+                except OSError as e:
+                    logger.warning("Could not remove old model artifact %s: %s", filename, e)
+
+    def save_model(self, target, model):
+        """
+        Publish a single model; the other targets keep their current artifacts.
+        Returns the artifact path.
+        """
+        manifest = self.save_models({target: model})
+        return os.path.join(MODEL_DIR, manifest['artifacts'][resolve_target(target)])
+
+
+# One registry per worker process
+registry = ModelRegistry()
+
+
+def get_model(target):
+    """
+    Return (model, version) for a target from the process-wide registry.
+    """
+    return registry.get_model(target)
+
+
+def get_models(targets):
+    """
+    Return {column: (model, version)} for several targets from one published set.
+    """
+    return registry.get_models(targets)
@@ -0,0 +1,119 @@
+import logging
+from pymongo import IndexModel, ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+from mongo_pool import get_client, DATABASE_NAME
+
+logger = logging.getLogger(__name__)
+
+# Indexes required by the application's queries, per collection.
+# Names are fixed so that re-running ensure_indexes() is a no-op.
+INDEXES = {
+    'predictiveAnalysis': [
+        # update_record, delete_record and recover_record look records up by Year
+        IndexModel([('Year', ASCENDING)], name='year'),
+        # Change probe in load_data_with_version sorts on updatedAt
+        IndexModel([('updatedAt', DESCENDING)], name='updated_at', sparse=True),
+    ],
+    'recommendation': [
+        # Keyset pagination and the ?year= filter in the record listings
+        IndexModel([('Year', ASCENDING), ('_id', ASCENDING)], name='year_id'),
+    ],
+    'peertopeer': [
+        # Keyset pagination and Year range filters in the record listings
+        IndexModel([('Year', ASCENDING), ('_id', ASCENDING)], name='year_id'),
+    ],
+}
+
+# Representative queries and the index each one is expected to use
+VERIFY_QUERIES = [
+    ('predictiveAnalysis', {'Year': 2024}, None, 'year'),
+    ('predictiveAnalysis', {'updatedAt': {'$exists': True}}, [('updatedAt', -1)], 'updated_at'),
+    ('recommendation', {'Year': 2024}, [('Year', 1), ('_id', 1)], 'year_id'),
+    ('recommendation', {}, [('Year', 1), ('_id', 1)], 'year_id'),
+    ('peertopeer', {'Year': {'$gte': 2020, '$lte': 2030}}, [('Year', 1), ('_id', 1)], 'year_id'),
+]
+
+
+def get_database():
+    return get_client()[DATABASE_NAME]
+
+
+def ensure_indexes(db=None, collections=None, dry_run=False):
+    """
+    Create any missing indexes from INDEXES. Existing indexes with the same
+    name and definition are left alone, so this is safe to run on every deploy.
+
+    Parameters:
+        db (pymongo.database.Database): Target database, defaults to ecopulse
+        collections (list): Restrict to these collections
+        dry_run (bool): Only report what would be created
+
+    Returns:
+        dict: {collection: {'created': [...], 'existing': [...], 'errors': {...}}}
+    """
+    db = db if db is not None else get_database()
+    report = {}
+    for name, models in INDEXES.items():
+        if collections and name not in collections:
+            continue
+        collection = db[name]
+        existing = set(collection.index_information())
+        result = {'created': [], 'existing': [], 'errors': {}}
+        for model in models:
+            index_name = model.document['name']
+            if index_name in existing:
+                result['existing'].append(index_name)
+                continue
+            if dry_run:
+                result['created'].append(index_name)
+                continue
+            try:
+                collection.create_indexes([model])
+                result['created'].append(index_name)
+                logger.info("Created index %s on %s", index_name, name)
+            except OperationFailure as e:
+                # Typically an index with the same keys but different options already exists
+                result['errors'][index_name] = str(e)
+                logger.error("Could not create index %s on %s: %s", index_name, name, e)
+        report[name] = result
+    return report
+
+
+def _index_scans(plan):
+    """
+    Yield the index names of every IXSCAN stage in an explain plan.
+    """
+    if isinstance(plan, dict):
+        if plan.get('stage') == 'IXSCAN':
+            yield plan.get('indexName')
+        for value in plan.values():
+            yield from _index_scans(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            yield from _index_scans(value)
+
+
+def verify_indexes(db=None, queries=VERIFY_QUERIES):
+    """
+    Explain representative queries and check that each uses its expected index.
+
+    Returns:
+        list: One dict per query with the indexes used and an ok flag
+    """
+    db = db if db is not None else get_database()
+    results = []
+    for name, query, sort, expected in queries:
+        cursor = db[name].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        plan = cursor.explain().get('queryPlanner', {}).get('winningPlan', {})
+        used = sorted(set(i for i in _index_scans(plan) if i))
+        results.append({
+            'collection': name,
+            'query': query,
+            'sort': sort,
+            'expected': expected,
+            'used': used,
+            'ok': expected in used,
+        })
+    return results
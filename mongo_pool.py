@@ -0,0 +1,197 @@
+import os
+import threading
+import time
+import logging
+from pymongo import MongoClient, monitoring
+from pymongo.errors import ConnectionFailure
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# MongoDB connection
+DATABASE_NAME = "ecopulse"
+
+# Pool settings, overridable per deployment through environment variables
+MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "60000"))
+SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "10000"))
+# Seconds between explicit pings; 0 pings on every checkout
+HEALTH_CHECK_INTERVAL = float(os.getenv("MONGO_HEALTH_CHECK_INTERVAL", "30"))
+
+
+class _PoolStatsListener(monitoring.ConnectionPoolListener):
+    """
+    Count connection pool events so the pool can report its usage.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {
+            'pools_created': 0,
+            'pools_cleared': 0,
+            'connections_created': 0,
+            'connections_closed': 0,
+            'checkouts': 0,
+            'checkins': 0,
+            'checkout_failures': 0,
+        }
+
+    def _incr(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def pool_created(self, event):
+        self._incr('pools_created')
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._incr('pools_cleared')
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._incr('connections_created')
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._incr('connections_closed')
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._incr('checkout_failures')
+
+    def connection_checked_out(self, event):
+        self._incr('checkouts')
+
+    def connection_checked_in(self, event):
+        self._incr('checkins')
+
+    def snapshot(self):
+        with self._lock:
+            counters = dict(self.counters)
+        counters['open_connections'] = counters['connections_created'] - counters['connections_closed']
+        counters['in_use'] = counters['checkouts'] - counters['checkins']
+        return counters
+
+
+_lock = threading.Lock()
+_client = None
+_client_pid = None
+_listener = None
+_last_ping = 0.0
+
+
+def _reset_after_fork():
+    """
+    Drop the parent's client in a forked child; MongoClient is not fork-safe.
+    """
+    global _client, _client_pid, _listener, _last_ping, _lock
+    _lock = threading.Lock()
+    _client = None
+    _client_pid = None
+    _listener = None
+    _last_ping = 0.0
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_client():
+    """
+    Return the MongoClient for this process, creating it on first use.
+    """
+    global _client, _client_pid, _listener
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+
+    with _lock:
+        if _client is None or _client_pid != pid:
+            mongo_url = os.getenv("MONGO_URL")
+            if not mongo_url:
+                logger.error("MONGO_URL environment variable is not set")
+                raise ValueError("MONGO_URL environment variable is not set")
+
+            _listener = _PoolStatsListener()
+            _client = MongoClient(
+                mongo_url,
+                maxPoolSize=MAX_POOL_SIZE,
+                minPoolSize=MIN_POOL_SIZE,
+                maxIdleTimeMS=MAX_IDLE_TIME_MS,
+                serverSelectionTimeoutMS=5000,
+                connectTimeoutMS=5000,
+                socketTimeoutMS=SOCKET_TIMEOUT_MS,
+                event_listeners=[_listener],
+            )
+            _client_pid = pid
+            logger.info("Created MongoDB client for process %s (maxPoolSize=%s)", pid, MAX_POOL_SIZE)
+    return _client
+
+
+def _check_health(client):
+    """
+    Ping the server unless a ping succeeded within HEALTH_CHECK_INTERVAL.
+    """
+    global _last_ping
+    now = time.monotonic()
+    if HEALTH_CHECK_INTERVAL > 0 and now - _last_ping < HEALTH_CHECK_INTERVAL:
+        return
+    client.admin.command('ping')
+    _last_ping = now
+
+
+def get_collection(collection_name, retries=3, delay=5):
+    """
+    Return a collection from the shared client, checking server health.
+    Retries the health check in case of failure.
+
+    Parameters:
+        collection_name (str): Name of the collection in the ecopulse database
+        retries (int): Number of attempts to make
+        delay (int): Seconds to wait between retries
+
+    Returns:
+        pymongo.collection.Collection: The requested collection
+    """
+    global _last_ping
+    client = get_client()
+    for attempt in range(retries):
+        try:
+            _check_health(client)
+            return client[DATABASE_NAME][collection_name]
+        except ConnectionFailure as e:
+            _last_ping = 0.0
+            logger.error("Error connecting to MongoDB (attempt %s): %s", attempt + 1, e)
+            if attempt < retries - 1:
+                time.sleep(delay)
+            else:
+                raise
+
+
+def pool_stats():
+    """
+    Return connection pool configuration and usage counters for this process.
+    """
+    stats = {
+        'pid': os.getpid(),
+        'connected': _client is not None and _client_pid == os.getpid(),
+        'max_pool_size': MAX_POOL_SIZE,
+        'min_pool_size': MIN_POOL_SIZE,
+        'max_idle_time_ms': MAX_IDLE_TIME_MS,
+        'health_check_interval': HEALTH_CHECK_INTERVAL,
+        'last_ping_age': (time.monotonic() - _last_ping) if _last_ping else None,
+    }
+    if stats['connected'] and _listener is not None:
+        stats.update(_listener.snapshot())
+    return stats
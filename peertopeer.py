@@ -1,120 +1,58 @@
 import pandas as pd
 import numpy as np
-from sklearn.linear_model import LinearRegression
 import os
 import logging
-from pymongo import MongoClient
 from pymongo.errors import ConnectionFailure
-import time
+from mongo_pool import get_collection
+from schema import normalize_document, validate_rows, write_rows, RowValidationError
+from columnar_store import ColumnarStore
 import datetime
+import threading
 
-# Configure the logger
-logging.basicConfig(level=logging.DEBUG)
+# Logging is configured centrally in backend/settings.py
 logger = logging.getLogger(__name__)
 
-# Load dataset
+# Dataset source: the columnar cache, seeded from peertopeer.xlsx on first run
 script_dir = os.path.dirname(os.path.abspath(__file__))
 file_path = os.path.join(script_dir, 'peertopeer.xlsx')
-df = pd.read_excel(file_path)
-
-# Ensure correct data types for key columns
-if 'Year' in df.columns:
-    df['Year'] = pd.to_numeric(df['Year'], errors='coerce')
-    
-if 'isPredicted' in df.columns:
-    # Convert various representations of boolean to actual boolean
-    df['isPredicted'] = df['isPredicted'].map(lambda x: str(x).lower() in ('true', 't', '1', 'yes', 'y'))
-    logger.debug(f"isPredicted column values: {df['isPredicted'].value_counts().to_dict()}")
-
-# Print dataframe info for debugging
-logger.debug(f"DataFrame columns: {df.columns.tolist()}")
-logger.debug(f"DataFrame types: {df.dtypes.to_dict()}")
-logger.debug(f"DataFrame first 3 rows: {df.head(3)}")
+CACHE_DIR = os.getenv("PEERTOPEER_CACHE_DIR", os.path.join(script_dir, '.cache', 'peertopeer'))
+store = ColumnarStore(CACHE_DIR)
 
 # MongoDB connection
-MONGO_URL = os.getenv("MONGO_URL")  # Load MongoDB URI from environment variables
-DATABASE_NAME = "ecopulse"  # Replace with your database name
 COLLECTION_NAME = "peertopeer"  # Replace with your collection name
 
 def connect_to_mongodb_peertopeer(retries=3, delay=5):
     """
-    Connect to MongoDB Atlas with better error handling.
+    Return the peertopeer collection from the shared MongoDB client.
     """
-    if not MONGO_URL:
-        logger.error("MONGO_URL environment variable is not set")
-        raise ValueError("MONGO_URL environment variable is not set")
-        
-    for attempt in range(retries):
-        try:
-            logger.debug(f"Attempting to connect to MongoDB (attempt {attempt + 1}/{retries})")
-            
-            # Parse the MongoDB URL to get the host for logging (hide password)
-            mongo_host = MONGO_URL.split('@')[-1].split('/')[0] if '@' in MONGO_URL else MONGO_URL.split('/')[2]
-            logger.debug(f"Connecting to MongoDB at {mongo_host}")
-            
-            client = MongoClient(
-                MONGO_URL,
-                serverSelectionTimeoutMS=5000,
-                connectTimeoutMS=5000,
-                socketTimeoutMS=10000,
-                tls='mongodb+srv' in MONGO_URL,  # Only enable TLS for Atlas
-                tlsAllowInvalidCertificates=False  # Disable in production
-            )
-            db = client[DATABASE_NAME]
-            collection = db[COLLECTION_NAME]
-            
-            # Attempt to ping the server to check the connection
-            client.admin.command('ping')
-            logger.debug("Connected to MongoDB Atlas successfully.")
-            return collection
-        except Exception as e:
-            logger.error(f"Attempt {attempt + 1} failed: {str(e)}")
-            if attempt < retries - 1:
-                logger.info(f"Retrying in {delay} seconds...")
-                time.sleep(delay)
-            else:
-                logger.error(f"All {retries} connection attempts to MongoDB failed")
-                raise ConnectionError(f"Failed to connect to MongoDB after {retries} attempts: {e}")
+    try:
+        return get_collection(COLLECTION_NAME, retries=retries, delay=delay)
+    except ConnectionFailure as e:
+        logger.error("All %s connection attempts to MongoDB failed", retries)
+        raise ConnectionError(f"Failed to connect to MongoDB after {retries} attempts: {e}")
 
 def fetch_and_save_data():
     """
-    Fetch data from MongoDB and save it to peertopeer.xlsx, with all data as strings.
+    Fetch all data from MongoDB, rewrite the columnar cache and reload the snapshot.
+    Used for a full resync; single inserts are appended incrementally instead.
     """
     try:
         # Connect to MongoDB
         collection = connect_to_mongodb_peertopeer()
         
         # Fetch all documents from the collection
-        cursor = collection.find({})
-        
-        # Convert to DataFrame
-        df = pd.DataFrame(list(cursor))
-        
-        # Remove MongoDB _id field if it exists
-        if '_id' in df.columns:
-            df.drop('_id', axis=1, inplace=True)
-        
-        # Convert ALL columns to strings (including numbers)
-        for col in df.columns:
-            if col != 'isPredicted':  # Keep isPredicted as boolean
-                df[col] = df[col].astype(str)  # Force everything to string
+        cursor = collection.find({}, projection={'_id': 0})
         
-        # Clean up numeric strings (remove commas for consistency)
-        for col in df.columns:
-            if col != 'isPredicted' and df[col].dtype == 'object' and df[col].str.contains(',').any():
-                df[col] = df[col].str.replace(',', '')  # Remove commas
+        # Convert to a typed DataFrame
+        df = typed_frame(pd.DataFrame(list(cursor)))
         
-        # Get the path to the Excel file
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        file_path = os.path.join(script_dir, 'peertopeer.xlsx')
-        
-        # Save to Excel, overwriting the existing file
-        df.to_excel(file_path, index=False)
-        logger.info(f"Successfully saved {len(df)} records to {file_path}")
+        store.write(df)
+        logger.info("Successfully saved %s records to %s", len(df), CACHE_DIR)
         
+        reload_snapshot()
         return df
     except Exception as e:
-        logger.error(f"Error in fetch_and_save_data: {e}")
+        logger.error("Error in fetch_and_save_data: %s", e)
         raise
 
 def createPeertoPeer(data):
@@ -125,17 +63,45 @@ def createPeertoPeer(data):
         collection = connect_to_mongodb_peertopeer()
         
         # Add the isPredicted flag and set to False for actual data
-        data_with_flag = {**data, "isPredicted": False}
+        data_with_flag = {**normalize_document(data), "isPredicted": False}
         
         collection.insert_one(data_with_flag)
         logger.info("Actual data inserted successfully with isPredicted=False.")
         
-        # Update the Excel file after insertion
-        fetch_and_save_data()  
+        # Append the new row to the local cache and pick it up
+        store.append(typed_frame(pd.DataFrame([data_with_flag])))
+        reload_snapshot()
     except Exception as e:
-        logger.error(f"Error inserting actual data: {e}")
+        logger.error("Error inserting actual data: %s", e)
         raise
 
+def createPeertoPeerBulk(rows, upsert=False):
+    """
+    Insert (or upsert on Year) many actual-data rows with isPredicted=False,
+    then update the local cache once. Inserts are appended to the columnar
+    store in one write; upserts may change existing rows, so they resync it.
+    """
+    docs, errors = validate_rows(rows)
+    if errors:
+        raise RowValidationError(errors)
+    for doc in docs:
+        doc['isPredicted'] = False
+
+    collection = connect_to_mongodb_peertopeer()
+    # insert_many adds _id to the documents; keep the cache rows free of it
+    summary = write_rows(collection, [dict(doc) for doc in docs], upsert=upsert)
+    logger.info("Bulk %s: %s inserted, %s upserted, %s modified, %s failed",
+                "upsert" if upsert else "insert", summary['inserted'], summary['upserted'],
+                summary['modified'], len(summary['errors']))
+
+    if upsert or summary['errors']:
+        if summary['inserted'] or summary['upserted'] or summary['modified']:
+            fetch_and_save_data()
+    elif summary['inserted']:
+        store.append(typed_frame(pd.DataFrame(docs)))
+        reload_snapshot()
+    return summary
+
 # Display DataFrame columns and first few rows
 # print("DataFrame Columns:")
 # print(df.columns)
@@ -156,126 +122,248 @@ metrics = [
     'Visayas Total Power Consumption (GWh)'  # Ensure this metric is included
 ]
 
-# Create a dictionary to hold DataFrames for each subgrid
-subgrid_data = {}
+def build_subgrid_data(frame):
+    """
+    Split the frame into one DataFrame per subgrid, keyed by subgrid name,
+    with the subgrid prefix removed from the metric columns.
+    """
+    subgrid_data = {}
+
+    # Extract data for each subgrid and metric
+    for subgrid in subgrids:
+        # Filter columns that belong to the current subgrid and metrics
+        subgrid_columns = ['Year'] + [f'{subgrid} {metric}' for metric in metrics if f'{subgrid} {metric}' in frame.columns]
+
+        if len(subgrid_columns) > 1:  # Ensure there are relevant columns
+            # Create a DataFrame for the subgrid with 'Year' and its specific columns
+            subgrid_df = frame[subgrid_columns].copy()
+
+            # Rename columns to remove the subgrid prefix for clarity
+            subgrid_df.columns = ['Year'] + [col.replace(f'{subgrid} ', '') for col in subgrid_columns[1:]]
+
+            # Store the DataFrame in the dictionary
+            subgrid_data[subgrid] = subgrid_df
+        else:
+            logger.warning("No data found for subgrid: %s", subgrid)
+    return subgrid_data
+
+# Region-wide series used to split consumption across subgrids
+visayas_columns = ['Visayas Total Power Generation (GWh)', 'Visayas Total Power Consumption (GWh)']
 
-# Extract data for each subgrid and metric
-for subgrid in subgrids:
-    # Filter columns that belong to the current subgrid and metrics
-    subgrid_columns = ['Year'] + [f'{subgrid} {metric}' for metric in metrics if f'{subgrid} {metric}' in df.columns]
+def typed_frame(frame):
+    """
+    Return a typed copy of a raw peer-to-peer frame: Year and every value column
+    as numbers (thousands separators stripped, unparseable values as NaN) and
+    isPredicted as a real boolean.
+    """
+    frame = frame.drop(columns=['_id'], errors='ignore').copy()
+    for col in frame.columns:
+        if col == 'isPredicted':
+            # Convert various representations of boolean to actual boolean
+            frame[col] = frame[col].map(lambda x: str(x).lower() in ('true', 't', '1', 'yes', 'y'))
+        elif not (pd.api.types.is_numeric_dtype(frame[col]) or pd.api.types.is_bool_dtype(frame[col])):
+            # Any text column, whether object or a pandas string dtype
+            frame[col] = pd.to_numeric(frame[col].astype(str).str.replace(',', ''), errors='coerce')
+    return frame
+
+class CoefficientTable:
+    """
+    Year -> value linear fits for every (subgrid, metric) series, fitted once.
+    A value recorded for the requested year wins, years before a series' first
+    observation give 0.0, and any other year is read off the least-squares line.
+    """
+    def __init__(self, frame, columns):
+        self.columns = list(columns)
+        self.index = {col: i for i, col in enumerate(self.columns)}
+
+        years = frame['Year'].to_numpy(dtype=float)
+        values = frame[self.columns].to_numpy(dtype=float) if self.columns else np.empty((len(frame), 0))
+        mask = ~np.isnan(values) & ~np.isnan(years)[:, np.newaxis]
+
+        # Closed-form simple regression for all series at once
+        x = np.where(mask, years[:, np.newaxis], 0.0)
+        y = np.where(mask, values, 0.0)
+        n = mask.sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_x = x.sum(axis=0) / n
+            mean_y = y.sum(axis=0) / n
+            dx = np.where(mask, x - mean_x, 0.0)
+            dy = np.where(mask, y - mean_y, 0.0)
+            sxx = (dx * dx).sum(axis=0)
+            slope = np.where(sxx > 0, (dx * dy).sum(axis=0) / sxx, 0.0)
+        self.has_data = n > 0
+        self.slope = np.where(self.has_data, slope, 0.0)
+        self.intercept = np.where(self.has_data, mean_y - self.slope * mean_x, 0.0)
+        self.min_year = np.where(mask, years[:, np.newaxis], np.inf).min(axis=0) if len(frame) else np.full(len(self.columns), np.inf)
+
+        # First recorded value of every series for each year present in the data
+        known = frame[['Year'] + self.columns].dropna(subset=['Year']).groupby('Year', sort=True).first()
+        self.known_years = known.index.to_numpy(dtype=float)
+        self.known_values = known.to_numpy(dtype=float)
+
+        for arr in (self.slope, self.intercept, self.min_year, self.has_data, self.known_years, self.known_values):
+            arr.setflags(write=False)
+
+    def evaluate(self, years):
+        """
+        Return a (len(years), len(columns)) array of values for the given years.
+        """
+        years = np.atleast_1d(np.asarray(years, dtype=float))
+        grid = years[:, np.newaxis]
+        result = grid * self.slope + self.intercept
+        result = np.where((grid < self.min_year) | ~self.has_data, 0.0, result)
+
+        if len(self.known_years):
+            pos = np.searchsorted(self.known_years, years)
+            pos = np.minimum(pos, len(self.known_years) - 1)
+            matched = self.known_years[pos] == years
+            if matched.any():
+                recorded = self.known_values[pos[matched]]
+                result[matched] = np.where(np.isnan(recorded), result[matched], recorded)
+        return result
+
+def build_coefficient_table(frame):
+    """
+    Fit the coefficient table for every subgrid metric and the Visayas totals
+    of a typed frame.
+    """
+    columns = [f'{place} {metric}' for place in subgrids for metric in metrics if f'{place} {metric}' in frame.columns]
+    columns += [col for col in visayas_columns if col in frame.columns]
+    return CoefficientTable(frame, columns)
+
+class PeerToPeerSnapshot:
+    """
+    Typed, fitted view of the peer-to-peer dataset, built once per load.
+    Requests only read a snapshot; refreshing builds a new one and swaps the
+    module reference, so readers never see a half-updated frame.
+    """
+    def __init__(self, raw_frame, typed=False, signature=None):
+        self.df = raw_frame if typed else typed_frame(raw_frame)
+        self.signature = signature  # Columnar store version this snapshot was read from
+        self.subgrid_data = build_subgrid_data(self.df)
+        # Fit every series once, when the data loads
+        self.coefficients = build_coefficient_table(self.df)
+        if 'isPredicted' in self.df.columns:
+            self.actual = self.df[self.df['isPredicted'] == False]
+        else:
+            self.actual = self.df.iloc[0:0]
+        self.loaded_at = datetime.datetime.now(datetime.timezone.utc)
 
-    if len(subgrid_columns) > 1:  # Ensure there are relevant columns
-        # Create a DataFrame for the subgrid with 'Year' and its specific columns
-        subgrid_df = df[subgrid_columns].copy()
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+def refresh_snapshot(raw_frame, typed=False, signature=None):
+    """
+    Build a snapshot from a frame and make it the current one.
+    """
+    global _snapshot
+    snapshot = PeerToPeerSnapshot(raw_frame, typed=typed, signature=signature)
+    _snapshot = snapshot  # Single reference assignment; readers keep whichever snapshot they already hold
+    logger.info("Loaded peer-to-peer snapshot with %s rows", len(snapshot.df))
+    return snapshot
 
-        # Rename columns to remove the subgrid prefix for clarity
-        subgrid_df.columns = ['Year'] + [col.replace(f'{subgrid} ', '') for col in subgrid_columns[1:]]
+def reload_snapshot():
+    """
+    Load the snapshot from the columnar cache, seeding the cache from
+    peertopeer.xlsx when it does not exist yet.
+    """
+    with _snapshot_lock:
+        if not store.exists():
+            logger.info("Seeding peer-to-peer cache from %s", file_path)
+            store.write(typed_frame(pd.read_excel(file_path)))
+        frame, signature = store.load()
+        return refresh_snapshot(frame, typed=True, signature=signature)
+
+def get_snapshot():
+    """
+    Return the current peer-to-peer snapshot, reloading it when another
+    process has written a newer version of the columnar cache.
+    """
+    snapshot = _snapshot
+    if snapshot is None or snapshot.signature != store.signature():
+        try:
+            snapshot = reload_snapshot()
+        except Exception as e:
+            if snapshot is None:
+                raise
+            # Keep serving the snapshot we have; the next request retries the reload
+            logger.warning("Could not reload peer-to-peer snapshot, serving the current one: %s", e)
+    return snapshot
 
-        # Store the DataFrame in the dictionary
-        subgrid_data[subgrid] = subgrid_df
-    else:
-        print(f"No data found for subgrid: {subgrid}")
+def warm_up():
+    """
+    Load the peer-to-peer snapshot ahead of the first request.
+    """
+    get_snapshot()
 
 # Function to perform linear regression and predict future values
-def predict_future(df, column, target_year=2040):
+def actual_year_data(snapshot, year):
     """
-    Predict a future value using linear regression.
-    First checks if actual data exists for the target year (isPredicted=False).
+    Return per-place metrics from actual (isPredicted=False) data for a year, or None.
     """
-    # Debug the input data
-    logger.debug(f"predict_future: Checking for year {target_year} in column {column}")
-    logger.debug(f"DataFrame columns: {df.columns.tolist()}")
-    
-    # Ensure year is numeric
-    target_year = int(target_year)
+    actual_data = snapshot.actual[snapshot.actual['Year'] == year]
+    if actual_data.empty:
+        return None
     
-    # First check if we have actual data for this year (not predicted)
-    if 'isPredicted' in df.columns and 'Year' in df.columns:
-        # Make sure Year is numeric for comparison
-        if df['Year'].dtype != 'int64' and df['Year'].dtype != 'float64':
-            df['Year'] = pd.to_numeric(df['Year'], errors='coerce')
-            
-        # Print the unique years in the dataframe for debugging
-        logger.debug(f"Years in dataframe: {sorted(df['Year'].unique())}")
+    data = []
+    for place in subgrids:
+        place_data = {
+            'place': place,
+            'metrics': {},
+            'isPredicted': False
+        }
         
-        # Check for actual data (isPredicted=False) for target year
-        actual_data = df[(df['Year'] == target_year) & (df['isPredicted'] == False)]
-        logger.debug(f"Found {len(actual_data)} actual data rows for year {target_year}")
+        for metric in metrics:
+            col_name = f"{place} {metric}"
+            if col_name in actual_data.columns:
+                value = actual_data[col_name].iloc[0]
+                try:
+                    place_data['metrics'][metric] = float(value)
+                except (ValueError, TypeError):
+                    place_data['metrics'][metric] = 0.0
         
-        if not actual_data.empty and column in actual_data.columns:
-            actual_value = actual_data[column].values[0]
-            logger.info(f"Using actual value for {column} in year {target_year}: {actual_value}")
-            return np.array([target_year]), np.array([float(actual_value)])
-    
-    # Drop rows with missing values in the specified column
-    df_clean = df.dropna(subset=[column])
+        data.append(place_data)
+    return data
+
+def predicted_year_data(snapshot, values):
+    """
+    Build per-place predicted metrics from one evaluated row of the coefficient table.
+    """
+    table = snapshot.coefficients
     
-    # Check if we have any data after dropping NaN values
-    if df_clean.empty:
-        logger.warning(f"No data available for {column} after dropping NaN values")
-        return np.array([target_year]), np.array([0.0])  # Return default values
+    def value(col):
+        return float(values[table.index[col]]) if col in table.index else 0.0
     
-    # If target year exists in our dataset (might be actual or predicted)
-    if target_year in df_clean['Year'].values:
-        # If there's 'isPredicted' column, prioritize non-predicted data
-        if 'isPredicted' in df_clean.columns:
-            actual_rows = df_clean[(df_clean['Year'] == target_year) & (df_clean['isPredicted'] == "false")]
-            if not actual_rows.empty:
-                target_value = actual_rows[column].values[0]
-                logger.debug(f"Found actual value for {column} in year {target_year}: {target_value}")
-                return np.array([target_year]), np.array([target_value])
+    # Get Visayas totals for consumption calculation
+    visayas_gen = value('Visayas Total Power Generation (GWh)')
+    visayas_consumption = value('Visayas Total Power Consumption (GWh)')
+
+    data = []
+    # Generate predictions for each subgrid
+    for place, df_place in snapshot.subgrid_data.items():
+        place_data = {
+            'place': place,
+            'metrics': {},
+            'isPredicted': True
+        }
         
-        # Otherwise, use any value for that year
-        target_value = df_clean[df_clean['Year'] == target_year][column].values[0]
-        logger.debug(f"Found value for {column} in year {target_year}: {target_value}")
-        return np.array([target_year]), np.array([target_value])
-    
-    # Get the maximum and minimum year in the data
-    max_year = df_clean['Year'].max()
-    min_year = df_clean['Year'].min()
-    
-    logger.debug(f"Predicting {column} for year {target_year}. Data range: {min_year}-{max_year}")
-    
-    # For future predictions
-    if target_year > max_year:
-        try:
-            # Prepare the data for regression
-            X = df_clean['Year'].values.reshape(-1, 1)  # X is the years
-            y = df_clean[column].values  # y is the values
+        # Predict generation
+        if 'Total Power Generation (GWh)' in df_place.columns:
+            gen_pred = value(f'{place} Total Power Generation (GWh)')
+            place_data['metrics']['Total Power Generation (GWh)'] = gen_pred
             
-            # Fit the model
-            model = LinearRegression()
-            model.fit(X, y)
-            
-            # Create single prediction point for the target year
-            pred_point = np.array([[target_year]])
-            prediction = model.predict(pred_point)
-            logger.debug(f"Predicted future value for {column} in year {target_year}: {prediction[0]}")
-            return np.array([target_year]), prediction
-        except Exception as e:
-            logger.error(f"Error predicting future value for {column} in year {target_year}: {e}")
-            return np.array([target_year]), np.array([0.0])
-    
-    # For interpolation (if target_year is between min and max)
-    if min_year < target_year < max_year:
-        try:
-            X = df_clean['Year'].values.reshape(-1, 1)
-            y = df_clean[column].values
-            
-            model = LinearRegression()
-            model.fit(X, y)
-            
-            pred_point = np.array([[target_year]])
-            prediction = model.predict(pred_point)
-            logger.debug(f"Interpolated value for {column} in year {target_year}: {prediction[0]}")
-            return np.array([target_year]), prediction
-        except Exception as e:
-            logger.error(f"Error interpolating value for {column} in year {target_year}: {e}")
-            return np.array([target_year]), np.array([0.0])
-    
-    # If target_year is before our earliest data
-    logger.warning(f"Target year {target_year} is before earliest data point {min_year}")
-    return np.array([target_year]), np.array([0.0])
+            # Calculate estimated consumption
+            if visayas_gen > 0:
+                ratio = gen_pred / visayas_gen
+                place_data['metrics']['Estimated Consumption (GWh)'] = ratio * visayas_consumption
+        
+        # Predict other metrics
+        for metric in metrics:
+            if metric in df_place.columns:
+                place_data['metrics'][metric] = value(f'{place} {metric}')
+        
+        data.append(place_data)
+    return data
 
 # Function to get predictions based on energy type and year range
 def get_peer_to_predictions(year=None):
@@ -300,7 +388,7 @@ def get_peer_to_predictions(year=None):
             year = datetime.datetime.now().year
         year = int(year)
         
-        logger.debug(f"Processing request for year: {year}")
+        logger.debug("Processing request for year: %s", year)
 
         # Initialize response structure
         response = {
@@ -310,103 +398,26 @@ def get_peer_to_predictions(year=None):
             'message': 'Data retrieved successfully'
         }
 
-        # Ensure data is properly typed (convert strings to numbers)
-        if 'Year' in df.columns:
-            df['Year'] = pd.to_numeric(df['Year'], errors='coerce')
-        
-        # Convert all numeric columns from strings to floats
-        for col in df.columns:
-            if col not in ['Year', 'isPredicted'] and df[col].dtype == 'object':
-                try:
-                    df[col] = df[col].str.replace(',', '').astype(float)
-                except (AttributeError, ValueError):
-                    pass
+        # Read one snapshot for the whole request
+        snapshot = get_snapshot()
 
         # Check for actual data first (isPredicted=False)
-        if 'isPredicted' in df.columns:
-            actual_data = df[(df['Year'] == year) & (df['isPredicted'] == False)]
-            
-            if not actual_data.empty:
-                logger.info(f"Returning actual data for year {year}")
-                for place in subgrids:
-                    place_data = {
-                        'place': place,
-                        'metrics': {},
-                        'isPredicted': False
-                    }
-                    
-                    for metric in metrics:
-                        col_name = f"{place} {metric}"
-                        if col_name in actual_data.columns:
-                            value = actual_data[col_name].iloc[0]
-                            try:
-                                place_data['metrics'][metric] = float(value)
-                            except (ValueError, TypeError):
-                                place_data['metrics'][metric] = 0.0
-                    
-                    response['data'].append(place_data)
-                return response
+        actual = actual_year_data(snapshot, year)
+        if actual is not None:
+            logger.info("Returning actual data for year %s", year)
+            response['data'] = actual
+            return response
 
         # If no actual data, generate predictions
-        logger.info(f"Generating predictions for year {year}")
+        logger.info("Generating predictions for year %s", year)
         
-        # Get Visayas totals for consumption calculation
-        visayas_gen = 0.0
-        visayas_consumption = 0.0
-        
-        if 'Visayas Total Power Generation (GWh)' in df.columns:
-            try:
-                _, visayas_gen = predict_future(df, 'Visayas Total Power Generation (GWh)', year)
-                visayas_gen = float(visayas_gen[0]) if len(visayas_gen) > 0 else 0.0
-            except Exception as e:
-                logger.error(f"Error predicting Visayas generation: {e}")
-
-        if 'Visayas Total Power Consumption (GWh)' in df.columns:
-            try:
-                _, visayas_consumption = predict_future(df, 'Visayas Total Power Consumption (GWh)', year)
-                visayas_consumption = float(visayas_consumption[0]) if len(visayas_consumption) > 0 else 0.0
-            except Exception as e:
-                logger.error(f"Error predicting Visayas consumption: {e}")
-
-        # Generate predictions for each subgrid
-        for place, df_place in subgrid_data.items():
-            place_data = {
-                'place': place,
-                'metrics': {},
-                'isPredicted': True
-            }
-            
-            # Predict generation
-            if 'Total Power Generation (GWh)' in df_place.columns:
-                try:
-                    _, gen_pred = predict_future(df_place, 'Total Power Generation (GWh)', year)
-                    gen_pred = float(gen_pred[0]) if len(gen_pred) > 0 else 0.0
-                    place_data['metrics']['Total Power Generation (GWh)'] = gen_pred
-                    
-                    # Calculate estimated consumption
-                    if visayas_gen > 0:
-                        ratio = gen_pred / visayas_gen
-                        place_data['metrics']['Estimated Consumption (GWh)'] = ratio * visayas_consumption
-                except Exception as e:
-                    logger.error(f"Error predicting generation for {place}: {e}")
-                    place_data['metrics']['Total Power Generation (GWh)'] = 0.0
-            
-            # Predict other metrics
-            for metric in metrics:
-                if metric in df_place.columns:
-                    try:
-                        _, pred = predict_future(df_place, metric, year)
-                        place_data['metrics'][metric] = float(pred[0]) if len(pred) > 0 else 0.0
-                    except Exception as e:
-                        logger.error(f"Error predicting {metric} for {place}: {e}")
-                        place_data['metrics'][metric] = 0.0
-            
-            response['data'].append(place_data)
+        # Every series for this year in one vectorized evaluation
+        response['data'] = predicted_year_data(snapshot, snapshot.coefficients.evaluate([year])[0])
         
         return response
 
     except Exception as e:
-        logger.error(f"Error processing request: {str(e)}")
+        logger.error("Error processing request: %s", e)
         return {
             'year': year if 'year' in locals() else datetime.datetime.now().year,
             'data': [],
@@ -414,11 +425,63 @@ def get_peer_to_predictions(year=None):
             'message': f"Error processing request: {str(e)}"
         }
 
+# Longest range served by get_peer_to_predictions_range
+MAX_RANGE_YEARS = 200
+
+def get_peer_to_predictions_range(start_year, end_year):
+    """
+    Get energy metrics for every year in a range in one call.
+    Predictions for all years and series are evaluated as one (years x series)
+    array; years with actual data (isPredicted=False) return that data instead.
+    
+    Parameters:
+        start_year (int/str): First year of the range
+        end_year (int/str): Last year of the range
+        
+    Returns:
+        dict: A dictionary with the structure {
+            'start_year': int,
+            'end_year': int,
+            'years': list of {'year': int, 'isPredicted': bool, 'data': list of place metrics},
+            'success': bool,
+            'message': str
+        }
+    """
+    start_year = int(start_year)
+    end_year = int(end_year)
+    if end_year < start_year:
+        raise ValueError("end_year must not be before start_year")
+    if end_year - start_year + 1 > MAX_RANGE_YEARS:
+        raise ValueError(f"Year range is limited to {MAX_RANGE_YEARS} years")
+    
+    snapshot = get_snapshot()
+    
+    years = np.arange(start_year, end_year + 1)
+    evaluated = snapshot.coefficients.evaluate(years)
+    
+    results = []
+    for i, year in enumerate(years.tolist()):
+        actual = actual_year_data(snapshot, year)
+        results.append({
+            'year': year,
+            'isPredicted': actual is None,
+            'data': actual if actual is not None else predicted_year_data(snapshot, evaluated[i])
+        })
+    
+    return {
+        'start_year': start_year,
+        'end_year': end_year,
+        'years': results,
+        'success': True,
+        'message': 'Data retrieved successfully'
+    }
+
 if __name__ == "__main__":
     try:
         # Check for actual data for year 2024
-        if 'Year' in df.columns and 'isPredicted' in df.columns:
-            actual_2024 = df[(df['Year'] == 2024) & (df['isPredicted'] == False)]
+        snapshot = get_snapshot()
+        if 'Year' in snapshot.df.columns:
+            actual_2024 = snapshot.actual[snapshot.actual['Year'] == 2024]
             print(f"Checking for actual 2024 data: Found {len(actual_2024)} records")
             if not actual_2024.empty:
                 print("First actual 2024 record:")
@@ -426,7 +489,7 @@ if __name__ == "__main__":
         
         # Continue with regular execution
         data = fetch_and_save_data()
-        print("Data successfully fetched and saved to peertopeer.xlsx")
+        print(f"Data successfully fetched and saved to {CACHE_DIR}")
         print("First few rows of the data:")
         print(data.head())
     except Exception as e:
@@ -0,0 +1,100 @@
+import os
+from collections import namedtuple
+import numpy as np
+
+# Default growth model for projected features; see GROWTH_MODELS
+DEFAULT_GROWTH_MODEL = os.getenv("GROWTH_MODEL", "mean_growth")
+# Window used by the last_n growth model
+GROWTH_LAST_N = int(os.getenv("GROWTH_LAST_N", "5"))
+
+# Fitted growth parameters for a set of columns.
+# kind is 'compound' (value = base * (1 + rate) ** steps) or 'linear' (value = base + rate * steps)
+GrowthParams = namedtuple('GrowthParams', ['model', 'kind', 'columns', 'base', 'rate', 'latest_year'])
+
+
+def _mean_growth(df, columns, last_n):
+    # Mean year-over-year growth over the whole history (the original behaviour)
+    return 'compound', df[columns].pct_change().mean().to_numpy(dtype=float)
+
+
+def _last_n_growth(df, columns, last_n):
+    # Mean year-over-year growth over the most recent last_n steps
+    return 'compound', df[columns].pct_change().tail(last_n).mean().to_numpy(dtype=float)
+
+
+def _cagr(df, columns, last_n):
+    # Compound annual growth rate between the first and last observation
+    values = df[columns].to_numpy(dtype=float)
+    years = df['Year'].to_numpy(dtype=float)
+    span = years[-1] - years[0]
+    if span <= 0:
+        return 'compound', np.zeros(len(columns))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = (values[-1] / values[0]) ** (1.0 / span) - 1.0
+    return 'compound', rate
+
+
+def _linear_trend(df, columns, last_n):
+    # Least-squares slope of each column against Year, solved for all columns at once
+    years = df['Year'].to_numpy(dtype=float)
+    values = df[columns].to_numpy(dtype=float)
+    centered = years - years.mean()
+    denom = (centered ** 2).sum()
+    if denom == 0:
+        return 'linear', np.zeros(len(columns))
+    slope = centered @ (values - values.mean(axis=0)) / denom
+    return 'linear', slope
+
+
+GROWTH_MODELS = {
+    'mean_growth': _mean_growth,
+    'last_n': _last_n_growth,
+    'cagr': _cagr,
+    'linear': _linear_trend,
+}
+
+
+def fit_growth(df, columns, model=None, last_n=GROWTH_LAST_N):
+    """
+    Fit growth parameters for the given columns in one vectorized pass.
+    The last row of df is the base for the projection.
+
+    Parameters:
+        df (DataFrame): History with a Year column, in chronological order
+        columns (list): Columns to project
+        model (str): One of GROWTH_MODELS, defaults to DEFAULT_GROWTH_MODEL
+        last_n (int): Window for the last_n model
+
+    Returns:
+        GrowthParams: Fitted parameters
+    """
+    model = model or DEFAULT_GROWTH_MODEL
+    if model not in GROWTH_MODELS:
+        raise ValueError(f"Unknown growth model: {model}. Expected one of {sorted(GROWTH_MODELS)}")
+    kind, rate = GROWTH_MODELS[model](df, columns, last_n)
+    base = df[columns].iloc[-1].to_numpy(dtype=float)
+    latest_year = float(df['Year'].iloc[-1])
+    return GrowthParams(model, kind, list(columns), base, np.asarray(rate, dtype=float), latest_year)
+
+
+def project(params, years, rate=None):
+    """
+    Evaluate fitted growth for every year with NumPy broadcasting.
+
+    Parameters:
+        params (GrowthParams): Output of fit_growth
+        years (array-like): Horizon years, shape (Y,)
+        rate (ndarray): Optional growth rates overriding params.rate,
+            shape (F,) or (S, F) for S scenarios
+
+    Returns:
+        ndarray: Projected values, shape (Y, F) or (S, Y, F) when rate is 2-D
+    """
+    rate = params.rate if rate is None else np.asarray(rate, dtype=float)
+    steps = np.asarray(years, dtype=float) - params.latest_year
+    # rate[..., None, :] lines scenarios and features up against the year axis
+    rate = rate[..., np.newaxis, :]
+    steps = steps[:, np.newaxis]
+    if params.kind == 'linear':
+        return params.base + rate * steps
+    return params.base * (1.0 + rate) ** steps
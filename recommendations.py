@@ -1,31 +1,43 @@
 import numpy as np
 import pandas as pd
-from scipy.optimize import curve_fit
 from sklearn.preprocessing import PolynomialFeatures
 from sklearn.linear_model import LinearRegression
 import os
-import time
 import logging
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure
+import threading
+import hashlib
+import tempfile
+from mongo_pool import get_collection
+from metrics import incr, timer, trace
+from schema import normalize_document
 import json
 from django.views.decorators.csrf import csrf_exempt
 from django.http import JsonResponse
 
-# Configure logger
-logging.basicConfig(level=logging.DEBUG)
+# Logging is configured centrally in backend/settings.py
 logger = logging.getLogger(__name__)
 
-# Load dataset
+# Dataset source; loaded and fitted on first use
 script_dir = os.path.dirname(os.path.abspath(__file__))
 file_path = os.path.join(script_dir, 'recommendation.xlsx')
 
-try:
-    df = pd.read_excel(file_path)
-    logger.info(f"Successfully loaded data from {file_path}")
-except Exception as e:
-    logger.error(f"Error loading data from {file_path}: {e}")
-    df = pd.DataFrame()  # Create empty DataFrame as fallback
+# Fitted parameters are stored here and reused while the data is unchanged
+ARTIFACT_PATH = os.getenv("RECOMMENDATION_ARTIFACT", os.path.join(script_dir, 'recommendation_models.npz'))
+
+_models = None
+_models_lock = threading.Lock()
+
+def load_recommendation_data():
+    """
+    Read recommendation.xlsx, falling back to an empty DataFrame.
+    """
+    try:
+        df = pd.read_excel(file_path)
+        logger.info("Successfully loaded data from %s", file_path)
+    except Exception as e:
+        logger.error("Error loading data from %s: %s", file_path, e)
+        df = pd.DataFrame()  # Create empty DataFrame as fallback
+    return df
 
 # Function to check if actual data exists for a specific year
 def get_actual_data_for_year(year):
@@ -39,46 +51,196 @@ def get_actual_data_for_year(year):
         dict: Actual data if found, None otherwise
     """
     try:
-        if 'isPredicted' in df.columns and 'Year' in df.columns:
-            actual_data = df[(df['Year'] == year) & (df['isPredicted'] == False)]
+        actual_values = get_models()['actual'].get(int(year))
+        if actual_values is not None:
+            logger.info("Found actual data for year %s", year)
+            return dict(actual_values)
             
-            if not actual_data.empty:
-                # Convert DataFrame row to dict
-                actual_values = actual_data.iloc[0].to_dict()
-                logger.info(f"Found actual data for year {year}")
-                return actual_values
-            
-        logger.debug(f"No actual data found for year {year}")
+        logger.debug("No actual data found for year %s", year)
         return None
     except Exception as e:
-        logger.error(f"Error checking for actual data: {e}")
+        logger.error("Error checking for actual data: %s", e)
         return None
 
-# Prepare data
-X = df[['Year']].values.flatten()  # Convert to 1D array
-y_solar_cost = df['Solar Cost (PHP/W)'] * 1000  # Convert to PHP/kW
-y_meralco_rate = df['MERALCO Rate (PHP/kWh)']
+# Define the exponential decay function
+def exp_decay(x, a, b, c, x_min):
+    return a * np.exp(-b * (x - x_min)) + c  # Shift x to prevent large exponent values
 
-# --- Step 1: Fit Exponential Decay Model to Solar Cost ---
+def fit_recommendation_models(df):
+    """
+    Fit the solar cost and MERALCO rate models on the recommendation data.
+    The MERALCO quadratic is reduced to plain coefficients [c0, c1, c2] for
+    c0 + c1 * year + c2 * year ** 2, which is exactly what the fitted
+    PolynomialFeatures + LinearRegression pipeline computes.
+    """
+    from scipy.optimize import curve_fit  # Only needed when fitting
 
-# Define the exponential decay function
-def exp_decay(x, a, b, c):
-    return a * np.exp(-b * (x - X.min())) + c  # Shift x to prevent large exponent values
+    # Prepare data
+    X = df[['Year']].values.flatten()  # Convert to 1D array
+    y_solar_cost = df['Solar Cost (PHP/W)'] * 1000  # Convert to PHP/kW
+    y_meralco_rate = df['MERALCO Rate (PHP/kWh)']
+    x_min = float(X.min())
+
+    # --- Step 1: Fit Exponential Decay Model to Solar Cost ---
+    popt, _ = curve_fit(lambda x, a, b, c: exp_decay(x, a, b, c, x_min), X, y_solar_cost, maxfev=5000)
+
+    # --- Step 2: Fit Polynomial Regression Model to MERALCO Rate ---
+    poly = PolynomialFeatures(degree=2)  # Quadratic model for MERALCO rates
+    X_poly = poly.fit_transform(X.reshape(-1, 1))  # Transform X for polynomial regression
+
+    # Train Polynomial Regression for MERALCO Rate
+    model_meralco = LinearRegression()
+    model_meralco.fit(X_poly, y_meralco_rate)
+    meralco_coef = np.array(model_meralco.coef_, dtype=float)
+    meralco_coef[0] += model_meralco.intercept_
+
+    # Actual (non-predicted) values per year, first row wins
+    actual_years = np.array([], dtype=float)
+    actual_solar_cost = np.array([], dtype=float)
+    actual_meralco_rate = np.array([], dtype=float)
+    if 'isPredicted' in df.columns and 'Year' in df.columns:
+        actual = df[df['isPredicted'] == False].drop_duplicates(subset='Year', keep='first')
+        actual = actual.dropna(subset=['Solar Cost (PHP/W)', 'MERALCO Rate (PHP/kWh)'])
+        actual_years = actual['Year'].to_numpy(dtype=float)
+        actual_solar_cost = actual['Solar Cost (PHP/W)'].to_numpy(dtype=float)
+        actual_meralco_rate = actual['MERALCO Rate (PHP/kWh)'].to_numpy(dtype=float)
+
+    return {
+        'x_min': x_min,
+        'popt': np.asarray(popt, dtype=float),
+        'meralco_coef': meralco_coef,
+        'actual_years': actual_years,
+        'actual_solar_cost': actual_solar_cost,
+        'actual_meralco_rate': actual_meralco_rate,
+    }
+
+def data_fingerprint():
+    """
+    Hash of recommendation.xlsx, which mirrors the actual data in MongoDB.
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return ''
 
-# Fit the exponential model to the data
-popt, _ = curve_fit(exp_decay, X, y_solar_cost, maxfev=5000)
+def save_artifact(params, fingerprint):
+    """
+    Write fitted parameters to the artifact atomically.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(ARTIFACT_PATH), suffix='.npz')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, fingerprint=np.array(fingerprint), **params)
+        os.replace(tmp_path, ARTIFACT_PATH)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    logger.info("Saved recommendation models to %s", ARTIFACT_PATH)
+
+def load_artifact(fingerprint):
+    """
+    Return the stored parameters if the artifact matches fingerprint, else None.
+    """
+    try:
+        with np.load(ARTIFACT_PATH, allow_pickle=False) as artifact:
+            if str(artifact['fingerprint']) != fingerprint:
+                return None
+            params = {key: artifact[key] for key in artifact.files if key != 'fingerprint'}
+    except (FileNotFoundError, KeyError, ValueError, OSError) as e:
+        logger.warning("Recommendation artifact unusable, refitting: %s", e)
+        return None
+    params['x_min'] = float(params['x_min'])
+    return params
+
+def build_artifact(force=False, strict=False):
+    """
+    Fit the recommendation models and store them in the artifact, unless an
+    artifact for the current data already exists. Returns the parameters.
+    A failed artifact write is logged and the fitted parameters are still
+    returned, unless strict is set.
+    """
+    fingerprint = data_fingerprint()
+    params = None if force else load_artifact(fingerprint)
+    if params is None:
+        params = fit_recommendation_models(load_recommendation_data())
+        try:
+            save_artifact(params, fingerprint)
+        except Exception as e:
+            if strict:
+                raise
+            logger.error("Could not save recommendation artifact %s, serving the fitted models from memory: %s",
+                         ARTIFACT_PATH, e)
+    return params
+
+def _file_signature(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+def _source_signature():
+    """
+    mtime and size of the data file and the artifact. Another worker
+    refreshing either one changes the signature.
+    """
+    return (_file_signature(file_path), _file_signature(ARTIFACT_PATH))
+
+def _models_from_params(params, signature=None):
+    actual = {
+        int(year): {
+            'Year': int(year),
+            'Solar Cost (PHP/W)': float(cost),
+            'MERALCO Rate (PHP/kWh)': float(rate),
+            'isPredicted': False,
+        }
+        for year, cost, rate in zip(params['actual_years'], params['actual_solar_cost'], params['actual_meralco_rate'])
+    }
+    return {**params, 'actual': actual, 'signature': signature}
+
+def get_models():
+    """
+    Return the recommendation models, loading the prebuilt artifact on first use.
+    The models are reloaded when the data file or the artifact changes on disk,
+    so every worker picks up a refresh made by another one, and refitted only
+    when the recommendation data has changed.
+    """
+    global _models
+    models = _models
+    if models is None or models['signature'] != _source_signature():
+        with _models_lock:
+            if _models is None or _models['signature'] != _source_signature():
+                data_signature = _file_signature(file_path)
+                params = build_artifact()
+                _models = _models_from_params(params, (data_signature, _file_signature(ARTIFACT_PATH)))
+            models = _models
+    return models
+
+def reset_models():
+    """
+    Drop the loaded models so the next request picks up fresh data.
+    """
+    global _models
+    _models = None
+
+def warm_up():
+    """
+    Load the recommendation models ahead of the first request, fitting them
+    only if the artifact is missing or stale.
+    """
+    get_models()
 
 # Function to predict solar cost using the fitted model
 def predict_solar_cost(year):
-    return max(exp_decay(year, *popt), 20000)  # Keep above PHP 10,000 per kW
-
-# --- Step 2: Fit Polynomial Regression Model to MERALCO Rate ---
-poly = PolynomialFeatures(degree=2)  # Quadratic model for MERALCO rates
-X_poly = poly.fit_transform(X.reshape(-1, 1))  # Transform X for polynomial regression
+    models = get_models()
+    return max(exp_decay(year, *models['popt'], models['x_min']), 20000)  # Keep above PHP 10,000 per kW
 
-# Train Polynomial Regression for MERALCO Rate
-model_meralco = LinearRegression()
-model_meralco.fit(X_poly, y_meralco_rate)
+# Function to predict the MERALCO rate using the fitted quadratic
+def predict_meralco_rate(year):
+    c0, c1, c2 = get_models()['meralco_coef']
+    return max(float(c0 + c1 * year + c2 * year ** 2), 0)
 
 # --- Step 3: Prediction Function ---
 def predict_solar_capacity_and_roi(budget, year):
@@ -87,10 +249,11 @@ def predict_solar_capacity_and_roi(budget, year):
     Use actual data if available, otherwise generate predictions.
     """
     # First check if we have actual data for this year
-    actual_data = get_actual_data_for_year(year)
+    with timer('solar_roi_stage', stage='actual_lookup'):
+        actual_data = get_actual_data_for_year(year)
     
     if actual_data and 'Solar Cost (PHP/W)' in actual_data and 'MERALCO Rate (PHP/kWh)' in actual_data:
-        logger.info(f"Using actual data for year {year} instead of predictions")
+        logger.info("Using actual data for year %s instead of predictions", year)
         
         # Use actual values from the data
         try:
@@ -105,6 +268,7 @@ def predict_solar_capacity_and_roi(budget, year):
             yearly_savings = yearly_energy_production * predicted_meralco_rate
             roi_years = budget / yearly_savings if yearly_savings > 0 else float('inf')
             
+            incr('solar_roi_requests', source='actual')
             return {
                 'year': year,
                 'predicted_solar_cost': predicted_solar_cost,
@@ -116,7 +280,7 @@ def predict_solar_capacity_and_roi(budget, year):
                 'is_actual_data': True
             }
         except Exception as e:
-            logger.error(f"Error using actual data: {e}. Falling back to predictions.")
+            logger.error("Error using actual data: %s. Falling back to predictions.", e)
             # Fall through to predictions if actual data processing fails
     
     # If no actual data or processing failed, generate predictions
@@ -125,10 +289,9 @@ def predict_solar_capacity_and_roi(budget, year):
         budget = float(budget)
         year = int(year)
         
-        year_poly = poly.transform(np.array([[year]]))  # Transform year for polynomial model
-
-        predicted_solar_cost = predict_solar_cost(year)  # Exponential decay for solar cost
-        predicted_meralco_rate = max(model_meralco.predict(year_poly)[0], 0)  # Polynomial regression for MERALCO rate
+        with timer('solar_roi_stage', stage='predict'):
+            predicted_solar_cost = predict_solar_cost(year)  # Exponential decay for solar cost
+            predicted_meralco_rate = predict_meralco_rate(year)  # Polynomial regression for MERALCO rate
 
         # Calculate installable solar capacity
         capacity_kw = budget / predicted_solar_cost if predicted_solar_cost > 0 else 0
@@ -145,14 +308,19 @@ def predict_solar_capacity_and_roi(budget, year):
         # Calculate ROI (simple payback period)
         roi_years = budget / yearly_savings if yearly_savings > 0 else float('inf')
 
-        # Display the results
-        print(f"Year of Investment: {year}")
-        print(f"Predicted Solar Cost: PHP {predicted_solar_cost:.2f} per kW")
-        print(f"Predicted MERALCO Rate: PHP {predicted_meralco_rate:.2f} per kWh")
-        print(f"Installable Solar Capacity: {capacity_kw:.2f} kW")
-        print(f"Estimated Yearly Energy Production: {yearly_energy_production:.2f} kWh")
-        print(f"Estimated Yearly Savings: PHP {yearly_savings:.2f}")
-        print(f"Estimated ROI (Payback Period): {roi_years:.2f} years")
+        # Record a sample of inputs and outputs instead of writing them to stdout
+        incr('solar_roi_requests', source='predicted')
+        trace(
+            'solar_roi',
+            year=year,
+            budget=budget,
+            predicted_solar_cost=predicted_solar_cost,
+            predicted_meralco_rate=predicted_meralco_rate,
+            capacity_kw=capacity_kw,
+            yearly_energy_production=yearly_energy_production,
+            yearly_savings=yearly_savings,
+            roi_years=roi_years if roi_years != float('inf') else None
+        )
 
         return {
             'year': year,
@@ -164,7 +332,8 @@ def predict_solar_capacity_and_roi(budget, year):
             'roi_years': roi_years
         }
     except Exception as e:
-        logger.error(f"Error in predict_solar_capacity_and_roi: {e}")
+        logger.error("Error in predict_solar_capacity_and_roi: %s", e)
+        incr('solar_roi_requests', source='error')
         return {
             'year': year,
             'predicted_solar_cost': None,
@@ -176,6 +345,102 @@ def predict_solar_capacity_and_roi(budget, year):
             'is_actual_data': False
         }
 
+# Average daily solar production per installed kW
+AVG_DAILY_PRODUCTION_KWH = 4
+# Upper bound on years x budgets evaluated in one batch
+MAX_ROI_GRID_POINTS = int(os.getenv("MAX_ROI_GRID_POINTS", "10000"))
+
+def solar_roi_grid(years, budgets):
+    """
+    Evaluate solar capacity and ROI for every (year, budget) pair with NumPy broadcasting.
+    Years with actual data use the actual solar cost and MERALCO rate, as in
+    predict_solar_capacity_and_roi.
+
+    Parameters:
+        years (array-like): Investment years, shape (Y,)
+        budgets (array-like): Budgets in PHP, shape (B,)
+
+    Returns:
+        dict: Per-year arrays (year, predicted_solar_cost, predicted_meralco_rate,
+              is_actual_data) of shape (Y,) and per-pair arrays (capacity_kw,
+              yearly_energy_production, yearly_savings, roi_years) of shape (Y, B)
+    """
+    years = np.atleast_1d(np.asarray(years, dtype=int))
+    budgets = np.atleast_1d(np.asarray(budgets, dtype=float))
+    if years.ndim != 1 or budgets.ndim != 1:
+        raise ValueError("years and budgets must be flat lists")
+    if years.size * budgets.size > MAX_ROI_GRID_POINTS:
+        raise ValueError(f"{years.size} years x {budgets.size} budgets exceeds the limit of {MAX_ROI_GRID_POINTS} points")
+
+    models = get_models()
+    x = years.astype(float)
+
+    # Per-year curves, evaluated once for the whole grid
+    solar_cost = np.maximum(exp_decay(x, *models['popt'], models['x_min']), 20000)
+    c0, c1, c2 = models['meralco_coef']
+    meralco_rate = np.maximum(c0 + c1 * x + c2 * x ** 2, 0)
+
+    # Actual values take precedence over the fitted curves
+    is_actual = np.isin(years, models['actual_years'].astype(int))
+    if is_actual.any():
+        order = np.argsort(models['actual_years'])
+        positions = order[np.searchsorted(models['actual_years'], x[is_actual], sorter=order)]
+        solar_cost[is_actual] = models['actual_solar_cost'][positions] * 1000  # Convert to PHP/kW
+        meralco_rate[is_actual] = models['actual_meralco_rate'][positions]
+
+    # (Y, 1) per-year terms against (1, B) budgets
+    cost = solar_cost[:, np.newaxis]
+    rate = meralco_rate[:, np.newaxis]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        capacity_kw = np.where(cost > 0, budgets / cost, 0.0)
+        yearly_energy_production = capacity_kw * AVG_DAILY_PRODUCTION_KWH * 365
+        yearly_savings = yearly_energy_production * rate
+        roi_years = np.where(yearly_savings > 0, budgets / yearly_savings, np.inf)
+
+    return {
+        'year': years,
+        'budget': budgets,
+        'predicted_solar_cost': solar_cost,
+        'predicted_meralco_rate': meralco_rate,
+        'is_actual_data': is_actual,
+        'capacity_kw': capacity_kw,
+        'yearly_energy_production': yearly_energy_production,
+        'yearly_savings': yearly_savings,
+        'roi_years': roi_years,
+    }
+
+def _grid_values(values):
+    # Infinite payback periods and NaN are sent as null
+    values = np.asarray(values, dtype=float)
+    return np.where(np.isfinite(values), values, None).tolist()
+
+def get_batch_solar_recommendations(years, budgets):
+    """
+    Get the ROI surface for many years and budgets as JSON-ready lists.
+
+    Parameters:
+        years (list): Investment years
+        budgets (list): Budgets in PHP
+
+    Returns:
+        dict: years and budgets axes, per-year rates and costs, and
+              year x budget matrices for capacity, production, savings and ROI
+    """
+    with timer('solar_roi_stage', stage='grid'):
+        grid = solar_roi_grid(years, budgets)
+    incr('solar_roi_grid_points', grid['capacity_kw'].size)
+    return {
+        'years': grid['year'].tolist(),
+        'budgets': grid['budget'].tolist(),
+        'predicted_solar_cost': _grid_values(grid['predicted_solar_cost']),
+        'predicted_meralco_rate': _grid_values(grid['predicted_meralco_rate']),
+        'is_actual_data': grid['is_actual_data'].tolist(),
+        'capacity_kw': _grid_values(grid['capacity_kw']),
+        'yearly_energy_production': _grid_values(grid['yearly_energy_production']),
+        'yearly_savings': _grid_values(grid['yearly_savings']),
+        'roi_years': _grid_values(grid['roi_years']),
+    }
+
 def get_solar_recommendations(year, budget):
     """
     Get solar recommendations based on the given year and budget.
@@ -222,18 +487,12 @@ def get_solar_recommendations(year, budget):
         'cost_benefit_analysis': cost_benefit_analysis
     }
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
-logger = logging.getLogger(__name__)
-
 # MongoDB connection details
-MONGO_URL = os.getenv("MONGO_URL")  # Load MongoDB URI from environment variables
-DATABASE_NAME = "ecopulse"  # Database name
 RECOMMENDATION_COLLECTION = "recommendation"  # Collection name for recommendations
 
 def connect_to_mongodb_recommendation(retries=3, delay=5):
     """
-    Connect to MongoDB Atlas and return the recommendations collection.
+    Return the recommendations collection from the shared MongoDB client.
     Retries the connection in case of failure.
     
     Parameters:
@@ -243,21 +502,7 @@ def connect_to_mongodb_recommendation(retries=3, delay=5):
     Returns:
         pymongo.collection.Collection: The MongoDB collection for recommendations
     """
-    for attempt in range(retries):
-        try:
-            client = MongoClient(MONGO_URL, serverSelectionTimeoutMS=5000)
-            db = client[DATABASE_NAME]
-            collection = db[RECOMMENDATION_COLLECTION]
-            # Attempt to ping the server to check the connection
-            client.admin.command('ping')
-            logger.debug("Connected to MongoDB Atlas recommendations successfully.")
-            return collection
-        except ConnectionFailure as e:
-            logger.error(f"Error connecting to MongoDB recommendations (attempt {attempt + 1}): {e}")
-            if attempt < retries - 1:
-                time.sleep(delay)
-            else:
-                raise
+    return get_collection(RECOMMENDATION_COLLECTION, retries=retries, delay=delay)
 
 def fetch_recommendation_data():
     """
@@ -285,11 +530,14 @@ def fetch_recommendation_data():
         
         # Save to Excel, overwriting the existing file
         df.to_excel(file_path, index=False)
-        logger.info(f"Successfully saved {len(df)} actual records to {file_path}")
+        logger.info("Successfully saved %s actual records to %s", len(df), file_path)
+        
+        # Refit from the new data on next use
+        reset_models()
         
         return df
     except Exception as e:
-        logger.error(f"Error in fetch_recommendation_data: {e}")
+        logger.error("Error in fetch_recommendation_data: %s", e)
         return None
 
 @csrf_exempt
@@ -335,11 +583,8 @@ def recommendation_records(request):
             
         elif request.method == 'POST':
             # Parse request body
-            data = json.loads(request.body)
-            
-            # Ensure Year is stored as integer
-            if 'Year' in data:
-                data['Year'] = int(data['Year'])
+            # Store canonical field names and real numbers
+            data = normalize_document(json.loads(request.body))
             
             # Add the isPredicted flag and set to False for actual data
             data["isPredicted"] = False
@@ -365,7 +610,7 @@ def recommendation_records(request):
             
     except Exception as e:
         # Log the error
-        logger.error(f"Error in recommendation_records: {str(e)}")
+        logger.error("Error in recommendation_records: %s", e)
         
         # Return error response
         return JsonResponse({
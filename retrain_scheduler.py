@@ -0,0 +1,124 @@
+import os
+import time
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Seconds without new writes before a retrain starts
+RETRAIN_DEBOUNCE_SECONDS = float(os.getenv("RETRAIN_DEBOUNCE_SECONDS", "5"))
+# Upper bound on how long a steady stream of writes can postpone a retrain
+RETRAIN_MAX_DELAY_SECONDS = float(os.getenv("RETRAIN_MAX_DELAY_SECONDS", "60"))
+
+
+class RetrainScheduler:
+    """
+    Coalesce retrain requests into debounced jobs run on a background thread.
+
+    Every request() pushes the job back by the debounce window (capped by the
+    max delay), so a burst of writes results in a single training run. Requests
+    that arrive while a job is running schedule exactly one follow-up job.
+    """
+    def __init__(self, train_fn, debounce=RETRAIN_DEBOUNCE_SECONDS, max_delay=RETRAIN_MAX_DELAY_SECONDS):
+        self.train_fn = train_fn
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self._pid = os.getpid()
+        self._init_state()
+
+    def _init_state(self):
+        self._cond = threading.Condition()
+        self._thread = None
+        self._first_request = None
+        self._last_request = None
+        self._pending_reasons = []
+        self._running = False
+        self.stats = {
+            'requests': 0,
+            'runs': 0,
+            'failures': 0,
+            'last_started': None,
+            'last_duration': None,
+            'last_result': None,
+            'last_reasons': [],
+        }
+
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='retrain-scheduler', daemon=True)
+            self._thread.start()
+
+    def request(self, reason=''):
+        """
+        Ask for a retrain. Returns immediately.
+        """
+        # Threads do not survive fork, so each worker process starts its own
+        if self._pid != os.getpid():
+            self._init_state()
+            self._pid = os.getpid()
+        with self._cond:
+            self._ensure_worker()
+            now = time.monotonic()
+            if self._first_request is None:
+                self._first_request = now
+            self._last_request = now
+            self._pending_reasons.append(reason)
+            self.stats['requests'] += 1
+            self._cond.notify()
+
+    def _due_in(self, now):
+        """
+        Seconds until the pending job should start.
+        """
+        quiet_deadline = self._last_request + self.debounce
+        hard_deadline = self._first_request + self.max_delay
+        return min(quiet_deadline, hard_deadline) - now
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._first_request is None:
+                    self._cond.wait()
+                wait = self._due_in(time.monotonic())
+                while wait > 0:
+                    self._cond.wait(timeout=wait)
+                    wait = self._due_in(time.monotonic())
+                reasons = self._pending_reasons
+                self._pending_reasons = []
+                self._first_request = None
+                self._last_request = None
+                self._running = True
+
+            started = time.time()
+            logger.info("Retraining models for %s coalesced request(s)", len(reasons))
+            try:
+                result = self.train_fn()
+                failed = isinstance(result, dict) and result.get('status') == 'error'
+            except Exception as e:
+                logger.error("Background retrain failed: %s", e)
+                result = {'status': 'error', 'message': str(e)}
+                failed = True
+
+            with self._cond:
+                self._running = False
+                self.stats['runs'] += 1
+                if failed:
+                    self.stats['failures'] += 1
+                self.stats['last_started'] = started
+                self.stats['last_duration'] = time.time() - started
+                self.stats['last_result'] = result
+                self.stats['last_reasons'] = reasons
+
+    def status(self):
+        """
+        Return scheduler state and counters for diagnostics.
+        """
+        with self._cond:
+            return {
+                **self.stats,
+                'pending': self._first_request is not None,
+                'pending_requests': len(self._pending_reasons),
+                'running': self._running,
+                'debounce_seconds': self.debounce,
+                'max_delay_seconds': self.max_delay,
+            }
@@ -0,0 +1,321 @@
+import os
+import re
+import datetime
+import logging
+import numpy as np
+import pandas as pd
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from mongo_pool import get_client, DATABASE_NAME
+
+logger = logging.getLogger(__name__)
+
+# Plain or thousands-separated numbers such as "1234", "1,234.5" or "-0.75"
+NUMBER_PATTERN = re.compile(r'^[-+]?(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?$|^[-+]?\.\d+$')
+
+# Legacy field spellings and their canonical names
+FIELD_ALIASES = {'year': 'Year'}
+
+# Flags stored as real booleans
+BOOLEAN_FIELDS = ('isPredicted', 'isDeleted')
+TRUE_VALUES = ('true', 't', '1', 'yes', 'y')
+
+# Fields never converted
+SKIP_FIELDS = ('_id',)
+
+# Numeric fields: these names, plus every field named with a unit such as
+# "Solar (GWh)", "Population (in millions)" or "Solar Cost (PHP/W)". Only
+# these are converted from strings; anything else is stored as sent.
+NUMERIC_FIELDS = ('Year', 'Gross Domestic Product', 'Latitude', 'Longitude')
+UNIT_SUFFIX = re.compile(r'\([^()]+\)$')
+
+# Collections covered by the migration. touch sets updatedAt on migrated
+# documents so the predictiveAnalysis cache probe notices the change.
+MIGRATION_TARGETS = {
+    'predictiveAnalysis': {'touch': True},
+    'peertopeer': {'touch': False},
+    'recommendation': {'touch': False},
+}
+MIGRATIONS_COLLECTION = 'migrations'
+MIGRATION_NAME = 'normalize_schema'
+DEFAULT_BATCH_SIZE = 500
+
+# infer_dtype results for object columns that hold only numbers and nulls
+NUMERIC_KINDS = ('integer', 'floating', 'mixed-integer-float', 'decimal', 'empty')
+
+# Upper bound on rows accepted by one bulk ingest request
+MAX_BULK_ROWS = int(os.getenv("MAX_BULK_ROWS", "10000"))
+
+
+def parse_number(value):
+    """
+    Return value as an int or float if it is a numeric string, else the value unchanged.
+    """
+    if not isinstance(value, str):
+        return value
+    text = value.strip()
+    if not NUMBER_PATTERN.match(text):
+        return value
+    text = text.replace(',', '')
+    number = float(text)
+    return int(number) if number.is_integer() and '.' not in text else number
+
+
+def is_numeric_field(key):
+    """
+    True for fields that hold numbers, see NUMERIC_FIELDS.
+    """
+    return key in NUMERIC_FIELDS or bool(UNIT_SUFFIX.search(key))
+
+
+def parse_bool(value):
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        return bool(value)
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+def normalize_document(doc):
+    """
+    Return a canonical copy of a document: legacy field names renamed, and
+    in numeric fields (see is_numeric_field) numeric strings converted to
+    numbers and blank strings to None; flags become booleans. Other fields,
+    e.g. identifiers like "007", are left as they are. Used at ingest and by
+    the migration.
+    """
+    normalized = {}
+    for key, value in doc.items():
+        if key in FIELD_ALIASES:
+            if FIELD_ALIASES[key] in doc:
+                # Both spellings present; the canonical one wins
+                continue
+            key = FIELD_ALIASES[key]
+        if key in SKIP_FIELDS:
+            normalized[key] = value
+        elif key in BOOLEAN_FIELDS:
+            normalized[key] = parse_bool(value)
+        elif isinstance(value, str) and is_numeric_field(key):
+            normalized[key] = None if not value.strip() else parse_number(value)
+        else:
+            normalized[key] = value
+    if isinstance(normalized.get('Year'), float) and normalized['Year'].is_integer():
+        normalized['Year'] = int(normalized['Year'])
+    return normalized
+
+
+def document_changes(doc):
+    """
+    Return the ($set, $unset) needed to normalize a stored document in place.
+    """
+    normalized = normalize_document(doc)
+    to_set = {
+        key: value for key, value in normalized.items()
+        if key not in doc or doc[key] is not value and (doc[key] != value or type(doc[key]) is not type(value))
+    }
+    to_unset = {key: '' for key in doc if key not in normalized}
+    return to_set, to_unset
+
+
+def _progress_id(collection_name):
+    return f'{MIGRATION_NAME}:{collection_name}'
+
+
+def migration_status(db=None):
+    """
+    Return the stored progress of the schema migration per collection.
+    """
+    db = db if db is not None else get_client()[DATABASE_NAME]
+    progress = {doc['_id']: doc for doc in db[MIGRATIONS_COLLECTION].find({'name': MIGRATION_NAME})}
+    return {name: progress.get(_progress_id(name)) for name in MIGRATION_TARGETS}
+
+
+def normalize_collection(collection_name, db=None, batch_size=DEFAULT_BATCH_SIZE, restart=False):
+    """
+    Normalize every document of a collection in _id order, one batch at a time.
+    Progress is saved in the migrations collection after each batch, so an
+    interrupted run resumes where it stopped.
+
+    Parameters:
+        collection_name (str): One of MIGRATION_TARGETS
+        db (pymongo.database.Database): Target database, defaults to ecopulse
+        batch_size (int): Documents per read and bulk write
+        restart (bool): Ignore saved progress and start from the beginning
+
+    Returns:
+        dict: Progress document with processed and modified counts
+    """
+    if collection_name not in MIGRATION_TARGETS:
+        raise ValueError(f"Unknown collection: {collection_name}. Expected one of {sorted(MIGRATION_TARGETS)}")
+    db = db if db is not None else get_client()[DATABASE_NAME]
+    collection = db[collection_name]
+    migrations = db[MIGRATIONS_COLLECTION]
+    touch = MIGRATION_TARGETS[collection_name]['touch']
+    progress_id = _progress_id(collection_name)
+
+    progress = None if restart else migrations.find_one({'_id': progress_id})
+    if progress is None:
+        progress = {'_id': progress_id, 'name': MIGRATION_NAME, 'collection': collection_name,
+                    'last_id': None, 'processed': 0, 'modified': 0, 'done': False}
+    elif progress.get('done'):
+        return progress
+
+    while True:
+        query = {'_id': {'$gt': progress['last_id']}} if progress['last_id'] is not None else {}
+        batch = list(collection.find(query, sort=[('_id', 1)], limit=batch_size))
+        if not batch:
+            break
+
+        requests = []
+        for doc in batch:
+            to_set, to_unset = document_changes(doc)
+            if not to_set and not to_unset:
+                continue
+            update = {}
+            if to_set:
+                update['$set'] = to_set
+            if to_unset:
+                update['$unset'] = to_unset
+            if touch:
+                update.setdefault('$set', {})['updatedAt'] = datetime.datetime.now(datetime.timezone.utc)
+            requests.append(UpdateOne({'_id': doc['_id']}, update))
+        if requests:
+            result = collection.bulk_write(requests, ordered=False)
+            progress['modified'] += result.modified_count
+
+        progress['processed'] += len(batch)
+        progress['last_id'] = batch[-1]['_id']
+        progress['updatedAt'] = datetime.datetime.now(datetime.timezone.utc)
+        migrations.replace_one({'_id': progress_id}, progress, upsert=True)
+        logger.info("Normalized %s: %s processed, %s modified", collection_name,
+                    progress['processed'], progress['modified'])
+
+    progress['done'] = True
+    progress['updatedAt'] = datetime.datetime.now(datetime.timezone.utc)
+    migrations.replace_one({'_id': progress_id}, progress, upsert=True)
+    return progress
+
+
+class RowValidationError(ValueError):
+    """
+    Raised when a bulk ingest batch has invalid rows; errors lists them all.
+    """
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} invalid row(s); nothing was written")
+        self.errors = errors
+
+
+def validate_rows(rows):
+    """
+    Normalize and validate a batch of rows in one vectorized pass.
+    Every row needs an integral Year, Years must be unique within the batch,
+    and numeric fields (see is_numeric_field) must be numbers or null;
+    booleans are neither Years nor numbers. Other fields are not checked.
+
+    Parameters:
+        rows (list): Raw row dicts
+
+    Returns:
+        tuple: (docs, errors) where docs are the normalized rows and errors is
+               a list of {'row', 'field', 'message'} dicts, empty when all rows are valid
+    """
+    if len(rows) > MAX_BULK_ROWS:
+        raise ValueError(f"{len(rows)} rows submitted; the limit is {MAX_BULK_ROWS}")
+    errors = [
+        {'row': i, 'field': None, 'message': 'Row must be a JSON object'}
+        for i, row in enumerate(rows) if not isinstance(row, dict)
+    ]
+    if errors:
+        return [], errors
+
+    # Clients cannot choose _id; upserts match on Year
+    docs = [{k: v for k, v in normalize_document(row).items() if k != '_id'} for row in rows]
+    frame = pd.DataFrame(docs).drop(columns=list(SKIP_FIELDS), errors='ignore')
+    if 'Year' not in frame.columns:
+        return docs, [{'row': None, 'field': 'Year', 'message': 'Year is required'}]
+
+    def flag(mask, field, message):
+        errors.extend({'row': int(i), 'field': field, 'message': message} for i in np.flatnonzero(mask))
+
+    # Booleans would otherwise pass as Years 0 and 1
+    years = pd.to_numeric(frame['Year'], errors='coerce').mask(frame['Year'].map(type) == bool)
+    flag(frame['Year'].isna(), 'Year', 'Year is required')
+    flag(frame['Year'].notna() & (years.isna() | (years % 1 != 0)), 'Year', 'Year must be an integer')
+    flag(years.notna() & years.duplicated(keep=False), 'Year', 'Year appears more than once in the batch')
+
+    for col in frame.columns:
+        if col == 'Year' or not is_numeric_field(col):
+            continue
+        values = frame[col]
+        if pd.api.types.is_bool_dtype(values):
+            flag(values.notna(), col, 'Value must be a number')
+        elif not pd.api.types.is_numeric_dtype(values) and pd.api.types.infer_dtype(values, skipna=True) not in NUMERIC_KINDS:
+            # Only columns holding something besides numbers (object or string
+            # dtype) get a per-value type check; pd.to_numeric would accept
+            # booleans as 0 and 1
+            numbers = values.map(type).isin([int, float])
+            flag(values.notna() & ~numbers, col, 'Value must be a number')
+
+    errors.sort(key=lambda e: (e['row'] is None, e['row'] or 0))
+    return docs, errors
+
+
+def stored_years(collection, years):
+    """
+    Return the subset of years that have a document in collection, in one $in query.
+    """
+    return {doc.get('Year') for doc in collection.find({'Year': {'$in': list(years)}}, {'Year': 1})}
+
+
+def existing_year_errors(collection, docs):
+    """
+    Return an error for every row whose Year is already stored. Nothing
+    enforces unique Years in the collections, so a plain insert would
+    otherwise add a second document for the year silently.
+    """
+    stored = stored_years(collection, [doc['Year'] for doc in docs])
+    return [
+        {'row': i, 'field': 'Year', 'message': f"Year {doc['Year']} already exists; send ?upsert=true to update it"}
+        for i, doc in enumerate(docs) if doc['Year'] in stored
+    ]
+
+
+def write_rows(collection, docs, upsert=False):
+    """
+    Write validated rows in one round of bulk operations.
+    Inserts use insert_many(ordered=False); upserts replace fields of the
+    document with the same Year or insert it. Failed rows do not stop the rest.
+    Inserts raise RowValidationError, before writing anything, when a Year
+    is already stored.
+
+    Returns:
+        dict: inserted, upserted and modified counts and per-row write errors
+    """
+    summary = {'inserted': 0, 'upserted': 0, 'modified': 0, 'errors': []}
+    if not docs:
+        return summary
+    if not upsert:
+        errors = existing_year_errors(collection, docs)
+        if errors:
+            raise RowValidationError(errors)
+    try:
+        if upsert:
+            result = collection.bulk_write(
+                [UpdateOne({'Year': doc['Year']}, {'$set': doc}, upsert=True) for doc in docs],
+                ordered=False
+            )
+            summary['upserted'] = result.upserted_count
+            summary['modified'] = result.modified_count
+        else:
+            result = collection.insert_many(docs, ordered=False)
+            summary['inserted'] = len(result.inserted_ids)
+    except BulkWriteError as e:
+        details = e.details
+        summary['inserted'] = details.get('nInserted', 0)
+        summary['upserted'] = details.get('nUpserted', 0)
+        summary['modified'] = details.get('nModified', 0)
+        summary['errors'] = [
+            {'row': error['index'], 'field': None, 'message': error.get('errmsg')}
+            for error in details.get('writeErrors', [])
+        ]
+    return summary
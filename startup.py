@@ -0,0 +1,60 @@
+import os
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Timings from the last warm_up() in this process
+_report = {
+    'pid': None,
+    'completed_at': None,
+    'total_seconds': None,
+    'stages': {},
+    'errors': {},
+}
+
+
+def warm_up():
+    """
+    Load data and models ahead of the first request and record how long each stage took.
+    Each stage is optional: a failure is logged and reported, and that stage
+    simply initializes lazily on first use instead.
+    """
+    import linearregression_predictiveanalysis
+    import peertopeer
+    import recommendations
+
+    stages = [
+        ('predictive_models', linearregression_predictiveanalysis.warm_up),
+        ('peertopeer_snapshot', peertopeer.warm_up),
+        ('recommendation_models', recommendations.warm_up),
+    ]
+
+    started = time.perf_counter()
+    timings = {}
+    errors = {}
+    for name, step in stages:
+        stage_started = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            logger.error("Warm-up stage %s failed: %s", name, e)
+            errors[name] = str(e)
+        timings[name] = time.perf_counter() - stage_started
+
+    _report.update({
+        'pid': os.getpid(),
+        'completed_at': time.time(),
+        'total_seconds': time.perf_counter() - started,
+        'stages': timings,
+        'errors': errors,
+    })
+    logger.info("Warm-up finished in %.3fs: %s", _report['total_seconds'], timings)
+    return startup_report()
+
+
+def startup_report():
+    """
+    Return the stage timings of the last warm-up in this process.
+    """
+    return {**_report, 'stages': dict(_report['stages']), 'errors': dict(_report['errors'])}